@@ -16,6 +16,45 @@ class Settings(BaseSettings):
     IOU: float = 0.45
     OMP_NUM_THREADS: int = 4
     ALLOW_ORIGINS: list[str] = ["*"]
+    INFER_BACKEND: str = "torch"    # torch | onnx | openvino (변환본이 없으면 최초 1회 export)
+    INFER_INT8: bool = False        # onnx/openvino INT8 양자화 모델 사용
+    INFER_CALIB_DIR: str | None = None  # INT8 보정용 이미지 폴더
+    DECODE_MAX_SIDE: int = 1280     # 업로드 디코딩 시 긴 변 상한 (JPEG은 draft로 바로 축소 디코딩)
+    MAX_UPLOAD_PIXELS: int = 60_000_000  # 이보다 큰 해상도는 413 (메모리 보호)
+
+    # === 결과 이미지 렌더링 설정 ===
+    RENDER_WORKERS: int = 2             # 박스 그리기/JPEG 인코딩 스레드 수
+    RENDER_CACHE_MB: int = 64           # 메모리 보관 상한 (LRU)
+    RENDER_DISK_DIR: str | None = None  # 지정하면 디스크에도 보관
+    RENDER_DISK_MAX_FILES: int = 1000   # 디스크 보관 파일 수 상한
+
+    # === 탐지 결과 캐시 (같은 사진 재전송 대응) ===
+    DETECTION_CACHE_MB: int = 32                # 메모리 캐시 상한 (0이면 메모리 캐시 끔)
+    DETECTION_CACHE_DIR: str | None = None      # 지정하면 디스크 캐시 사용
+    DETECTION_CACHE_DISK_MAX_FILES: int = 5000  # 디스크 캐시 파일 수 상한
+
+    # === 일괄 탐지 (/predict-batch) ===
+    BATCH_MAX_IMAGES: int = 200     # 요청당 최대 이미지 수 (zip 안의 이미지 포함)
+    BATCH_MAX_IMAGE_MB: int = 20    # 이미지 1장(zip 압축 해제 후) 크기 상한
+    BATCH_INFLIGHT: int = 0         # 동시에 처리 중인 이미지 수 (0이면 INFER_BATCH_SIZE)
+
+    # === 실시간 탐지 스트림 (/stream WebSocket) ===
+    STREAM_MAX_SESSIONS: int = 32   # 동시 WebSocket 탐지 스트림 수 상한
+    STREAM_MAX_FPS: float = 10      # 스트림당 처리 프레임 수 상한 (권장 전송 간격 하한 = 1000/이 값 ms)
+    STREAM_MAX_INTERVAL_MS: float = 2000  # 과부하 시 권장 전송 간격 상한
+    STREAM_MAX_FRAME_KB: int = 1024  # 프레임 1장 크기 상한
+    STREAM_DECODE_MAX_SIDE: int = 640  # 스트림 프레임 디코딩 긴 변 상한 (JPEG draft 축소 디코딩)
+    STREAM_BOX_TOLERANCE_PX: int = 8  # 박스 좌표가 이 이내로만 움직이면 boxes를 다시 보내지 않음
+    STREAM_IDLE_TIMEOUT_SEC: float = 30  # 이 시간 동안 프레임이 없으면 연결 종료
+
+    # === 추론 배칭 설정 ===
+    INFER_BATCH_SIZE: int = 8       # 한 번에 묶을 최대 이미지 수
+    INFER_MAX_WAIT_MS: float = 10   # 배치를 채우려고 기다리는 최대 시간
+    INFER_QUEUE_SIZE: int = 64      # 대기열 한도 (초과 시 503)
+    INFER_MODE: str = "inprocess"   # inprocess | pool (멀티 프로세스 워커 풀)
+    INFER_POOL_WORKERS: int = 2     # pool 모드 워커 프로세스 수
+    INFER_POOL_THREADS: int = 0     # 워커당 torch 스레드 (0이면 코어 수 / 워커 수)
+    INFER_POOL_HEALTH_SEC: float = 10  # 워커 헬스체크 주기 (0이면 끔)
 
     # === Oracle DB 설정 ===
     DB_USER: str
@@ -26,7 +65,52 @@ class Settings(BaseSettings):
     DB_SID: str | None = None       # 예: xe
 
     ORACLE_CLIENT_LIB_DIR: Optional[str] = None
+    DB_THIN_MODE: bool = False      # true면 Instant Client 없이 thin 모드로 접속 (ORACLE_CLIENT_LIB_DIR 불필요)
+    DB_ASYNC: bool = False          # true면 코스 스냅샷/DB 핑을 비동기 엔진으로 (thin 모드 필요)
+    DB_POOL_SIZE: int = 5           # 풀에 유지할 커넥션 수
+    DB_MAX_OVERFLOW: int = 10       # 풀 초과로 잠깐 더 열 수 있는 커넥션 수
+    DB_POOL_TIMEOUT: float = 30     # 커넥션 대기 한도(초) - 초과 시 TimeoutError
+    DB_POOL_RECYCLE: int = 1800     # 이 시간(초)보다 오래된 커넥션은 재연결
+    DB_STMT_CACHE_SIZE: int = 20    # 커넥션당 statement cache 크기
+    DB_ARRAYSIZE: int = 500         # fetch 1회 왕복당 행 수 (TRAIL 전체 적재 시 왕복 감소)
+    DB_PREFETCH_ROWS: int = 500     # execute 응답에 미리 실어 오는 행 수
     LOG_LEVEL: str = "INFO"
+    STARTUP_RETRY_SEC: float = 30   # 시작 시 초기화 실패한 구성요소(DB 등) 재시도 주기 (0이면 재시도 안 함)
+    METRICS_ENABLED: bool = True    # 단계별 시간/요청 시간 히스토그램 수집 + GET /metrics (false면 span이 아무것도 안 함)
+    SERVER_TIMING: bool = False     # 응답에 Server-Timing 헤더(단계별 ms) 추가
+
+    # === 추천 인덱스 설정 ===
+    TRAIL_INDEX_PATH: str = "data/trail_index.joblib"  # BM25 토큰/통계 저장 위치 (빈 값이면 저장 안 함)
+    TRAIL_FEATURES_PATH: str = "data/trail_features.joblib"  # 코스별 특성 테이블 저장 위치 (빈 값이면 저장 안 함)
+    TRAIL_SHARED_INDEX_DIR: str = "data/trail_shared"  # 워커 공유 mmap 인덱스(역색인+특성 컬럼) 디렉터리 (빈 값이면 워커별 메모리)
+    TRAIL_SHARED_INDEX_KEEP: int = 3       # 남겨 둘 공유 인덱스 버전 수
+    # BM25 필드 가중치 (가중치 w = 해당 필드 토큰을 w번 넣은 것과 같음). 기본값은 기존 문서 복제 방식과 같은 점수
+    BM25_FIELD_WEIGHTS: dict[str, float] = {"name": 3.0, "body": 1.0, "city": 2.0}
+    # LSA 의미 검색 (TF-IDF + 절단 SVD): 토큰이 겹치지 않는 사연도 관련 코스를 후보로 (차원 0이면 끔)
+    LSA_DIM: int = 128
+    RECOMMEND_SEMANTIC_WEIGHT: float = 0.3   # 후보 선정 점수 = (1-w)·BM25(최댓값 정규화) + w·LSA 코사인 (0이면 BM25만)
+    TRAIL_SNAPSHOT_TTL_SEC: int = 3600   # 변경이 없어도 이 시간이 지나면 전체 재적재 (0이면 끔)
+    TRAIL_SNAPSHOT_PROBE_SEC: int = 60   # 변경 신호 확인 주기 (0이면 백그라운드 갱신 끔)
+    TRAIL_REGIONS: list[str] = []        # 지정하면 이 지역(city_name 포함)의 코스만 적재 (DB에서 필터)
+    TRAIL_BBOX: list[float] | None = None  # [min_lat, min_lng, max_lat, max_lng] - 지정하면 이 영역만 적재
+    TRAIL_DETAIL_CACHE_ITEMS: int = 2048  # 추천 결과 표시용 상세 컬럼 캐시 크기
+    RECOMMEND_GEO_RADIUS_KM: float = 10.0    # 근접 후보 반경 (근접 점수가 0이 되는 거리)
+    RECOMMEND_GEO_MAX_CANDIDATES: int = 50   # BM25 후보에 더할 근접 코스 최대 수 (0이면 끔)
+    GEO_DISTANCE_METHOD: str = "haversine"   # 근접 점수 거리 계산: haversine | equirect (근거리 근사, 10km 오차 0.1% 미만)
+    QUERY_CACHE_SIZE: int = 4096             # 사연 → (prefs, 질의 토큰) LRU 크기
+    KIWI_POOL_SIZE: int = 2                  # 형태소 분석기 인스턴스 수 (인스턴스당 수백 MB, 동시 분석 가능 수)
+    KIWI_NUM_WORKERS: int = -1               # 코퍼스 배치 분석 스레드 수 (-1이면 코어 수)
+    KIWI_USER_DICT: str = ""                 # Kiwi 사용자 사전 파일 (단어\t품사\t점수, 빈 값이면 없음)
+    KIWI_TRAIL_WORDS: bool = True            # 코스 스냅샷의 시군구/코스명(~길, ~로)을 사용자 사전에 추가 (바뀐 단어가 든 코스만 다시 분석)
+    TOKEN_CACHE_SIZE: int = 8192             # 질의 문자열 해시 → 토큰 LRU 크기
+    RECOMMEND_CACHE_SIZE: int = 2048         # 추천 응답 캐시 항목 수 (0이면 끔)
+    RECOMMEND_CACHE_TTL_SEC: float = 600     # 추천 응답 캐시 유효 시간
+    RECOMMEND_CACHE_GEOHASH_PRECISION: int = 7  # 위치를 이 정밀도의 geohash 칸으로 묶음 (7 ≈ 150m)
+    RECOMMEND_CACHE_COALESCE: bool = True    # 같은 키 동시 미스는 한 번만 계산
+    REPORT_INGEST_ENABLED: bool = True       # 탐지 요청의 위치(lat/lng)를 가장 가까운 코스 제보 수로 반영
+    REPORT_SNAP_RADIUS_KM: float = 1.0       # 이 거리 안에 코스 시작점이 없으면 제보를 버림
+    REPORT_FLUSH_SEC: float = 5.0            # 모아 둔 제보 증가분을 DB에 반영하는 주기
+    REPORT_FLUSH_MAX_PENDING: int = 500      # 대기 중인 제보 위치 + 코스 수가 이만큼 쌓이면 주기를 기다리지 않고 반영
     @property
     def SQLALCHEMY_DATABASE_URI(self) -> str:
         base = f"oracle+oracledb://{self.DB_USER}:{self.DB_PASSWORD}@{self.DB_HOST}:{self.DB_PORT}"
@@ -36,4 +120,9 @@ class Settings(BaseSettings):
             return f"{base}/{self.DB_SID}"
         raise ValueError("DB_SERVICE 또는 DB_SID 중 하나는 반드시 설정해야 합니다.")
 
+    @property
+    def SQLALCHEMY_ASYNC_DATABASE_URI(self) -> str:
+        # python-oracledb asyncio 드라이버 (thin 모드 전용)
+        return self.SQLALCHEMY_DATABASE_URI.replace("oracle+oracledb://", "oracle+oracledb_async://", 1)
+
 settings = Settings()
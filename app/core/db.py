@@ -1,72 +1,232 @@
 # app/core/db.py
 import os
+import time
+import asyncio
+import threading
+from collections import deque
 import oracledb
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, exc as sa_exc
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
 from sqlalchemy.orm import sessionmaker, DeclarativeBase
 from app.core.config import settings
 
-# 1) Thick 모드 초기화 (엔진/세션 만들기 전에 반드시!)
-IC_DIR = os.getenv("ORACLE_CLIENT_LIB_DIR", "").strip()
-if not IC_DIR:
-    # settings에서 받아오기 (환경변수 대신 .env로 관리하는 경우)
-    IC_DIR = getattr(settings, "ORACLE_CLIENT_LIB_DIR", "") or ""
+class Base(DeclarativeBase):
+    pass
+
+# 엔진은 처음 쓸 때(또는 시작 오케스트레이터가) 만든다.
+# import 시점에 Instant Client/DB가 없어도 앱 자체는 뜨도록 (trash 라우터 등은 DB 불필요)
+engine = None
+SessionLocal = sessionmaker(autoflush=False, autocommit=False, future=True)
+_engine_lock = threading.Lock()
+
+# 비동기 엔진 (DB_ASYNC=true, thin 모드 전용)
+async_engine = None
+AsyncSessionLocal = None
+
+# -----------------------------
+# 커넥션 풀 지표
+# -----------------------------
+class PoolStats:
+    """풀 체크아웃 대기 시간/타임아웃 집계 (최근 window건 기준 분위수)"""
+
+    def __init__(self, window: int = 1024):
+        self._lock = threading.Lock()
+        self._waits = deque(maxlen=window)
+        self.checkouts = 0
+        self.timeouts = 0
+        self.max_wait_ms = 0.0
+
+    def observe(self, sec: float):
+        ms = sec * 1000
+        with self._lock:
+            self._waits.append(ms)
+            self.checkouts += 1
+            if ms > self.max_wait_ms:
+                self.max_wait_ms = ms
+
+    def timeout(self):
+        with self._lock:
+            self.timeouts += 1
+
+    def snapshot(self, pool) -> dict:
+        with self._lock:
+            waits = sorted(self._waits)
+            checkouts, timeouts, max_wait = self.checkouts, self.timeouts, self.max_wait_ms
+        capacity = settings.DB_POOL_SIZE + max(0, settings.DB_MAX_OVERFLOW)
+        checked_out = pool.checkedout()
+
+        def pct(q):
+            return round(waits[min(len(waits) - 1, int(q * len(waits)))], 3) if waits else None
+
+        return {
+            "pool_size": pool.size(),
+            "max_overflow": settings.DB_MAX_OVERFLOW,
+            "checked_out": checked_out,
+            "idle": pool.checkedin(),
+            "overflow": max(0, pool.overflow()),
+            "utilization": round(checked_out / capacity, 4) if capacity else None,
+            "checkouts": checkouts,
+            "timeouts": timeouts,
+            "wait_ms_p50": pct(0.50),
+            "wait_ms_p95": pct(0.95),
+            "wait_ms_max": round(max_wait, 3),
+        }
+
+sync_pool_stats = PoolStats()
+async_pool_stats = PoolStats()
+
+def _timed_pool(base, stats: PoolStats):
+    """체크아웃(빈 커넥션 대기 + 신규 연결 생성) 시간을 재는 풀 클래스"""
+    class _TimedPool(base):
+        def _do_get(self):
+            t0 = time.perf_counter()
+            try:
+                conn = super()._do_get()
+            except sa_exc.TimeoutError:
+                stats.timeout()
+                raise
+            stats.observe(time.perf_counter() - t0)
+            return conn
+    _TimedPool.__name__ = f"Timed{base.__name__}"
+    return _TimedPool
+
+TimedQueuePool = _timed_pool(QueuePool, sync_pool_stats)
+TimedAsyncQueuePool = _timed_pool(AsyncAdaptedQueuePool, async_pool_stats)
 
-if not IC_DIR:
-    # IC 경로가 없다면 여기서 명확히 실패시켜 원인 파악 용이
-    raise RuntimeError(
-        "ORACLE_CLIENT_LIB_DIR가 비어있습니다. .env 또는 환경변수에 Instant Client 경로를 설정하세요."
+def _configure_driver():
+    # 커서 기본값: 한 번의 왕복으로 가져올 행 수 (TRAIL 전체 적재 시 왕복 수 감소)
+    oracledb.defaults.arraysize = settings.DB_ARRAYSIZE
+    oracledb.defaults.prefetchrows = settings.DB_PREFETCH_ROWS
+    oracledb.defaults.stmtcachesize = settings.DB_STMT_CACHE_SIZE
+
+def _engine_kwargs(poolclass) -> dict:
+    return dict(
+        poolclass=poolclass,
+        pool_pre_ping=True,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        arraysize=settings.DB_ARRAYSIZE,
+        connect_args={"stmtcachesize": settings.DB_STMT_CACHE_SIZE},
+        echo=False,
     )
 
-# 폴더가 실제 존재/접근 가능한지 체크
-if not os.path.isdir(IC_DIR):
-    raise RuntimeError(f"Instant Client 폴더가 존재하지 않습니다: {IC_DIR}")
+def _init_oracle_client():
+    # 1) Thick 모드 초기화 (엔진/세션 만들기 전에 반드시!)
+    ic_dir = os.getenv("ORACLE_CLIENT_LIB_DIR", "").strip()
+    if not ic_dir:
+        # settings에서 받아오기 (환경변수 대신 .env로 관리하는 경우)
+        ic_dir = getattr(settings, "ORACLE_CLIENT_LIB_DIR", "") or ""
+
+    if not ic_dir:
+        # IC 경로가 없다면 여기서 명확히 실패시켜 원인 파악 용이
+        raise RuntimeError(
+            "ORACLE_CLIENT_LIB_DIR가 비어있습니다. .env 또는 환경변수에 Instant Client 경로를 설정하세요."
+        )
 
-try:
-    # init 호출
-    oracledb.init_oracle_client(lib_dir=IC_DIR)
+    # 폴더가 실제 존재/접근 가능한지 체크
+    if not os.path.isdir(ic_dir):
+        raise RuntimeError(f"Instant Client 폴더가 존재하지 않습니다: {ic_dir}")
+
+    try:
+        # init 호출
+        oracledb.init_oracle_client(lib_dir=ic_dir)
+    except Exception as e:
+        print("[ORACLE] Instant Client 초기화 실패:", e)
+        raise
     print("[ORACLE] is_thin_mode:", oracledb.is_thin_mode())  # False가 되어야 합니다.
-    print("[ORACLE] clientversion:", oracledb.clientversion())
-except Exception as e:
-    print("[ORACLE] Instant Client 초기화 실패:", e)
-    raise
-print("[ORACLE] is_thin_mode:", oracledb.is_thin_mode())
-try:
-    print("[ORACLE] clientversion:", oracledb.clientversion())
-except Exception as e:
-    print("[ORACLE] clientversion() error:", e)
+    try:
+        print("[ORACLE] clientversion:", oracledb.clientversion())
+    except Exception as e:
+        print("[ORACLE] clientversion() error:", e)
 
-class Base(DeclarativeBase):
-    pass
+def init_engine():
+    """(thick 모드면) Instant Client 초기화 + 엔진 생성 (최초 1회). 실패하면 예외 → 다음 호출에서 재시도."""
+    global engine
+    if engine is not None:
+        return engine
+    with _engine_lock:
+        if engine is None:
+            # DB_THIN_MODE=true면 Instant Client 없이 순수 파이썬 드라이버로 접속
+            if not settings.DB_THIN_MODE and oracledb.is_thin_mode():
+                _init_oracle_client()
+            _configure_driver()
+            eng = create_engine(
+                settings.SQLALCHEMY_DATABASE_URI,
+                future=True,
+                **_engine_kwargs(TimedQueuePool),
+            )
+            SessionLocal.configure(bind=eng)
+            engine = eng
+    return engine
 
-engine = create_engine(
-    settings.SQLALCHEMY_DATABASE_URI,
-    pool_pre_ping=True,
-    pool_size=5,
-    max_overflow=10,
-    pool_recycle=1800,
-    echo=False,
-    future=True,
-)
+def init_async_engine():
+    """비동기 엔진 생성 (최초 1회). python-oracledb asyncio는 thin 모드에서만 동작."""
+    global async_engine, AsyncSessionLocal
+    if async_engine is not None:
+        return async_engine
+    if not settings.DB_THIN_MODE:
+        raise RuntimeError("DB_ASYNC는 thin 모드에서만 사용할 수 있습니다. DB_THIN_MODE=true로 설정하세요.")
+    from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+    with _engine_lock:
+        if async_engine is None:
+            _configure_driver()
+            eng = create_async_engine(
+                settings.SQLALCHEMY_ASYNC_DATABASE_URI,
+                **_engine_kwargs(TimedAsyncQueuePool),
+            )
+            AsyncSessionLocal = async_sessionmaker(eng, autoflush=False, expire_on_commit=False)
+            async_engine = eng
+    return async_engine
 
-SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True)
+def new_session():
+    """엔진을 보장한 뒤 세션 생성 (스냅샷 저장소 등 라우터 밖에서 사용)"""
+    init_engine()
+    return SessionLocal()
+
+def new_async_session():
+    init_async_engine()
+    return AsyncSessionLocal()
 
 def get_db():
-    db = SessionLocal()
+    db = new_session()
     try:
         yield db
     finally:
         db.close()
 
+async def get_async_db():
+    async with new_async_session() as db:
+        yield db
+
+PING_SQL = {
+    "one": "SELECT 1 FROM dual",
+    "db_name": "SELECT sys_context('USERENV','DB_NAME') FROM dual",
+    "session_user": "SELECT sys_context('USERENV','SESSION_USER') FROM dual",
+    "sysdate": "SELECT TO_CHAR(SYSDATE, 'YYYY-MM-DD HH24:MI:SS') FROM dual",
+}
+
 def db_ping_info() -> dict:
-    with engine.connect() as conn:
-        one = conn.exec_driver_sql("SELECT 1 FROM dual").scalar_one()
-        db_name = conn.exec_driver_sql(
-            "SELECT sys_context('USERENV','DB_NAME') FROM dual"
-        ).scalar_one()
-        user = conn.exec_driver_sql(
-            "SELECT sys_context('USERENV','SESSION_USER') FROM dual"
-        ).scalar_one()
-        systs = conn.exec_driver_sql(
-            "SELECT TO_CHAR(SYSDATE, 'YYYY-MM-DD HH24:MI:SS') FROM dual"
-        ).scalar_one()
-        return {"ok": (one == 1), "db_name": db_name, "session_user": user, "sysdate": systs}
+    with init_engine().connect() as conn:
+        values = {k: conn.exec_driver_sql(sql).scalar_one() for k, sql in PING_SQL.items()}
+    one = values.pop("one")
+    return {"ok": (one == 1), **values}
+
+async def db_ping_info_async() -> dict:
+    """DB_ASYNC면 비동기 엔진으로, 아니면 동기 엔진을 스레드에서 실행"""
+    if not settings.DB_ASYNC:
+        return await asyncio.to_thread(db_ping_info)
+    async with init_async_engine().connect() as conn:
+        values = {k: (await conn.exec_driver_sql(sql)).scalar_one() for k, sql in PING_SQL.items()}
+    one = values.pop("one")
+    return {"ok": (one == 1), **values}
+
+def pool_metrics() -> dict:
+    """동기/비동기 풀 사용률 + 체크아웃 대기 지표 (엔진이 없으면 None)"""
+    return {
+        "thin_mode": oracledb.is_thin_mode(),
+        "async": settings.DB_ASYNC,
+        "sync": sync_pool_stats.snapshot(engine.pool) if engine is not None else None,
+        "async_pool": async_pool_stats.snapshot(async_engine.sync_engine.pool) if async_engine is not None else None,
+    }
@@ -0,0 +1,205 @@
+import time
+import threading
+from bisect import bisect_left
+from contextvars import ContextVar
+from app.core.config import settings
+
+# 초 단위 히스토그램 경계 (Prometheus 기본값 + 1ms 이하 구간)
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# 요청별 단계 기록 (Server-Timing용). 미들웨어가 요청마다 새 리스트를 넣는다.
+_request_timings: ContextVar[list | None] = ContextVar("request_timings", default=None)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _fmt(v: float) -> str:
+    return "+Inf" if v == float("inf") else repr(float(v))
+
+
+class Histogram:
+    """
+    라벨 조합별 누적 히스토그램 (버킷별 개수, 합, 개수).
+    Prometheus 텍스트 포맷으로 내보낸다.
+    """
+
+    def __init__(self, name: str, help: str, labelnames: tuple, buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._series = {}   # 라벨 값 튜플 → [버킷별 개수..., 합, 개수]
+
+    def observe(self, labels: tuple, seconds: float):
+        i = bisect_left(self.buckets, seconds)
+        with self._lock:
+            s = self._series.get(labels)
+            if s is None:
+                s = self._series[labels] = [0] * (len(self.buckets) + 1) + [0.0, 0]
+            s[i] += 1          # 마지막 칸은 +Inf 전용
+            s[-2] += seconds
+            s[-1] += 1
+
+    def summary(self) -> dict:
+        """{라벨: {"count", "avg_ms"}} - 디버그 엔드포인트용"""
+        with self._lock:
+            items = [(k, s[-2], s[-1]) for k, s in self._series.items()]
+        return {
+            "/".join(map(str, k)): {"count": n, "avg_ms": round(total / n * 1000, 3) if n else None}
+            for k, total, n in sorted(items)
+        }
+
+    def expose(self) -> list:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = sorted((k, list(s)) for k, s in self._series.items())
+        for labels, s in series:
+            base = ",".join(f'{n}="{_escape(v)}"' for n, v in zip(self.labelnames, labels))
+            sep = "," if base else ""
+            cum = 0
+            for le, c in zip(self.buckets + (float("inf"),), s[:-2]):
+                cum += c
+                lines.append(f'{self.name}_bucket{{{base}{sep}le="{_fmt(le)}"}} {cum}')
+            lines.append(f"{self.name}_sum{{{base}}} {_fmt(s[-2])}")
+            lines.append(f"{self.name}_count{{{base}}} {s[-1]}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    프로세스 내 지표 모음.
+    - stage: 단계별 처리 시간 (span으로 기록)
+    - http : 라우트별 요청 처리 시간 (미들웨어가 기록)
+    - gauge 소스: 호출 시점 값을 돌려주는 함수 (풀/캐시 상태 등)
+    """
+
+    def __init__(self, prefix: str = "plogging", enabled: bool = True):
+        self.prefix = prefix
+        self.enabled = enabled
+        self.stage = Histogram(f"{prefix}_stage_seconds", "단계별 처리 시간(초)", ("stage",))
+        self.http = Histogram(f"{prefix}_http_request_seconds", "요청 처리 시간(초)", ("method", "route", "status"))
+        self._gauges = {}   # 이름 → (help, fn: () → {라벨 튜플 또는 (): 값})
+
+    def observe_stage(self, stage: str, seconds: float):
+        if not self.enabled:
+            return
+        self.stage.observe((stage,), seconds)
+        timings = _request_timings.get()
+        if timings is not None:
+            timings.append((stage, seconds))
+
+    def gauge(self, name: str, help: str, fn, labelnames: tuple = ()):
+        """fn() → 값 하나, 또는 {라벨 값 튜플: 값}"""
+        self._gauges[f"{self.prefix}_{name}"] = (help, fn, tuple(labelnames))
+
+    def expose(self) -> str:
+        lines = self.stage.expose() + self.http.expose()
+        for name, (help, fn, labelnames) in self._gauges.items():
+            try:
+                values = fn()
+            except Exception:
+                continue   # 아직 준비되지 않은 구성요소 등
+            if values is None:
+                continue
+            lines += [f"# HELP {name} {help}", f"# TYPE {name} gauge"]
+            if not isinstance(values, dict):
+                values = {(): values}
+            for labels, v in values.items():
+                if v is None:
+                    continue
+                base = ",".join(f'{n}="{_escape(x)}"' for n, x in zip(labelnames, labels))
+                lines.append(f"{name}{{{base}}} {_fmt(v)}" if base else f"{name} {_fmt(v)}")
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry(enabled=settings.METRICS_ENABLED)
+
+
+class _Span:
+    __slots__ = ("name", "t0")
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        metrics.observe_stage(self.name, time.perf_counter() - self.t0)
+        return False
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NOOP = _NoopSpan()
+
+
+def span(name: str):
+    """with span("recommend.bm25"): ... - 꺼져 있으면 아무것도 하지 않는 공용 객체"""
+    return _Span(name) if metrics.enabled else _NOOP
+
+
+def observe_ms(stage: str, ms: float):
+    """이미 잰 시간(ms)을 기록 (예: ultralytics res.speed)"""
+    if metrics.enabled:
+        metrics.observe_stage(stage, ms / 1000.0)
+
+
+def _server_timing(timings: list, total: float) -> str:
+    """같은 단계는 합쳐서 'stage;dur=ms' 목록으로"""
+    merged = {}
+    for stage, seconds in timings:
+        merged[stage] = merged.get(stage, 0.0) + seconds
+    parts = [f"{stage};dur={seconds * 1000:.2f}" for stage, seconds in merged.items()]
+    parts.append(f"total;dur={total * 1000:.2f}")
+    return ", ".join(parts)
+
+
+class MetricsMiddleware:
+    """
+    ASGI 미들웨어: 라우트 템플릿별 요청 시간 기록 + (옵션) Server-Timing 헤더.
+    스트리밍 응답의 Server-Timing은 응답 시작 시점까지의 단계만 담긴다.
+    """
+
+    def __init__(self, app, registry: MetricsRegistry = metrics, server_timing: bool = False):
+        self.app = app
+        self.registry = registry
+        self.server_timing = server_timing
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        timings = []
+        token = _request_timings.set(timings)
+        t0 = time.perf_counter()
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if self.server_timing:
+                    value = _server_timing(timings, time.perf_counter() - t0)
+                    message = {**message, "headers": [*message.get("headers", []),
+                                                      (b"server-timing", value.encode("latin-1"))]}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _request_timings.reset(token)
+            # 라우트 템플릿(/v1/trash/images/{detection_id})으로 묶어 라벨 수를 제한
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            self.registry.http.observe((scope["method"], route, str(status)), time.perf_counter() - t0)
@@ -0,0 +1,46 @@
+"""
+응답 JSON 직렬화: 객체 → UTF-8 바이트로 한 번에 인코딩.
+orjson이 있으면 사용하고, 없으면 표준 json (starlette JSONResponse와 같은 옵션)으로 대체.
+내부에서 만든 dict/list는 pydantic 모델을 거치지 않고 바로 넘긴다.
+"""
+import json
+from decimal import Decimal
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:   # 선택 의존성
+    orjson = None
+
+
+def _default(obj):
+    """기본 타입 외 값: numpy 배열/스칼라, Decimal(Oracle NUMBER), pydantic 모델"""
+    if hasattr(obj, "tolist"):
+        return obj.tolist()
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(mode="json")
+    raise TypeError(f"JSON으로 직렬화할 수 없는 타입: {type(obj).__name__}")
+
+
+if orjson is not None:
+    def dumps(obj) -> bytes:
+        return orjson.dumps(obj, default=_default)
+
+    loads = orjson.loads
+else:
+    def dumps(obj) -> bytes:
+        return json.dumps(
+            obj, ensure_ascii=False, allow_nan=False, separators=(",", ":"), default=_default,
+        ).encode("utf-8")
+
+    loads = json.loads
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse와 같고 인코딩만 dumps (response_model 검증/jsonable_encoder를 거치지 않게 직접 반환)"""
+
+    def render(self, content) -> bytes:
+        return dumps(content)
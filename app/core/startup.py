@@ -0,0 +1,142 @@
+import time
+import asyncio
+import psutil
+from fastapi import HTTPException
+from app.core.config import settings
+
+
+class Component:
+    """시작 단계 구성요소 1개 (모델/DB/Kiwi ...) 상태"""
+    __slots__ = ("name", "init", "deps", "status", "attempts", "error", "started_at", "elapsed_ms", "event")
+
+    def __init__(self, name: str, init, deps=()):
+        self.name = name
+        self.init = init
+        self.deps = tuple(deps)
+        self.status = "pending"   # pending → waiting(의존 대기) → starting → ready | failed(재시도)
+        self.attempts = 0
+        self.error = None
+        self.started_at = None
+        self.elapsed_ms = None
+        self.event = asyncio.Event()
+
+    def as_dict(self) -> dict:
+        return {
+            "status": self.status,
+            "deps": list(self.deps),
+            "attempts": self.attempts,
+            "elapsed_ms": self.elapsed_ms,
+            "error": self.error,
+        }
+
+
+class StartupOrchestrator:
+    """
+    lifespan 위에서 무거운 초기화를 백그라운드로 동시에 실행.
+    - 서버는 바로 요청을 받음 (/health는 즉시 200)
+    - 구성요소별 준비 상태는 /ready, 라우트는 require(...)로 자기 의존성만 확인
+    - 실패한 구성요소는 retry_sec마다 재시도 (예: Oracle이 늦게 뜨는 경우)
+    """
+
+    def __init__(self, retry_sec: float = 30):
+        self.retry_sec = retry_sec
+        self._components = {}
+        self._tasks = []
+        self.started_at = None   # perf_counter 기준
+        self.ready_ms = None     # 전체 준비까지 걸린 시간 (오케스트레이터 시작 기준)
+        self.ready_since_process_ms = None  # 프로세스 생성 시각 기준 (import 시간 포함)
+
+    def add(self, name: str, init, deps=()):
+        """init: 동기 함수(스레드에서 실행) 또는 코루틴 함수"""
+        self._components[name] = Component(name, init, deps)
+
+    # -----------------------------
+    # 실행
+    # -----------------------------
+    def begin(self):
+        self.started_at = time.perf_counter()
+        self.ready_ms = None
+        self.ready_since_process_ms = None
+        loop = asyncio.get_running_loop()
+        for comp in self._components.values():
+            # 이벤트는 실행 중인 루프에서 다시 만든다 (테스트 등에서 루프가 바뀔 수 있음)
+            comp.event = asyncio.Event()
+            self._tasks.append(loop.create_task(self._run(comp), name=f"startup-{comp.name}"))
+
+    async def cancel(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _run(self, comp: Component):
+        if comp.deps:
+            comp.status = "waiting"
+            for dep in comp.deps:
+                await self._components[dep].event.wait()
+        while True:
+            comp.status = "starting"
+            comp.attempts += 1
+            comp.started_at = time.perf_counter()
+            try:
+                if asyncio.iscoroutinefunction(comp.init):
+                    await comp.init()
+                else:
+                    await asyncio.to_thread(comp.init)
+            except Exception as e:
+                comp.status = "failed"
+                comp.error = f"{e.__class__.__name__}: {e}"
+                print(f"[STARTUP] {comp.name} 초기화 실패 ({comp.attempts}회):", e)
+                if not self.retry_sec:
+                    return
+                await asyncio.sleep(self.retry_sec)
+                continue
+            comp.elapsed_ms = round((time.perf_counter() - comp.started_at) * 1000, 1)
+            comp.status = "ready"
+            comp.error = None
+            comp.event.set()
+            print(f"[STARTUP] {comp.name} 준비 완료: {comp.elapsed_ms}ms")
+            self._check_all_ready()
+            return
+
+    def _check_all_ready(self):
+        if self.ready_ms is not None or not self.is_ready():
+            return
+        self.ready_ms = round((time.perf_counter() - self.started_at) * 1000, 1)
+        try:
+            created = psutil.Process().create_time()
+            self.ready_since_process_ms = round((time.time() - created) * 1000, 1)
+        except psutil.Error:
+            pass
+        print(f"[STARTUP] 전체 준비 완료: {self.ready_ms}ms (프로세스 시작 후 {self.ready_since_process_ms}ms)")
+
+    # -----------------------------
+    # 조회
+    # -----------------------------
+    def is_ready(self, *names) -> bool:
+        names = names or tuple(self._components)
+        return all(n in self._components and self._components[n].status == "ready" for n in names)
+
+    def require(self, *names):
+        """라우트 의존성: names가 모두 준비되지 않았으면 503 (+Retry-After)"""
+        def _dependency():
+            missing = [n for n in names if not self.is_ready(n)]
+            if missing:
+                raise HTTPException(
+                    status_code=503,
+                    detail=f"서비스 준비 중입니다: {', '.join(missing)}",
+                    headers={"Retry-After": "5"},
+                )
+        return _dependency
+
+    def report(self) -> dict:
+        return {
+            "ready": self.is_ready(),
+            "components": {name: comp.as_dict() for name, comp in self._components.items()},
+            "time_to_ready_ms": self.ready_ms,
+            "time_to_ready_since_process_ms": self.ready_since_process_ms,
+            "uptime_sec": round(time.perf_counter() - self.started_at, 1) if self.started_at else None,
+        }
+
+
+startup = StartupOrchestrator(retry_sec=settings.STARTUP_RETRY_SEC)
@@ -1,13 +1,65 @@
-from fastapi import FastAPI
+import asyncio
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Depends
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
 from app.core.config import settings
+from app.core.startup import startup
+from app.core.db import db_ping_info_async, pool_metrics
+from app.core.metrics import metrics, MetricsMiddleware
 
 # 라우터: 표준 경로(/v1/trash/predict) & 별칭 경로(/ai/detect) 모두 지원
 from app.routers.trash import router as trash_router, predict as trash_predict
+from app.routers.trash_stream import router as trash_stream_router
 from app.routers.route import router as route_router, recommend_api as route_recommend_api
 from app.schemas.route import RecommendResponse
+from app.services.recommend import (
+    trail_index, trail_features, prepare_trails, kiwi_pool, keyword_tokenizer, query_understanding, shared_index,
+)
+from app.services.recommend_cache import recommend_cache
+from app.services.detection_cache import detection_cache
+from app.repositories.trail_snapshot import trail_snapshot
+from app.services.inference_queue import inference_batcher
+from app.services.stream_detect import stream_metrics
+from app.services.report_ingest import report_ingestor
+
+# ==== 시작 구성요소 ====
+# 서로 독립적인 초기화는 동시에, 백그라운드에서 진행 (서버는 바로 요청 수신)
+# - model: YOLO 로드+워밍업 (pool 모드면 워커 프로세스 기동) → 추론 배칭 워커 시작
+# - kiwi : 형태소 분석기 풀 생성(모델 로드 + 워밍업)
+# - db   : (thick 모드면) Instant Client 초기화 + 엔진 생성 + 연결 확인
+# - trails: 디스크 추천 인덱스/특성 테이블 로드 + 코스 스냅샷 적재(적재 직후 특성·인덱스 계산) + 백그라운드 갱신 시작 (db 필요)
+#           + 위치 제보 일괄 반영 스레드 시작
+#           (공유 인덱스를 쓰면 워커별 디스크 로드 없이 적재 시 공유 파일을 mmap - 없을 때 한 워커만 만든다)
+trail_snapshot.add_listener(prepare_trails)
+
+async def _init_trails():
+    if not shared_index.enabled:
+        await asyncio.to_thread(trail_index.load)
+        await asyncio.to_thread(trail_features.load)
+    await trail_snapshot.aload()
+    trail_snapshot.start()
+    if settings.REPORT_INGEST_ENABLED:
+        report_ingestor.start()
+
+startup.add("model", inference_batcher.start)
+startup.add("kiwi", kiwi_pool.warm)
+startup.add("db", db_ping_info_async)
+startup.add("trails", _init_trails, deps=("db",))
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    startup.begin()
+    try:
+        yield
+    finally:
+        await startup.cancel()
+        trail_snapshot.stop()
+        # 남은 제보 증가분 반영 (DB 쓰기라 스레드에서)
+        await asyncio.to_thread(report_ingestor.stop)
+        await inference_batcher.stop()
 
-app = FastAPI(title="Plogging AI API", version="1.0.0")
+app = FastAPI(title="Plogging AI API", version="1.0.0", lifespan=lifespan)
 
 # CORS
 app.add_middleware(
@@ -18,21 +70,59 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# 단계별/요청별 처리 시간 수집 (+ 옵션 Server-Timing). 꺼져 있으면 미들웨어 자체를 붙이지 않음
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware, registry=metrics, server_timing=settings.SERVER_TIMING)
+
 # 표준 버전 경로
 app.include_router(trash_router, prefix="/v1/trash", tags=["trash"])
+app.include_router(trash_stream_router, prefix="/v1/trash", tags=["trash"])
 app.include_router(route_router, prefix="/v1/route", tags=["route"])
 
-# 헬스체크
+# 헬스체크 (프로세스 생존 여부 - 초기화 완료와 무관)
 @app.get("/health")
 def health():
     return {"status": "ok"}
 
+# 준비 상태 (구성요소별 상태 + 전체 준비까지 걸린 시간). 전부 준비 전에는 503
+@app.get("/ready")
+def ready():
+    report = startup.report()
+    return JSONResponse(report, status_code=200 if report["ready"] else 503)
+
+# ==== 지표 (Prometheus 텍스트 포맷) ====
+def _sync_pool(key: str):
+    pool = pool_metrics()["sync"]
+    return pool[key] if pool else None
+
+metrics.gauge("component_ready", "시작 구성요소 준비 여부 (1=ready)",
+              lambda: {(n,): int(c["status"] == "ready") for n, c in startup.report()["components"].items()},
+              labelnames=("component",))
+metrics.gauge("inference_queue_depth", "추론 대기열 길이", lambda: inference_batcher.metrics()["queue_depth"])
+metrics.gauge("stream_sessions", "진행 중인 WebSocket 탐지 스트림 수", lambda: stream_metrics.active)
+metrics.gauge("inference_rejected", "대기열이 가득 차 거절한 요청 수 (누적)", lambda: inference_batcher.rejected)
+metrics.gauge("report_pending", "DB 반영을 기다리는 제보 수", lambda: report_ingestor.metrics()["pending_reports"])
+metrics.gauge("db_pool_checked_out", "사용 중인 DB 커넥션 수", lambda: _sync_pool("checked_out"))
+metrics.gauge("db_pool_wait_p95_ms", "커넥션 대기 p95(ms)", lambda: _sync_pool("wait_ms_p95"))
+metrics.gauge("cache_hit_ratio", "캐시 적중률", lambda: {
+    ("recommend",): recommend_cache.metrics()["hit_ratio"],
+    ("query",): query_understanding.metrics()["hit_ratio"],
+    ("tokens",): keyword_tokenizer.metrics()["hit_ratio"],
+    ("detection",): detection_cache.metrics()["hit_ratio"],
+}, labelnames=("cache",))
+
+if settings.METRICS_ENABLED:
+    @app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+    def prometheus_metrics():
+        return PlainTextResponse(metrics.expose(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
 # ==== 배포용 별칭 경로 ====
 # /ai/detect -> 기존 /v1/trash/predict와 동일 핸들러 재사용
 app.add_api_route(
     path="/detect",
     endpoint=trash_predict,
     methods=["POST"],
+    dependencies=[Depends(startup.require("model"))],
     tags=["ai"]
 )
 
@@ -42,6 +132,7 @@ app.add_api_route(
     path="/recommend",
     endpoint=route_recommend_api,
     methods=["POST"],
+    dependencies=[Depends(startup.require("kiwi", "trails"))],
     response_model=RecommendResponse,
     tags=["ai"],
     name="Recommend (alias)",
@@ -1,4 +1,116 @@
+from dataclasses import dataclass
+from sqlalchemy import select, update, bindparam, func, or_
 from models.trail import Trail
 
+# 추천 점수 계산에 쓰는 컬럼 (BM25 문서/키워드/편의시설/거리/난이도/좌표/제보)
+# 표시 전용 컬럼(이미지 URL, 지번 주소, 옵션 설명, 코스 구분)은 상위 k개만 따로 조회
+SCORING_COLUMNS = (
+    Trail.trail_id,
+    Trail.trail_name,
+    Trail.description,
+    Trail.description_detail,
+    Trail.city_name,
+    Trail.difficulty_level,
+    Trail.length_detail,
+    Trail.length,
+    Trail.toilet_description,
+    Trail.amenity_description,
+    Trail.spot_latitude,
+    Trail.spot_longitude,
+    Trail.report_count,
+)
+
+# Oracle IN 목록은 1000개 제한
+IN_CHUNK = 1000
+
+
+@dataclass(frozen=True)
+class TrailFilter:
+    """
+    DB에서 먼저 거르는 조건 (None이면 해당 조건 없음).
+    - regions: city_name에 포함될 지역명 (OR)
+    - bbox: (min_lat, min_lng, max_lat, max_lng)
+    """
+    regions: tuple | None = None
+    bbox: tuple | None = None
+
+    def apply(self, stmt):
+        if self.regions:
+            stmt = stmt.where(or_(*(Trail.city_name.like(f"%{r}%") for r in self.regions)))
+        if self.bbox:
+            min_lat, min_lng, max_lat, max_lng = self.bbox
+            stmt = stmt.where(
+                Trail.spot_latitude.between(min_lat, max_lat),
+                Trail.spot_longitude.between(min_lng, max_lng),
+            )
+        return stmt
+
+
 def get_all_trails(db):
-    return db.query(Trail).all()
\ No newline at end of file
+    return db.query(Trail).all()
+
+async def get_all_trails_async(db):
+    result = await db.execute(select(Trail))
+    return result.scalars().all()
+
+# -----------------------------
+# 점수 계산용 좁은 조회 / 상위 k개 상세 조회
+# -----------------------------
+def _scoring_stmt(flt: TrailFilter | None):
+    # 워커마다 같은 순서로 적재해야 공유 인덱스(위치 기준 배열)를 함께 쓸 수 있다
+    stmt = select(*SCORING_COLUMNS).order_by(Trail.trail_id)
+    return flt.apply(stmt) if flt is not None else stmt
+
+def _chunks(ids: list):
+    for i in range(0, len(ids), IN_CHUNK):
+        yield ids[i:i + IN_CHUNK]
+
+def get_scoring_rows(db, flt: TrailFilter | None = None):
+    """점수 계산 컬럼만 (Row: 컬럼명 속성 접근)"""
+    return db.execute(_scoring_stmt(flt)).all()
+
+async def get_scoring_rows_async(db, flt: TrailFilter | None = None):
+    return (await db.execute(_scoring_stmt(flt))).all()
+
+def get_trails_by_ids(db, ids) -> list:
+    """전체 컬럼 일괄 조회 (IN 1000개 단위). 순서는 보장하지 않음."""
+    ids = list(dict.fromkeys(ids))
+    rows = []
+    for chunk in _chunks(ids):
+        rows.extend(db.execute(select(Trail).where(Trail.trail_id.in_(chunk))).scalars().all())
+    return rows
+
+async def get_trails_by_ids_async(db, ids) -> list:
+    ids = list(dict.fromkeys(ids))
+    rows = []
+    for chunk in _chunks(ids):
+        rows.extend((await db.execute(select(Trail).where(Trail.trail_id.in_(chunk)))).scalars().all())
+    return rows
+
+# -----------------------------
+# 제보 수 증가 (쓰기 지연 일괄 반영)
+# -----------------------------
+_trail_table = Trail.__table__
+_ADD_REPORTS_STMT = (
+    update(_trail_table)
+    .where(_trail_table.c.trail_id == bindparam("b_id"))
+    .values(report_count=func.coalesce(_trail_table.c.report_count, 0) + bindparam("b_n"))
+)
+
+def add_report_counts(db, deltas: dict) -> dict:
+    """
+    {trail_id: 증가분}을 UPDATE 한 번(executemany)으로 반영하고 같은 트랜잭션에서 새 값을 읽어 커밋.
+    반환: {trail_id: 반영 후 report_count} (없는 코스는 빠짐). 실패하면 롤백 후 예외.
+    """
+    try:
+        # ORM 일괄 갱신 모드를 거치지 않도록 커넥션에서 Core executemany로 실행
+        db.connection().execute(_ADD_REPORTS_STMT, [{"b_id": tid, "b_n": n} for tid, n in deltas.items()])
+        counts = {}
+        for chunk in _chunks(list(deltas)):
+            stmt = select(Trail.trail_id, Trail.report_count).where(Trail.trail_id.in_(chunk))
+            counts.update((tid, count) for tid, count in db.execute(stmt).all())
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return counts
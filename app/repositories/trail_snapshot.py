@@ -0,0 +1,433 @@
+import time
+import asyncio
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, fields, replace
+from sqlalchemy import text
+from app.core.config import settings
+from app.core.db import new_session, new_async_session
+from app.core.metrics import span
+from models.trail import Trail
+from app.repositories.trail_repo import (
+    TrailFilter, get_scoring_rows, get_scoring_rows_async, get_trails_by_ids, get_trails_by_ids_async,
+)
+
+
+@dataclass(frozen=True, slots=True)
+class TrailRecord:
+    """ORM 상태를 떼어낸 읽기 전용 코스 행 (Trail과 같은 속성명)"""
+    trail_id: int
+    trail_type_name: str | None = None
+    trail_name: str | None = None
+    description: str | None = None
+    description_detail: str | None = None
+    city_name: str | None = None
+    difficulty_level: str | None = None
+    length_detail: float | None = None
+    length: str | None = None
+    option_description: str | None = None
+    toilet_description: str | None = None
+    amenity_description: str | None = None
+    lot_number_address: str | None = None
+    spot_latitude: float | None = None
+    spot_longitude: float | None = None
+    report_count: int | None = None
+    img1: str | None = None
+    img2: str | None = None
+
+    @classmethod
+    def from_row(cls, row):
+        return cls(**{f.name: getattr(row, f.name, None) for f in fields(cls)})
+
+    def text_bytes(self) -> int:
+        return sum(len(v.encode("utf-8")) for v in (getattr(self, f.name) for f in fields(self)) if isinstance(v, str))
+
+
+@dataclass(frozen=True, slots=True)
+class TrailSnapshot:
+    version: int
+    trails: tuple
+    by_id: dict
+    signature: tuple | None
+    loaded_at: float
+    text_bytes: int = 0   # 적재한 문자열 컬럼 크기 합 (전송량 가늠용)
+    # report_count 외에는 같은 내용인 전체 적재 버전 (제보 수 패치는 유지, 전체 적재면 version과 같음)
+    base_version: int | None = None
+
+
+class TrailSnapshotStore:
+    """
+    TRAIL 테이블을 한 번 읽어 메모리에 보관하는 스냅샷 저장소.
+    - 요청은 메모리 스냅샷만 사용 (요청당 DB 왕복 없음)
+    - 점수 계산 컬럼만 적재 (표시 전용 컬럼은 TrailDetailCache가 상위 k개만 조회)
+    - 백그라운드 스레드가 가벼운 변경 신호(행 수/ORA_ROWSCN)를 주기적으로 확인
+    - 변경이 감지되거나 TTL이 지나면 새 스냅샷으로 통째로 교체
+    - async_session_factory를 주면 확인/재적재를 이벤트 루프의 태스크로 실행 (스레드 점유 없음)
+    - 제보 수 증가는 DB 재조회 없이 해당 행만 바꾼 스냅샷으로 교체 (apply_report_counts)
+    """
+
+    # 행 수 + 최근 변경 SCN + 제보 합계: 전체 컬럼을 옮기지 않고 변경 여부만 판단
+    PROBE_SQL = text(
+        f"SELECT COUNT(*), MAX(ORA_ROWSCN), SUM(REPORT_COUNT) FROM {Trail.__tablename__}"
+    )
+
+    def __init__(self, session_factory, ttl_sec: float = 3600, probe_sec: float = 60,
+                 async_session_factory=None, flt: TrailFilter | None = None):
+        self.session_factory = session_factory
+        self.flt = flt   # 배포 단위 서버측 필터 (예: 특정 지역만 서비스)
+        self.async_session_factory = async_session_factory
+        self.ttl_sec = ttl_sec
+        self.probe_sec = probe_sec
+        self._snapshot: TrailSnapshot | None = None
+        self._load_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._task = None
+        self._version = 0
+        self._listeners = []
+        # 지표
+        self.hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.patches = 0
+        self.probes = 0
+        self.probe_errors = 0
+        self.last_probe_at = None
+        self.last_error = None
+
+    def add_listener(self, fn):
+        """새 스냅샷을 교체한 직후 fn(snapshot) 호출 (적재한 스레드에서 실행 - 특성/인덱스 미리 계산용)"""
+        self._listeners.append(fn)
+
+    def _notify(self, snap):
+        for fn in self._listeners:
+            try:
+                fn(snap)
+            except Exception as e:
+                print("[TRAIL_SNAPSHOT] 적재 후 처리 실패:", e)
+
+    # -----------------------------
+    # 조회
+    # -----------------------------
+    def get(self) -> TrailSnapshot:
+        snap = self._snapshot
+        if snap is not None:
+            self.hits += 1
+            return snap
+        self.misses += 1
+        with self._load_lock:
+            if self._snapshot is None:
+                self._reload()
+            return self._snapshot
+
+    # -----------------------------
+    # 적재/변경 감지
+    # -----------------------------
+    def _probe(self):
+        db = self.session_factory()
+        try:
+            return tuple(db.execute(self.PROBE_SQL).one())
+        finally:
+            db.close()
+
+    def _reload(self, signature=None):
+        db = self.session_factory()
+        try:
+            if signature is None:
+                signature = tuple(db.execute(self.PROBE_SQL).one())
+            with span("trails.fetch"):
+                records = tuple(TrailRecord.from_row(r) for r in get_scoring_rows(db, self.flt))
+        finally:
+            db.close()
+        self._notify(self._install(signature, records))
+
+    async def _probe_async(self):
+        async with self.async_session_factory() as db:
+            return tuple((await db.execute(self.PROBE_SQL)).one())
+
+    async def _reload_async(self, signature=None):
+        async with self.async_session_factory() as db:
+            if signature is None:
+                signature = tuple((await db.execute(self.PROBE_SQL)).one())
+            with span("trails.fetch"):
+                records = tuple(TrailRecord.from_row(r) for r in await get_scoring_rows_async(db, self.flt))
+        snap = self._install(signature, records)
+        if self._listeners:
+            await asyncio.to_thread(self._notify, snap)
+
+    def _install(self, signature, records):
+        self._version += 1
+        self._snapshot = TrailSnapshot(
+            version=self._version,
+            trails=records,
+            by_id={t.trail_id: t for t in records},
+            signature=signature,
+            loaded_at=time.time(),
+            text_bytes=sum(r.text_bytes() for r in records),
+            base_version=self._version,
+        )
+        self.refreshes += 1
+        return self._snapshot
+
+    def apply_report_counts(self, counts: dict, signature=None):
+        """
+        {trail_id: report_count}를 반영한 스냅샷으로 교체 (DB 재조회 없음, 바뀐 행만 새로 만듦).
+        base_version/loaded_at은 유지 → 텍스트 기반 특성/인덱스는 그대로 쓰고 TTL 재적재 주기도 그대로.
+        signature: 반영 직후 다시 읽은 변경 신호 - 자기 쓰기 때문에 전체 재적재가 일어나지 않게 한다
+        (None이면 기존 값 유지 → 다음 확인에서 재적재). 같은 사이의 외부 변경은 TTL 재적재 때 반영.
+        """
+        with self._load_lock:
+            snap = self._snapshot
+            if snap is None:
+                return None
+            changed = {}
+            for tid, count in counts.items():
+                rec = snap.by_id.get(tid)
+                if rec is not None and rec.report_count != count:
+                    changed[tid] = replace(rec, report_count=count)
+            if not changed:
+                if signature is not None:
+                    self._snapshot = replace(snap, signature=signature)
+                return self._snapshot
+            by_id = dict(snap.by_id)
+            by_id.update(changed)
+            self._version += 1
+            self._snapshot = replace(
+                snap,
+                version=self._version,
+                trails=tuple(changed.get(t.trail_id, t) for t in snap.trails),
+                by_id=by_id,
+                signature=signature if signature is not None else snap.signature,
+            )
+            self.patches += 1
+            new = self._snapshot
+        self._notify(new)
+        return new
+
+    async def aload(self):
+        """스냅샷이 없으면 적재 (시작 단계용). 비동기 세션이 없으면 스레드에서 동기 적재."""
+        if self._snapshot is not None:
+            return self._snapshot
+        if self.async_session_factory is None:
+            return await asyncio.to_thread(self.get)
+        await self._reload_async()
+        return self._snapshot
+
+    def _needs_reload(self, snap, signature) -> bool:
+        self.probes += 1
+        self.last_probe_at = time.time()
+        expired = snap is None or (self.ttl_sec and time.time() - snap.loaded_at >= self.ttl_sec)
+        return bool(expired) or signature != snap.signature
+
+    def _record_error(self, e):
+        self.probe_errors += 1
+        self.last_error = f"{e.__class__.__name__}: {e}"
+        print("[TRAIL_SNAPSHOT] 갱신 실패:", e)
+
+    def refresh_if_changed(self) -> bool:
+        """변경 신호를 확인하고 필요하면 다시 적재. 교체했으면 True."""
+        snap = self._snapshot
+        try:
+            signature = self._probe()
+            if not self._needs_reload(snap, signature):
+                return False
+            with self._load_lock:
+                self._reload(signature)
+            self.last_error = None
+            return True
+        except Exception as e:
+            self._record_error(e)
+            return False
+
+    async def refresh_if_changed_async(self) -> bool:
+        snap = self._snapshot
+        try:
+            signature = await self._probe_async()
+            if not self._needs_reload(snap, signature):
+                return False
+            await self._reload_async(signature)
+            self.last_error = None
+            return True
+        except Exception as e:
+            self._record_error(e)
+            return False
+
+    # -----------------------------
+    # 백그라운드 갱신
+    # -----------------------------
+    def start(self):
+        if not self.probe_sec or self._thread is not None or self._task is not None:
+            return
+        if self.async_session_factory is not None:
+            # 실행 중인 이벤트 루프에서 호출해야 함 (lifespan/시작 오케스트레이터)
+            self._task = asyncio.get_running_loop().create_task(self._run_async(), name="trail-snapshot")
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="trail-snapshot", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.probe_sec):
+            self.refresh_if_changed()
+
+    async def _run_async(self):
+        while True:
+            await asyncio.sleep(self.probe_sec)
+            await self.refresh_if_changed_async()
+
+    # -----------------------------
+    # 지표
+    # -----------------------------
+    def metrics(self) -> dict:
+        snap = self._snapshot
+        now = time.time()
+        age = (now - snap.loaded_at) if snap else None
+        total = self.hits + self.misses
+        return {
+            "version": snap.version if snap else None,
+            "rows": len(snap.trails) if snap else 0,
+            "text_bytes": snap.text_bytes if snap else 0,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / total, 4) if total else None,
+            "refreshes": self.refreshes,
+            "patches": self.patches,
+            "base_version": snap.base_version if snap else None,
+            "probes": self.probes,
+            "probe_errors": self.probe_errors,
+            "age_sec": round(age, 1) if age is not None else None,
+            "since_last_probe_sec": round(now - self.last_probe_at, 1) if self.last_probe_at else None,
+            # 마지막 확인이 실패했거나 TTL을 넘겼으면 stale
+            "stale": bool(self.last_error) or bool(age is not None and self.ttl_sec and age >= self.ttl_sec),
+            "last_error": self.last_error,
+        }
+
+
+class TrailDetailCache:
+    """
+    표시용 전체 컬럼 캐시 (추천 결과 상위 k개만 DB에서 일괄 조회).
+    넘겨받은 버전이 바뀌면 비운다 (호출측은 base_version을 넘기고 report_count는 스냅샷 값으로 덮어씀).
+    - async_session_factory를 주면 aget_many가 이벤트 루프에서 비동기 세션으로 조회 (스레드 점유 없음)
+    """
+
+    def __init__(self, session_factory, max_items: int = 2048, async_session_factory=None):
+        self.session_factory = session_factory
+        self.async_session_factory = async_session_factory
+        self.max_items = max_items
+        self._lock = threading.Lock()
+        self._items = OrderedDict()   # trail_id → TrailRecord
+        self._version = None
+        # 지표
+        self.hits = 0
+        self.misses = 0
+        self.fetches = 0
+        self.errors = 0
+
+    def _lookup(self, ids, version):
+        """캐시에서 찾기 → (찾은 {trail_id: TrailRecord}, 없는 trail_id 목록)"""
+        found, missing = {}, []
+        with self._lock:
+            if version != self._version:
+                self._items.clear()
+                self._version = version
+            for i in ids:
+                rec = self._items.get(i)
+                if rec is None:
+                    missing.append(i)
+                else:
+                    self._items.move_to_end(i)
+                    found[i] = rec
+            self.hits += len(found)
+            self.misses += len(missing)
+        return found, missing
+
+    def _store(self, found: dict, rows: list, version) -> dict:
+        with self._lock:
+            self.fetches += 1
+            if version == self._version:
+                for rec in rows:
+                    self._items[rec.trail_id] = rec
+                while len(self._items) > self.max_items:
+                    self._items.popitem(last=False)
+        found.update((rec.trail_id, rec) for rec in rows)
+        return found
+
+    def _fetch_failed(self, e):
+        self.errors += 1
+        print("[TRAIL_DETAIL] 상세 조회 실패:", e)
+
+    def get_many(self, ids, version=None) -> dict:
+        """{trail_id: TrailRecord} - DB 오류 시 조회된 것만 반환 (호출측에서 스냅샷 행으로 대체)"""
+        found, missing = self._lookup(ids, version)
+        if not missing:
+            return found
+        try:
+            db = self.session_factory()
+            try:
+                rows = [TrailRecord.from_row(t) for t in get_trails_by_ids(db, missing)]
+            finally:
+                db.close()
+        except Exception as e:
+            self._fetch_failed(e)
+            return found
+        return self._store(found, rows, version)
+
+    async def aget_many(self, ids, version=None) -> dict:
+        """get_many의 비동기판. 비동기 세션이 없으면 스레드에서 동기 조회."""
+        if self.async_session_factory is None:
+            return await asyncio.to_thread(self.get_many, ids, version)
+        found, missing = self._lookup(ids, version)
+        if not missing:
+            return found
+        try:
+            async with self.async_session_factory() as db:
+                rows = [TrailRecord.from_row(t) for t in await get_trails_by_ids_async(db, missing)]
+        except Exception as e:
+            self._fetch_failed(e)
+            return found
+        return self._store(found, rows, version)
+
+    def metrics(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "items": len(self._items),
+                "max_items": self.max_items,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / total, 4) if total else None,
+                "fetches": self.fetches,
+                "errors": self.errors,
+            }
+
+
+def _snapshot_filter() -> TrailFilter | None:
+    regions = tuple(settings.TRAIL_REGIONS) or None
+    bbox = tuple(settings.TRAIL_BBOX) if settings.TRAIL_BBOX else None
+    if not regions and not bbox:
+        return None
+    return TrailFilter(regions=regions, bbox=bbox)
+
+
+trail_snapshot = TrailSnapshotStore(
+    new_session,
+    ttl_sec=settings.TRAIL_SNAPSHOT_TTL_SEC,
+    probe_sec=settings.TRAIL_SNAPSHOT_PROBE_SEC,
+    async_session_factory=new_async_session if settings.DB_ASYNC else None,
+    flt=_snapshot_filter(),
+)
+
+trail_details = TrailDetailCache(
+    new_session,
+    max_items=settings.TRAIL_DETAIL_CACHE_ITEMS,
+    async_session_factory=new_async_session if settings.DB_ASYNC else None,
+)
@@ -1,9 +1,21 @@
-from fastapi import APIRouter, UploadFile, File, Query
-from fastapi.responses import JSONResponse
-from PIL import Image, ImageDraw, ImageFont
-import io, base64
-from app.services.yolo_service import yolo_service
-from app.schemas.trash import PredictResponse, Box, Counts
+from fastapi import APIRouter, UploadFile, File, Query, HTTPException, Request, Depends
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse, Response
+from PIL import Image, ImageDraw, ImageFont, UnidentifiedImageError
+from functools import lru_cache
+from typing import List, Literal
+import io, re, uuid, base64, asyncio, zipfile
+from app.services.inference_queue import inference_batcher, QueueFullError
+from app.services.image_io import decode_upload, ImageTooLarge
+from app.services.render_service import render_store
+from app.services.detection_cache import detection_cache
+from app.services.report_ingest import report_ingestor
+from app.services.yolo_backends import IMAGE_EXTS
+from app.core.config import settings
+from app.core.startup import startup
+from app.core.metrics import span, observe_ms
+from app.core.serialization import dumps, loads
+from app.schemas.trash import PredictResponse
 
 router = APIRouter()
 
@@ -37,8 +49,9 @@ COLOR_BY_GROUP = {
     "기타": (180,180,180),
 }
 
+@lru_cache(maxsize=8)
 def _load_korean_font(size: int = 20):
-    """한글 폰트 자동 탐색 (환경에 없으면 기본폰트)"""
+    """한글 폰트 자동 탐색 (환경에 없으면 기본폰트) - 크기별로 한 번만 로드"""
     candidates = [
         "C:/Windows/Fonts/malgun.ttf",  # Windows
         "/System/Library/Fonts/AppleSDGothicNeo.ttc",  # macOS
@@ -52,8 +65,8 @@ def _load_korean_font(size: int = 20):
             continue
     return ImageFont.load_default()
 
-def draw_grouped_boxes_pil(orig_rgb: Image.Image, det_xyxy, det_cls) -> str | None:
-    """이미지에 '묶음 7종 한글 라벨'만 표시(점수 X) → JPEG base64 반환"""
+def render_grouped_boxes_jpeg(orig_rgb: Image.Image, det_xyxy, det_cls) -> bytes:
+    """이미지에 '묶음 7종 한글 라벨'만 표시(점수 X) → JPEG 바이트"""
     img = orig_rgb.copy()
     draw = ImageDraw.Draw(img)
     font = _load_korean_font()
@@ -76,24 +89,82 @@ def draw_grouped_boxes_pil(orig_rgb: Image.Image, det_xyxy, det_cls) -> str | No
 
     buf = io.BytesIO()
     img.save(buf, format="JPEG", quality=85)
-    b64 = base64.b64encode(buf.getvalue()).decode("utf-8")
-    return f"data:image/jpeg;base64,{b64}"
+    return buf.getvalue()
 
-@router.post("/predict", response_model=PredictResponse)
-async def predict(
-    file: UploadFile = File(...),
-    return_image: bool = Query(True),
-    grouped_only_boxes: bool = Query(True)
-):
-    # 업로드 파일 → PIL RGB
-    pil_img = Image.open(io.BytesIO(await file.read())).convert("RGB")
+def _to_data_url(jpeg: bytes) -> str:
+    return f"data:image/jpeg;base64,{base64.b64encode(jpeg).decode('utf-8')}"
+
+def draw_grouped_boxes_pil(orig_rgb: Image.Image, det_xyxy, det_cls) -> str | None:
+    """이미지에 '묶음 7종 한글 라벨'만 표시(점수 X) → JPEG base64 반환"""
+    return _to_data_url(render_grouped_boxes_jpeg(orig_rgb, det_xyxy, det_cls))
+
+def encode_boxes(xyxy, cls, grouped_only_boxes: bool = True, box_format: str = "objects"):
+    """
+    박스 → 응답 boxes 값 (묶음 또는 세부 라벨, 점수는 0.0 고정).
+    - objects: [{"cls", "label", "conf", "x1", "y1", "x2", "y2"}, ...]
+    - columns: {"cls": [...], "label": [...], "conf": [...], "x1": [...], ...} - 키 반복이 없어 박스가 많을 때 작고 빠름
+    """
+    if grouped_only_boxes:
+        labels = [GROUP_MAP_0BASED.get(k, "기타") for k in cls]
+    else:
+        labels = [FINE_LABELS_0BASED.get(k, f"UNK_{k}") for k in cls]
+    coords = [(float(x1), float(y1), float(x2), float(y2)) for x1, y1, x2, y2 in xyxy]
+    if box_format == "columns":
+        x1s, y1s, x2s, y2s = (list(c) for c in zip(*coords)) if coords else ([], [], [], [])
+        return {"cls": list(cls), "label": labels, "conf": [0.0] * len(coords),
+                "x1": x1s, "y1": y1s, "x2": x2s, "y2": y2s}
+    return [
+        {"cls": k, "label": label, "conf": 0.0, "x1": x1, "y1": y1, "x2": x2, "y2": y2}
+        for k, label, (x1, y1, x2, y2) in zip(cls, labels, coords)
+    ]
 
-    # 추론 (서버 설정값 그대로 사용)
-    res = yolo_service.predict(pil_img)
+def _location(lat: float | None, lng: float | None):
+    return (lat, lng) if lat is not None and lng is not None else None
+
+async def _detect_bytes(request: Request, data: bytes, return_image: bool,
+                        grouped_only_boxes: bool, image_mode: str, box_format: str = "objects",
+                        location=None):
+    """
+    업로드 바이트 1장 → (PredictResponse JSON 바이트, 캐시 적중 여부).
+    /predict, /predict-batch 공용. 실패는 HTTPException.
+    location: 촬영 위치 (lat, lng) - 쓰레기가 탐지되면 가장 가까운 코스의 제보 1건으로 누적
+    """
+    # 같은 사진 재전송이면 캐시된 응답 그대로 반환 (url 모드는 이미지가 아직 보관 중일 때만)
+    cache_key = detection_cache.key(data, return_image, grouped_only_boxes, image_mode, box_format)
+    cached = detection_cache.get(cache_key)
+    if cached is not None:
+        cached_id, body = cached
+        if not (return_image and image_mode == "url") or render_store.has(cached_id):
+            return body, True
+
+    # 업로드 파일 → PIL RGB (추론 크기 근처로 바로 디코딩, EXIF 회전 반영)
+    try:
+        with span("detect.decode"):
+            decoded = await run_in_threadpool(decode_upload, data)
+    except ImageTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except (UnidentifiedImageError, OSError) as e:
+        raise HTTPException(status_code=400, detail=f"이미지를 읽을 수 없습니다: {e}")
+    pil_img = decoded.image
+
+    # 추론 (배칭 대기열 경유, 서버 설정값 그대로 사용)
+    # detect.infer = 대기열 대기 + 배치 forward, yolo.* = ultralytics가 잰 이미지 1장 기준 시간 (postprocess에 NMS 포함)
+    try:
+        with span("detect.infer"):
+            res = await inference_batcher.submit(pil_img)
+    except QueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+    for stage in ("preprocess", "inference", "postprocess"):
+        if stage in res.speed:
+            observe_ms(f"yolo.{stage}", res.speed[stage])
 
     xyxy = res.boxes.xyxy.tolist() if res.boxes is not None else []
     cls  = [int(c) for c in (res.boxes.cls.tolist() if res.boxes is not None else [])]
 
+    # 코스 제보 누적 (메모리에만 쌓고 DB는 주기적으로 일괄 반영 / 같은 사진 재전송=캐시 적중은 세지 않음)
+    if location is not None and cls and settings.REPORT_INGEST_ENABLED and startup.is_ready("trails"):
+        report_ingestor.submit(*location)
+
     # 집계 (세부 & 묶음)
     fine_counts, grouped_counts = {}, {}
     for k in cls:
@@ -102,24 +173,259 @@ async def predict(
         fine_counts[fine] = fine_counts.get(fine, 0) + 1
         grouped_counts[group] = grouped_counts.get(group, 0) + 1
 
-    # 박스 목록 (묶음 라벨만; 점수는 0.0 고정)
-    boxes = []
-    for (x1, y1, x2, y2), k in zip(xyxy, cls):
-        label = GROUP_MAP_0BASED.get(k, "기타") if grouped_only_boxes \
-                else FINE_LABELS_0BASED.get(k, f"UNK_{k}")
-        boxes.append(Box(cls=k, label=label, conf=0.0,
-                         x1=float(x1), y1=float(y1), x2=float(x2), y2=float(y2)))
-
-    # 이미지(base64)
-    img_b64 = draw_grouped_boxes_pil(pil_img, xyxy, cls) if return_image else None
-
-    payload = PredictResponse(
-        boxes=boxes,
-        time_ms=float(res.speed.get("inference", 0.0)),
-        counts=Counts(fine=fine_counts, grouped=grouped_counts),
-        image_base64=img_b64
+    # 박스 목록 - 좌표는 원본 이미지 기준
+    boxes = encode_boxes(decoded.to_original(xyxy), cls, grouped_only_boxes, box_format)
+
+    # 이미지 - 축소 디코딩한 이미지에 그대로 그림 (원본 크기로 되돌리지 않음, 크기는 image_width/height로 알림)
+    detection_id = uuid.uuid4().hex
+    img_b64, img_url = None, None
+    img_w, img_h = pil_img.size if return_image else (None, None)
+    if return_image and image_mode == "url":
+        # 렌더링은 워커에 맡기고 응답은 바로 반환
+        render_store.submit(detection_id, render_grouped_boxes_jpeg, pil_img, xyxy, cls)
+        img_url = str(request.url_for("trash_image", detection_id=detection_id))
+    elif return_image:
+        with span("detect.render"):
+            img_b64 = _to_data_url(await render_store.render(detection_id, render_grouped_boxes_jpeg, pil_img, xyxy, cls))
+
+    # PredictResponse 모양의 dict를 바로 바이트로 (내부 값이라 모델 생성/검증 생략)
+    payload = {
+        "boxes": boxes,
+        "time_ms": float(res.speed.get("inference", 0.0)),
+        "counts": {"fine": fine_counts, "grouped": grouped_counts},
+        "image_base64": img_b64,
+        "detection_id": detection_id,
+        "image_url": img_url,
+        "image_width": img_w,
+        "image_height": img_h,
+    }
+    with span("detect.serialize"):
+        body = dumps(payload)
+    detection_cache.put(cache_key, detection_id, body)
+    return body, False
+
+@router.post("/predict", response_model=PredictResponse, dependencies=[Depends(startup.require("model"))])
+async def predict(
+    request: Request,
+    file: UploadFile = File(...),
+    return_image: bool = Query(True),
+    grouped_only_boxes: bool = Query(True),
+    # inline: base64를 응답에 포함 / url: 백그라운드 렌더링 후 GET /images/{id}로 조회
+    image_mode: Literal["inline", "url"] = Query("inline"),
+    # objects: 박스별 객체 목록 / columns: 필드별 배열 (박스가 많을 때 응답이 작음)
+    box_format: Literal["objects", "columns"] = Query("objects"),
+    # 촬영 위치 (선택) - 쓰레기가 탐지되면 가까운 코스의 제보 수에 반영
+    lat: float | None = Query(None, ge=-90, le=90),
+    lng: float | None = Query(None, ge=-180, le=180),
+):
+    with span("detect.upload"):
+        data = await file.read()
+    body, hit = await _detect_bytes(request, data, return_image, grouped_only_boxes, image_mode, box_format,
+                                    _location(lat, lng))
+    return Response(content=body, media_type="application/json",
+                    headers={"X-Detection-Cache": "hit" if hit else "miss"})
+
+# -----------------------------
+# 일괄 탐지 (여러 장 / zip → NDJSON 스트리밍)
+# -----------------------------
+def _detach_spool(upload: UploadFile):
+    """
+    FastAPI는 핸들러가 끝나면(스트리밍 시작 전) 업로드 파일을 닫는다.
+    스트리밍 중에 읽어야 하므로 임시파일 소유권을 가져오고 닫는 책임도 가져온다.
+    """
+    spool = upload.file
+    upload.file = io.BytesIO()
+    return spool
+
+def _read_limited(fp, limit: int) -> bytes:
+    data = fp.read(limit + 1)
+    if len(data) > limit:
+        raise HTTPException(status_code=413, detail=f"이미지가 너무 큽니다 (최대 {limit >> 20}MB)")
+    return data
+
+def _collect_batch_items(files: List[UploadFile], limit: int):
+    """
+    업로드 목록 → (파일명, 로더) 목록과 닫아야 할 핸들 목록.
+    zip은 목록만 읽고 내용은 로더 호출 시 한 장씩 압축 해제 → 메모리는 처리 중인 장 수에 비례.
+    """
+    items, handles = [], []
+    try:
+        for upload in files:
+            spool = _detach_spool(upload)
+            handles.append(spool)
+            name = upload.filename or ""
+            if name.lower().endswith(".zip") or upload.content_type in ("application/zip", "application/x-zip-compressed"):
+                try:
+                    zf = zipfile.ZipFile(spool)
+                except zipfile.BadZipFile:
+                    raise HTTPException(status_code=400, detail=f"zip 파일을 읽을 수 없습니다: {name}")
+                handles.append(zf)
+                for info in zf.infolist():
+                    base = info.filename.rsplit("/", 1)[-1]
+                    if info.is_dir() or base.startswith(".") or not base.lower().endswith(IMAGE_EXTS):
+                        continue
+                    items.append((f"{name}/{info.filename}", lambda zf=zf, info=info: _read_zip_member(zf, info, limit)))
+            else:
+                items.append((name, lambda spool=spool: _read_limited(spool, limit)))
+    except BaseException:
+        _close_handles(handles)
+        raise
+    return items, handles
+
+def _read_zip_member(zf: zipfile.ZipFile, info: zipfile.ZipInfo, limit: int) -> bytes:
+    # 헤더 크기로 먼저 거르고, 헤더가 거짓이어도 limit 이상은 풀지 않음 (zip bomb 방지)
+    if info.file_size > limit:
+        raise HTTPException(status_code=413, detail=f"이미지가 너무 큽니다 (최대 {limit >> 20}MB)")
+    with zf.open(info) as fp:
+        return _read_limited(fp, limit)
+
+def _close_handles(handles):
+    for h in reversed(handles):
+        try:
+            h.close()
+        except Exception:
+            pass
+
+async def _detect_item(request: Request, index: int, filename: str, loader, opts) -> bytes:
+    """이미지 1장 → NDJSON 한 줄 (실패도 한 줄로 기록, 전체 요청은 계속)"""
+    name = dumps(filename)
+    head = b'{"index":%d,"filename":%s,' % (index, name)
+    try:
+        data = await run_in_threadpool(loader)
+        for attempt in range(3):
+            try:
+                body, _ = await _detect_bytes(request, data, *opts)
+                break
+            except HTTPException as e:
+                # 대기열이 잠깐 찬 경우는 조금 기다렸다 재시도 (다른 요청과 대기열 공유)
+                if e.status_code != 503 or attempt == 2:
+                    raise
+                await asyncio.sleep(0.2 * (attempt + 1))
+        return head + b'"result":' + body + b"}\n"
+    except HTTPException as e:
+        err = {"status": e.status_code, "error": e.detail}
+    except Exception as e:
+        err = {"status": 500, "error": f"처리 실패: {e}"}
+    return head + dumps(err)[1:] + b"\n"
+
+async def _stream_batch(request: Request, items, handles, opts, inflight: int):
+    """
+    동시에 inflight 장까지만 진행 (나머지는 읽지도 않음) → 메모리 상한.
+    끝나는 순서대로 한 줄씩 내보내고 마지막에 집계 요약.
+    """
+    fine_total, grouped_total = {}, {}
+    done_count, failed = 0, 0
+    pending = set()
+    next_index = 0
+    try:
+        while pending or next_index < len(items):
+            while next_index < len(items) and len(pending) < inflight:
+                filename, loader = items[next_index]
+                pending.add(asyncio.ensure_future(_detect_item(request, next_index, filename, loader, opts)))
+                next_index += 1
+            finished, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in finished:
+                line = task.result()
+                row = loads(line)
+                done_count += 1
+                if "result" in row:
+                    counts = row["result"]["counts"]
+                    for k, v in counts["fine"].items():
+                        fine_total[k] = fine_total.get(k, 0) + v
+                    for k, v in counts["grouped"].items():
+                        grouped_total[k] = grouped_total.get(k, 0) + v
+                else:
+                    failed += 1
+                yield line
+        summary = {
+            "summary": {
+                "images": done_count,
+                "failed": failed,
+                "counts": {"fine": fine_total, "grouped": grouped_total},
+            }
+        }
+        yield dumps(summary) + b"\n"
+    finally:
+        # 클라이언트가 끊으면 남은 작업 취소
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+        await run_in_threadpool(_close_handles, handles)
+
+@router.post("/predict-batch", dependencies=[Depends(startup.require("model"))])
+async def predict_batch(
+    request: Request,
+    files: List[UploadFile] = File(...),
+    return_image: bool = Query(False),
+    grouped_only_boxes: bool = Query(True),
+    image_mode: Literal["inline", "url"] = Query("url"),
+    box_format: Literal["objects", "columns"] = Query("objects"),
+    lat: float | None = Query(None, ge=-90, le=90),
+    lng: float | None = Query(None, ge=-180, le=180),
+):
+    """
+    여러 장(또는 zip)을 한 요청으로 탐지 → application/x-ndjson 스트리밍.
+    lat/lng를 주면 쓰레기가 탐지된 이미지마다 가까운 코스의 제보 1건으로 반영.
+    - 줄마다 {"index", "filename", "result": PredictResponse} 또는 {"index", "filename", "status", "error"}
+    - 마지막 줄 {"summary": {"images", "failed", "counts"}}
+    """
+    limit = settings.BATCH_MAX_IMAGE_MB << 20
+    items, handles = await run_in_threadpool(_collect_batch_items, files, limit)
+    if not items:
+        await run_in_threadpool(_close_handles, handles)
+        raise HTTPException(status_code=400, detail="처리할 이미지가 없습니다.")
+    if len(items) > settings.BATCH_MAX_IMAGES:
+        await run_in_threadpool(_close_handles, handles)
+        raise HTTPException(status_code=413, detail=f"이미지가 너무 많습니다 ({len(items)}장, 최대 {settings.BATCH_MAX_IMAGES}장)")
+
+    # 배칭 대기열이 한 배치를 채울 만큼만 동시에 넣음
+    inflight = settings.BATCH_INFLIGHT or settings.INFER_BATCH_SIZE
+    opts = (return_image, grouped_only_boxes, image_mode, box_format, _location(lat, lng))
+    return StreamingResponse(
+        _stream_batch(request, items, handles, opts, max(1, inflight)),
+        media_type="application/x-ndjson",
+    )
+
+DETECTION_ID_RE = re.compile(r"^[0-9a-f]{32}$")
+
+# 박스 그려진 결과 이미지 (image_mode=url 응답의 image_url, 축소 디코딩 크기 = 응답의 image_width/height)
+@router.get("/images/{detection_id}", name="trash_image")
+async def get_image(detection_id: str):
+    if not DETECTION_ID_RE.match(detection_id):
+        raise HTTPException(status_code=404, detail="이미지를 찾을 수 없습니다.")
+    data = await render_store.get(detection_id)
+    if data is None:
+        raise HTTPException(status_code=404, detail="이미지를 찾을 수 없습니다.")
+    chunk = 64 * 1024
+    return StreamingResponse(
+        (data[i:i + chunk] for i in range(0, len(data), chunk)),
+        media_type="image/jpeg",
+        headers={"Content-Length": str(len(data)), "Cache-Control": "private, max-age=3600"},
     )
-    return JSONResponse(payload.model_dump())
+
+# 렌더링 보관소 상태
+@router.get("/render-stats")
+def render_stats():
+    return render_store.metrics()
+
+# 탐지 결과 캐시 상태 (적중률, 메모리 사용량)
+@router.get("/cache-stats")
+def cache_stats():
+    return detection_cache.metrics()
+
+# 배칭 대기열 상태 (대기 수, 평균 배치 크기, 거절 수)
+@router.get("/queue-stats")
+def queue_stats():
+    stats = inference_batcher.metrics()
+    if inference_batcher.pool is not None:
+        stats["pool"] = inference_batcher.pool.metrics()
+    return stats
+
+# 위치 제보 누적/반영 상태 (대기 중인 증가분, 반영 주기당 행 수, 실패 수)
+@router.get("/report-stats")
+def report_stats():
+    return report_ingestor.metrics()
 
 # main.py에서 별칭(/ai/detect)로 재사용하기 위한 참조
 # (app.add_api_route(..., endpoint=trash_predict, ...))
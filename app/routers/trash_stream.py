@@ -0,0 +1,156 @@
+import time
+import asyncio
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+from fastapi.concurrency import run_in_threadpool
+from PIL import UnidentifiedImageError
+from app.core.config import settings
+from app.core.startup import startup
+from app.core.metrics import span
+from app.core.serialization import dumps, loads
+from app.services.image_io import decode_upload, ImageTooLarge
+from app.services.inference_queue import inference_batcher, QueueFullError
+from app.services.stream_detect import LatestFrame, FrameRateController, BoxDeltaEncoder, stream_metrics
+from app.routers.trash import GROUP_MAP_0BASED, FINE_LABELS_0BASED
+
+router = APIRouter()
+
+# 종료 코드 (RFC 6455)
+CLOSE_TOO_BIG = 1009
+CLOSE_TRY_AGAIN = 1013
+
+
+class _Session:
+    """연결 1개 상태 (수신 태스크와 처리 루프가 공유)"""
+
+    def __init__(self, max_fps: float, grouped_only_boxes: bool):
+        self.slot = LatestFrame()
+        self.rate = FrameRateController(max_fps=max_fps, max_interval_ms=settings.STREAM_MAX_INTERVAL_MS)
+        self.delta = BoxDeltaEncoder(tolerance_px=settings.STREAM_BOX_TOLERANCE_PX)
+        self.grouped_only_boxes = grouped_only_boxes
+        self.received = 0
+        self.dropped = 0      # 누적
+        self.unreported = 0   # 마지막 응답 이후 버린 프레임 수
+
+    def label(self, k: int) -> str:
+        if self.grouped_only_boxes:
+            return GROUP_MAP_0BASED.get(k, "기타")
+        return FINE_LABELS_0BASED.get(k, f"UNK_{k}")
+
+
+async def _send(ws: WebSocket, msg: dict):
+    await ws.send_text(dumps(msg).decode("utf-8"))
+
+
+async def _receive_frames(ws: WebSocket, session: _Session):
+    """
+    바이너리 메시지 = 압축 프레임(JPEG 등), 텍스트 메시지 = 설정 JSON ({"max_fps": 5}).
+    처리 중이면 이전 프레임을 덮어쓴다. 종료/유휴/오류 시 보관함을 닫아 처리 루프를 끝낸다.
+    """
+    limit = settings.STREAM_MAX_FRAME_KB << 10
+    try:
+        while True:
+            msg = await asyncio.wait_for(ws.receive(), timeout=settings.STREAM_IDLE_TIMEOUT_SEC)
+            if msg["type"] == "websocket.disconnect":
+                return
+            data = msg.get("bytes")
+            if data is not None:
+                if len(data) > limit:
+                    await ws.close(code=CLOSE_TOO_BIG, reason=f"프레임이 너무 큽니다 (최대 {settings.STREAM_MAX_FRAME_KB}KB)")
+                    return
+                session.received += 1
+                stream_metrics.received += 1
+                if session.slot.put(session.received, data):
+                    session.dropped += 1
+                    session.unreported += 1
+                    stream_metrics.dropped += 1
+            elif msg.get("text"):
+                try:
+                    fps = float(loads(msg["text"]).get("max_fps"))
+                except (ValueError, TypeError, AttributeError):
+                    continue
+                session.rate.max_fps = min(max(fps, 0.1), settings.STREAM_MAX_FPS)
+    except asyncio.TimeoutError:
+        await ws.close(code=1000, reason="유휴 시간 초과")
+    except (WebSocketDisconnect, RuntimeError):
+        pass
+    finally:
+        session.slot.close()
+
+
+async def _process_frame(seq: int, data: bytes, session: _Session) -> dict:
+    """프레임 1장 → 응답 dict (직전 응답 대비 변화만)"""
+    try:
+        with span("stream.decode"):
+            decoded = await run_in_threadpool(decode_upload, data, settings.STREAM_DECODE_MAX_SIDE)
+    except (ImageTooLarge, UnidentifiedImageError, OSError) as e:
+        stream_metrics.errors += 1
+        return {"seq": seq, "error": f"이미지를 읽을 수 없습니다: {e}"}
+
+    # HTTP 탐지와 같은 배칭 대기열 (대기열이 가득 차면 이 프레임은 건너뛰고 간격을 늘림)
+    try:
+        with span("stream.infer"):
+            res = await inference_batcher.submit(decoded.image)
+    except QueueFullError:
+        stream_metrics.overloads += 1
+        return {"seq": seq, "busy": True, "next_ms": round(session.rate.overload())}
+
+    boxes = res.boxes
+    xyxy = decoded.to_original(boxes.xyxy.tolist()) if boxes is not None else []
+    cls = [int(c) for c in boxes.cls.tolist()] if boxes is not None else []
+    return {"seq": seq, **session.delta.encode(xyxy, [session.label(k) for k in cls])}
+
+
+@router.websocket("/stream")
+async def stream(ws: WebSocket, grouped_only_boxes: bool = True, max_fps: float | None = None):
+    """
+    실시간 카메라 탐지 (WebSocket).
+    - 클라이언트 → 서버: 바이너리 프레임(JPEG), 선택적으로 텍스트 {"max_fps": n}
+    - 서버 → 클라이언트: 처리한 프레임마다
+      {"seq", "ms", "next_ms", "dropped", "boxes"?: {"label": [...], "xyxy": [...]}, "counts"?: {라벨: 개수}}
+      boxes/counts는 직전 응답 대비 바뀌었을 때만 포함. next_ms는 권장 전송 간격.
+    - 추론이 밀리면 최신 프레임만 처리하고 나머지는 버린다 (dropped = 누적 버린 수)
+    """
+    await ws.accept()
+    if not startup.is_ready("model"):
+        await ws.close(code=CLOSE_TRY_AGAIN, reason="서비스 준비 중입니다: model")
+        return
+    if stream_metrics.active >= settings.STREAM_MAX_SESSIONS:
+        await ws.close(code=CLOSE_TRY_AGAIN, reason="동시 스트림 수 초과")
+        return
+
+    session = _Session(min(max_fps or settings.STREAM_MAX_FPS, settings.STREAM_MAX_FPS), grouped_only_boxes)
+
+    stream_metrics.active += 1
+    stream_metrics.sessions += 1
+    receiver = asyncio.create_task(_receive_frames(ws, session))
+    try:
+        await _send(ws, {"type": "ready", "next_ms": round(session.rate.interval_ms),
+                         "max_frame_kb": settings.STREAM_MAX_FRAME_KB})
+        while True:
+            item = await session.slot.get()
+            if item is None:
+                break
+            seq, data = item
+            t0 = time.perf_counter()
+            msg = await _process_frame(seq, data, session)
+            proc_ms = (time.perf_counter() - t0) * 1000
+            if "error" not in msg and "busy" not in msg:
+                stream_metrics.processed += 1
+                stream_metrics.proc_ms += proc_ms
+                msg["next_ms"] = round(session.rate.update(proc_ms, session.unreported))
+                msg["ms"] = round(proc_ms, 1)
+            session.unreported = 0
+            msg["dropped"] = session.dropped
+            await _send(ws, msg)
+    except (WebSocketDisconnect, RuntimeError):
+        pass   # 전송 중 연결 끊김
+    finally:
+        stream_metrics.active -= 1
+        receiver.cancel()
+        await asyncio.gather(receiver, return_exceptions=True)
+
+
+# 스트리밍 세션 상태 (프레임 수신/처리/버림)
+@router.get("/stream-stats")
+def stream_stats():
+    return stream_metrics.metrics()
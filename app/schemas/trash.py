@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Union
 
 class Box(BaseModel):
     cls: int
@@ -10,12 +10,32 @@ class Box(BaseModel):
     x2: float
     y2: float
 
+class BoxColumns(BaseModel):
+    """box_format=columns: 필드별 배열 (i번째 박스 = 각 배열의 i번째 값)"""
+    cls: List[int]
+    label: List[str]
+    conf: List[float]
+    x1: List[float]
+    y1: List[float]
+    x2: List[float]
+    y2: List[float]
+
 class Counts(BaseModel):
     fine: Dict[str, int]     # 세부 클래스별 개수 (예: 종이컵, 갈색 유리…)
     grouped: Dict[str, int]  # 분리수거 7종 묶음 (예: 종이/캔/유리/플라스틱/비닐/스티로폼/건전지)
 
 class PredictResponse(BaseModel):
-    boxes: List[Box]
+    """
+    좌표 공간이 다르다:
+    - boxes: 업로드 원본 이미지 픽셀 (EXIF 회전 적용 후)
+    - image_base64/image_url: 긴 변 DECODE_MAX_SIDE 이하로 축소 디코딩한 이미지에 그림 → 크기는 image_width/image_height
+      (원본 좌표 × image_width / 원본 너비 = 그린 이미지 좌표)
+    """
+    boxes: Union[List[Box], BoxColumns]
     time_ms: float
     counts: Counts
-    image_base64: Optional[str] = None  # 박스 그려진 이미지 (data URL 형식)
+    image_base64: Optional[str] = None  # 박스 그려진 이미지 (data URL 형식, image_mode=inline, 축소 이미지)
+    detection_id: Optional[str] = None  # 탐지 결과 ID
+    image_url: Optional[str] = None     # 박스 그려진 이미지 조회 URL (image_mode=url, 축소 이미지)
+    image_width: Optional[int] = None   # 박스 그려진 이미지 너비 (return_image일 때)
+    image_height: Optional[int] = None  # 박스 그려진 이미지 높이 (return_image일 때)
@@ -0,0 +1,165 @@
+import math
+import numpy as np
+
+
+class SortedVocab:
+    """
+    용어 → 번호 조회를 정렬된 고정폭 UTF-8 배열(np.bytes_)의 이진 탐색으로 (dict 대신, mmap 배열 그대로 사용).
+    번호는 배열 위치.
+    """
+
+    def __init__(self, terms: np.ndarray):
+        self.terms = terms
+        self.width = terms.dtype.itemsize
+
+    def get(self, term: str, default=None):
+        key = term.encode("utf-8")
+        if not key or len(key) > self.width or not len(self.terms):
+            return default
+        i = int(np.searchsorted(self.terms, key))
+        if i < len(self.terms) and self.terms[i] == key:
+            return i
+        return default
+
+    def __len__(self):
+        return len(self.terms)
+
+
+class InvertedBM25:
+    """
+    역색인 BM25 (Okapi). rank_bm25.BM25Okapi와 같은 점수를 내되
+    질의어가 들어 있는 문서의 posting만 훑는다.
+
+    - corpus: 문서별 토큰 리스트, 또는 {필드: 토큰 리스트}
+    - weights: 필드 가중치 - 가중치 w인 필드는 토큰을 w번 복제한 것과 같은 tf/문서 길이
+    - posting은 용어별로 이어 붙인 배열(CSR): indptr[t]:indptr[t+1] 구간이 용어 t의 (문서 번호, tf)
+    - IDF(음수는 epsilon * 평균 IDF로 대체)와 문서 길이 정규화 항은 미리 계산
+    """
+
+    def __init__(self, corpus: list, weights: dict | None = None, k1: float = 1.5, b: float = 0.75, epsilon: float = 0.25):
+        self.k1 = k1
+        self.b = b
+        self.epsilon = epsilon
+        self.weights = dict(weights or {})
+        self.corpus_size = len(corpus)
+
+        vocab = {}                       # 용어 → 번호 (처음 등장한 순서 = BM25Okapi의 IDF 합산 순서)
+        term_ids, doc_ids, tfs = [], [], []
+        doc_len = np.zeros(self.corpus_size)
+        for d, doc in enumerate(corpus):
+            fields = doc.items() if isinstance(doc, dict) else (("", doc),)
+            freqs = {}
+            length = 0.0
+            for field, tokens in fields:
+                w = float(self.weights.get(field, 1.0))
+                for tok in tokens:
+                    freqs[tok] = freqs.get(tok, 0.0) + w
+                length += w * len(tokens)
+            doc_len[d] = length
+            for term, f in freqs.items():
+                term_ids.append(vocab.setdefault(term, len(vocab)))
+                doc_ids.append(d)
+                tfs.append(f)
+
+        self.vocab = vocab
+        term_ids = np.asarray(term_ids, dtype=np.int32)
+        order = np.argsort(term_ids, kind="stable")   # 용어별로 묶고, 같은 용어 안에서는 문서 번호 순
+        self.doc_ids = np.asarray(doc_ids, dtype=np.int32)[order]
+        self.tfs = np.asarray(tfs, dtype=np.float64)[order]
+        df = np.bincount(term_ids, minlength=len(vocab))
+        self.indptr = np.zeros(len(vocab) + 1, dtype=np.int64)
+        np.cumsum(df, out=self.indptr[1:])
+
+        self.avgdl = float(doc_len.sum()) / self.corpus_size
+        # 문서별 k1 * (1 - b + b * |d| / avgdl) - BM25Okapi와 같은 연산 순서 (모든 문서가 비었으면 길이 항 0)
+        avgdl = self.avgdl or 1.0
+        self.norm = self.k1 * (1 - self.b + self.b * doc_len / avgdl)
+
+        # IDF: BM25Okapi와 같은 식/순서 (평균 IDF가 합산 순서에 따라 미세하게 달라지지 않게)
+        idf = np.empty(len(vocab))
+        idf_sum = 0.0
+        n = self.corpus_size
+        for t, freq in enumerate(df.tolist()):
+            v = math.log(n - freq + 0.5) - math.log(freq + 0.5)
+            idf[t] = v
+            idf_sum += v
+        self.average_idf = idf_sum / len(vocab) if len(vocab) else 0.0
+        idf[idf < 0] = self.epsilon * self.average_idf
+        self.idf = idf
+
+    # 배열로 내보내기/불러오기 (여러 프로세스가 mmap으로 공유하는 읽기 전용 파일용)
+    ARRAYS = ("terms", "indptr", "doc_ids", "tfs", "idf", "norm")
+
+    def to_arrays(self) -> tuple:
+        """
+        ({이름: 배열}, 메타 dict). 용어는 UTF-8 바이트 순으로 정렬해 SortedVocab으로 찾는다.
+        용어별 posting 구간과 값은 그대로 옮기므로 점수는 같다.
+        """
+        terms = list(self.vocab)
+        encoded = np.array([t.encode("utf-8") for t in terms], dtype=bytes) if terms else np.zeros(0, dtype="S1")
+        order = np.argsort(encoded, kind="stable")
+        df = np.diff(self.indptr)[order]
+        indptr = np.zeros(len(order) + 1, dtype=np.int64)
+        np.cumsum(df, out=indptr[1:])
+        # 새 위치 i의 posting = 원래 구간 시작 + (i - 새 구간 시작)
+        take = np.repeat(self.indptr[:-1][order] - indptr[:-1], df) + np.arange(indptr[-1])
+        arrays = {
+            "terms": encoded[order],
+            "indptr": indptr,
+            "doc_ids": self.doc_ids[take],
+            "tfs": self.tfs[take],
+            "idf": self.idf[order],
+            "norm": self.norm,
+        }
+        meta = {
+            "k1": self.k1, "b": self.b, "epsilon": self.epsilon, "weights": self.weights,
+            "corpus_size": self.corpus_size, "avgdl": self.avgdl, "average_idf": self.average_idf,
+        }
+        return arrays, meta
+
+    @classmethod
+    def from_arrays(cls, arrays: dict, meta: dict) -> "InvertedBM25":
+        """to_arrays 결과(또는 같은 이름의 mmap 배열)로 생성 - 배열은 복사하지 않는다"""
+        self = cls.__new__(cls)
+        self.k1, self.b, self.epsilon = meta["k1"], meta["b"], meta["epsilon"]
+        self.weights = dict(meta["weights"])
+        self.corpus_size = meta["corpus_size"]
+        self.avgdl = meta["avgdl"]
+        self.average_idf = meta["average_idf"]
+        self.vocab = SortedVocab(arrays["terms"])
+        self.indptr = arrays["indptr"]
+        self.doc_ids = arrays["doc_ids"]
+        self.tfs = arrays["tfs"]
+        self.idf = arrays["idf"]
+        self.norm = arrays["norm"]
+        return self
+
+    def get_scores(self, query: list) -> np.ndarray:
+        """문서별 점수 (질의어 중복은 BM25Okapi처럼 중복해서 더함)"""
+        scores = np.zeros(self.corpus_size)
+        k1p1 = self.k1 + 1
+        for q in query:
+            t = self.vocab.get(q)
+            if t is None:
+                continue
+            lo, hi = self.indptr[t], self.indptr[t + 1]
+            d = self.doc_ids[lo:hi]
+            tf = self.tfs[lo:hi]
+            scores[d] += self.idf[t] * (tf * k1p1 / (tf + self.norm[d]))
+        return scores
+
+    def postings(self, term: str) -> int:
+        """용어가 들어 있는 문서 수"""
+        t = self.vocab.get(term)
+        return 0 if t is None else int(self.indptr[t + 1] - self.indptr[t])
+
+    def stats(self) -> dict:
+        return {
+            "documents": self.corpus_size,
+            "terms": len(self.vocab),
+            "postings": int(len(self.doc_ids)),
+            "avgdl": round(self.avgdl, 3),
+            "weights": self.weights,
+            "bytes": int(self.doc_ids.nbytes + self.tfs.nbytes + self.indptr.nbytes
+                         + self.idf.nbytes + self.norm.nbytes),
+        }
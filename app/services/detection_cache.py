@@ -0,0 +1,157 @@
+import os
+import hashlib
+import threading
+from collections import OrderedDict
+from app.core.config import settings
+
+# 응답 JSON 모양이 바뀌면 올려서 디스크에 남은 예전 응답을 쓰지 않게 한다
+RESPONSE_FORMAT_VERSION = 2
+
+
+def model_fingerprint() -> str:
+    """결과에 영향을 주는 모델/설정 값 (바뀌면 기존 캐시는 자동으로 무효)"""
+    try:
+        mtime = int(os.path.getmtime(settings.WEIGHTS_PATH))
+    except OSError:
+        mtime = 0
+    parts = [
+        str(RESPONSE_FORMAT_VERSION), settings.WEIGHTS_PATH, str(mtime), settings.INFER_BACKEND, str(settings.INFER_INT8),
+        str(settings.IMG_SIZE), str(settings.CONF), str(settings.IOU), str(settings.DECODE_MAX_SIDE),
+    ]
+    return hashlib.blake2b("|".join(parts).encode("utf-8"), digest_size=8).hexdigest()
+
+
+class DetectionCache:
+    """
+    업로드 바이트 해시 → 직렬화된 PredictResponse(JSON 바이트) 캐시.
+    - 메모리: 바이트 상한 LRU
+    - 디스크(선택): 파일 수 상한, 메모리에서 밀려난 항목도 재사용
+    재전송/재시도 업로드가 YOLO 추론을 다시 타지 않게 한다.
+    """
+
+    def __init__(self, max_bytes: int = 32 << 20, disk_dir: str | None = None, disk_max_files: int = 5000):
+        self.max_bytes = max_bytes
+        self.disk_dir = disk_dir
+        self.disk_max_files = disk_max_files
+        self.fingerprint = model_fingerprint()
+        self._lock = threading.Lock()
+        self._mem = OrderedDict()   # key → (detection_id, body)
+        self._mem_bytes = 0
+        self._disk_files = OrderedDict()
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+            names = sorted(
+                (f for f in os.listdir(disk_dir) if f.endswith(".json")),
+                key=lambda f: os.path.getmtime(os.path.join(disk_dir, f)),
+            )
+            for f in names:
+                self._disk_files[f[:-5]] = None
+        # 지표
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evicted = 0
+
+    def key(self, data: bytes, *options) -> str:
+        h = hashlib.blake2b(data, digest_size=16)
+        h.update(self.fingerprint.encode("ascii"))
+        for opt in options:
+            h.update(b"|" + str(opt).encode("utf-8"))
+        return h.hexdigest()
+
+    # -----------------------------
+    # 조회/저장
+    # -----------------------------
+    def get(self, key: str):
+        """(detection_id, JSON 바이트) 또는 None"""
+        with self._lock:
+            entry = self._mem.get(key)
+            if entry is not None:
+                self._mem.move_to_end(key)
+                self.hits += 1
+                return entry
+            on_disk = key in self._disk_files
+        if on_disk:
+            try:
+                with open(self._disk_path(key), "rb") as f:
+                    detection_id, body = f.read().split(b"\n", 1)
+            except (OSError, ValueError):
+                pass
+            else:
+                entry = (detection_id.decode("ascii"), body)
+                self._put_mem(key, entry)
+                with self._lock:
+                    self.hits += 1
+                    self.disk_hits += 1
+                return entry
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key: str, detection_id: str, body: bytes):
+        self._put_mem(key, (detection_id, body))
+        if self.disk_dir:
+            self._put_disk(key, detection_id, body)
+
+    def _put_mem(self, key: str, entry):
+        size = len(entry[1])
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._mem.pop(key, None)
+            if old is not None:
+                self._mem_bytes -= len(old[1])
+            self._mem[key] = entry
+            self._mem_bytes += size
+            while self._mem_bytes > self.max_bytes:
+                _, dropped = self._mem.popitem(last=False)
+                self._mem_bytes -= len(dropped[1])
+                self.evicted += 1
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, f"{key}.json")
+
+    def _put_disk(self, key: str, detection_id: str, body: bytes):
+        path = self._disk_path(key)
+        tmp = f"{path}.tmp"
+        try:
+            with open(tmp, "wb") as f:
+                f.write(detection_id.encode("ascii") + b"\n" + body)
+            os.replace(tmp, path)
+        except OSError as e:
+            print("[DETECTION_CACHE] 디스크 저장 실패:", e)
+            return
+        with self._lock:
+            self._disk_files[key] = None
+            self._disk_files.move_to_end(key)
+            stale = []
+            while len(self._disk_files) > self.disk_max_files:
+                stale.append(self._disk_files.popitem(last=False)[0])
+        for old in stale:
+            try:
+                os.remove(self._disk_path(old))
+            except FileNotFoundError:
+                pass
+
+    def metrics(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "fingerprint": self.fingerprint,
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / total, 4) if total else None,
+                "memory_items": len(self._mem),
+                "memory_bytes": self._mem_bytes,
+                "max_bytes": self.max_bytes,
+                "disk_items": len(self._disk_files),
+                "evicted": self.evicted,
+            }
+
+
+detection_cache = DetectionCache(
+    max_bytes=settings.DETECTION_CACHE_MB << 20,
+    disk_dir=settings.DETECTION_CACHE_DIR,
+    disk_max_files=settings.DETECTION_CACHE_DISK_MAX_FILES,
+)
@@ -1,4 +1,7 @@
 import math
+import numpy as np
+
+EARTH_RADIUS_KM = 6371  # 지구 반지름 (km)
 
 def haversine(coord1, coord2):
     """
@@ -7,10 +10,160 @@ def haversine(coord1, coord2):
     """
     lat1, lon1 = coord1
     lat2, lon2 = coord2
-    R = 6371  # 지구 반지름 (km)
+    R = EARTH_RADIUS_KM
     phi1 = math.radians(lat1)
     phi2 = math.radians(lat2)
     dphi = math.radians(lat2 - lat1)
     dlambda = math.radians(lon2 - lon1)
     a = math.sin(dphi/2)**2 + math.cos(phi1)*math.cos(phi2)*math.sin(dlambda/2)**2
-    return R * (2 * math.atan2(math.sqrt(a), math.sqrt(1 - a)))
\ No newline at end of file
+    return R * (2 * math.atan2(math.sqrt(a), math.sqrt(1 - a)))
+
+# -----------------------------
+# 배열 단위 거리 (좌표 컬럼은 라디안, cos(위도)는 미리 계산해 두면 재사용)
+# -----------------------------
+def to_radians(lats, lngs):
+    """
+    위도/경도 목록(도, None 허용) → (lat_rad, lng_rad, cos_lat, valid) 배열.
+    좌표가 없거나 0인 행은 valid=False, 라디안 값 0 (코스 좌표의 `if lat and lng` 규칙과 같음).
+    """
+    lat = np.array([np.nan if v is None else v for v in lats], dtype=float)
+    lng = np.array([np.nan if v is None else v for v in lngs], dtype=float)
+    valid = np.isfinite(lat) & np.isfinite(lng) & (lat != 0) & (lng != 0)
+    lat_rad = np.where(valid, np.radians(np.where(valid, lat, 0.0)), 0.0)
+    lng_rad = np.where(valid, np.radians(np.where(valid, lng, 0.0)), 0.0)
+    return lat_rad, lng_rad, np.cos(lat_rad), valid
+
+def haversine_to_many(lat, lng, lats_rad, lngs_rad, cos_lats=None):
+    """
+    한 좌표(lat, lng: 도 단위) → 여러 좌표(라디안 배열)까지 거리(km) 배열.
+    haversine()과 같은 식을 NumPy로 한 번에 계산.
+    cos_lats: np.cos(lats_rad)를 미리 계산해 두었으면 전달 (요청마다 cos 계산 생략)
+    """
+    R = EARTH_RADIUS_KM
+    phi1 = math.radians(lat)
+    lam1 = math.radians(lng)
+    if cos_lats is None:
+        cos_lats = np.cos(lats_rad)
+    dphi = lats_rad - phi1
+    dlambda = lngs_rad - lam1
+    a = np.sin(dphi/2)**2 + math.cos(phi1)*cos_lats*np.sin(dlambda/2)**2
+    return R * (2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a)))
+
+def haversine_many_to_many(lats1_rad, lngs1_rad, lats2_rad, lngs2_rad, cos1=None, cos2=None):
+    """
+    좌표 n개 × m개 거리(km) 행렬 (n, m). 입력은 라디안 배열, cos1/cos2는 미리 계산한 cos(위도).
+    n×m 크기 임시 배열을 몇 개 만들므로 큰 입력은 호출측에서 행을 나눠 부른다.
+    """
+    lats1_rad = np.asarray(lats1_rad, dtype=float)[:, None]
+    lngs1_rad = np.asarray(lngs1_rad, dtype=float)[:, None]
+    cos1 = np.cos(lats1_rad) if cos1 is None else np.asarray(cos1, dtype=float)[:, None]
+    cos2 = np.cos(lats2_rad) if cos2 is None else cos2
+    a = np.sin((lats2_rad - lats1_rad) / 2) ** 2 + cos1 * cos2 * np.sin((lngs2_rad - lngs1_rad) / 2) ** 2
+    return EARTH_RADIUS_KM * (2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a)))
+
+def equirect_to_many(lat, lng, lats_rad, lngs_rad):
+    """
+    근거리용 등장방형 근사: 기준점 위도의 cos로 경도 차를 줄인 평면 거리 (점마다 삼각함수 없음).
+    haversine 대비 상대 오차 상한 ≈ (d/R)·(|tan φ| + d/R)/2 (d: 거리, φ: 기준 위도):
+    위도 45° 이하 10km 이내 0.08% 이하 (실측 최대 0.03%, 한반도 33~39°에서 10km 2.5m / 50km 61m).
+    수백 km 이상이나 고위도에서는 haversine_to_many를 쓴다. 경도 ±180° 경계는 감아서 계산.
+    """
+    phi1 = math.radians(lat)
+    lam1 = math.radians(lng)
+    dlambda = (lngs_rad - lam1 + math.pi) % (2 * math.pi) - math.pi
+    x = dlambda * math.cos(phi1)
+    y = lats_rad - phi1
+    return EARTH_RADIUS_KM * np.sqrt(x * x + y * y)
+
+def distance_to_many(lat, lng, lats_rad, lngs_rad, cos_lats=None, method: str = "haversine"):
+    """한 좌표 → 여러 좌표 거리(km). method: "haversine"(정확) | "equirect"(근거리 근사)"""
+    if method == "equirect":
+        return equirect_to_many(lat, lng, lats_rad, lngs_rad)
+    return haversine_to_many(lat, lng, lats_rad, lngs_rad, cos_lats)
+
+# -----------------------------
+# 반경 전처리용 경계 상자
+# -----------------------------
+def bbox_around(lat, lng, radius_km):
+    """
+    (lat, lng)에서 radius_km 안의 점을 모두 포함하는 (min_lat, min_lng, max_lat, max_lng) (도 단위).
+    극을 포함하거나 경도 ±180°를 넘으면 경도는 전 범위. TrailFilter.bbox에도 그대로 쓸 수 있다.
+    """
+    dlat = math.degrees(radius_km / EARTH_RADIUS_KM)
+    min_lat, max_lat = lat - dlat, lat + dlat
+    if min_lat <= -90 or max_lat >= 90:
+        return max(min_lat, -90.0), -180.0, min(max_lat, 90.0), 180.0
+    # 반경 원에 접하는 경선까지의 경도 차 (가장 넓은 위도 기준)
+    ratio = math.sin(radius_km / EARTH_RADIUS_KM) / math.cos(math.radians(lat))
+    dlng = math.degrees(math.asin(min(1.0, ratio)))
+    if lng - dlng < -180 or lng + dlng > 180:
+        return min_lat, -180.0, max_lat, 180.0
+    return min_lat, lng - dlng, max_lat, lng + dlng
+
+def in_bbox(lats_rad, lngs_rad, bbox):
+    """라디안 좌표 배열 중 bbox(도 단위) 안에 있는 행 (bool 배열)"""
+    min_lat, min_lng, max_lat, max_lng = (math.radians(v) for v in bbox)
+    return (lats_rad >= min_lat) & (lats_rad <= max_lat) & (lngs_rad >= min_lng) & (lngs_rad <= max_lng)
+
+def within_radius(lat, lng, lats_rad, lngs_rad, radius_km, cos_lats=None, valid=None, method: str = "haversine"):
+    """
+    반경 radius_km 안의 (거리 km 배열, 위치 배열), 가까운 순.
+    경계 상자로 먼저 거른 뒤 남은 행만 거리 계산 (공간 인덱스가 없는 작은/일회성 배열용).
+    """
+    mask = in_bbox(lats_rad, lngs_rad, bbox_around(lat, lng, radius_km))
+    if valid is not None:
+        mask &= valid
+    pos = np.flatnonzero(mask)
+    dist = distance_to_many(lat, lng, lats_rad[pos], lngs_rad[pos],
+                            None if cos_lats is None else cos_lats[pos], method)
+    keep = dist <= radius_km
+    pos, dist = pos[keep], dist[keep]
+    order = np.argsort(dist, kind="stable")
+    return dist[order], pos[order]
+
+_GEOHASH_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+def geohash_encode(lat, lng, precision: int = 7) -> str:
+    """위도/경도 → geohash 문자열 (precision 자리)"""
+    lat_lo, lat_hi = -90.0, 90.0
+    lng_lo, lng_hi = -180.0, 180.0
+    chars, bits, ch, even = [], 0, 0, True
+    while len(chars) < precision:
+        if even:
+            mid = (lng_lo + lng_hi) / 2
+            if lng >= mid:
+                ch = (ch << 1) | 1; lng_lo = mid
+            else:
+                ch <<= 1; lng_hi = mid
+        else:
+            mid = (lat_lo + lat_hi) / 2
+            if lat >= mid:
+                ch = (ch << 1) | 1; lat_lo = mid
+            else:
+                ch <<= 1; lat_hi = mid
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(_GEOHASH_BASE32[ch])
+            bits, ch = 0, 0
+    return "".join(chars)
+
+def geohash_center(code: str):
+    """geohash 칸의 중심 (lat, lng)"""
+    lat_lo, lat_hi = -90.0, 90.0
+    lng_lo, lng_hi = -180.0, 180.0
+    even = True
+    for c in code:
+        v = _GEOHASH_BASE32.index(c)
+        for shift in range(4, -1, -1):
+            bit = (v >> shift) & 1
+            if even:
+                mid = (lng_lo + lng_hi) / 2
+                if bit: lng_lo = mid
+                else: lng_hi = mid
+            else:
+                mid = (lat_lo + lat_hi) / 2
+                if bit: lat_lo = mid
+                else: lat_hi = mid
+            even = not even
+    return ((lat_lo + lat_hi) / 2, (lng_lo + lng_hi) / 2)
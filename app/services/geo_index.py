@@ -0,0 +1,73 @@
+import math
+import numpy as np
+from scipy.spatial import cKDTree
+from app.services.geo import EARTH_RADIUS_KM
+
+
+def _to_unit_xyz(lat_rad, lng_rad):
+    cos_lat = np.cos(lat_rad)
+    return np.column_stack((cos_lat * np.cos(lng_rad), cos_lat * np.sin(lng_rad), np.sin(lat_rad)))
+
+
+def _km_to_chord(km: float) -> float:
+    # 구면 거리(km) → 단위구 위 직선(현) 거리
+    return 2.0 * math.sin(min(km / EARTH_RADIUS_KM, math.pi) / 2.0)
+
+
+def _chord_to_km(chord):
+    return 2.0 * EARTH_RADIUS_KM * np.arcsin(np.minimum(1.0, chord / 2.0))
+
+
+class TrailGeoIndex:
+    """
+    코스 시작점(spot_latitude/spot_longitude) 공간 인덱스.
+    단위구 3차원 좌표에 cKDTree를 만들어 반경/근접 k개 조회를 로그 시간에 처리.
+    반환하는 인덱스는 원래 코스 리스트 기준 위치.
+    """
+
+    def __init__(self, lat_rad, lng_rad, valid):
+        self.positions = np.flatnonzero(valid)
+        self.tree = None
+        if len(self.positions):
+            xyz = _to_unit_xyz(lat_rad[self.positions], lng_rad[self.positions])
+            self.tree = cKDTree(xyz)
+
+    def __len__(self):
+        return len(self.positions)
+
+    def _query_point(self, lat: float, lng: float):
+        return _to_unit_xyz(np.radians([lat]), np.radians([lng]))[0]
+
+    def within(self, lat: float, lng: float, radius_km: float):
+        """반경 radius_km 안의 코스 위치 배열 (가까운 순)."""
+        if self.tree is None:
+            return np.empty(0, dtype=np.intp)
+        p = self._query_point(lat, lng)
+        hits = np.asarray(self.tree.query_ball_point(p, r=_km_to_chord(radius_km)), dtype=np.intp)
+        if not len(hits):
+            return hits
+        d = np.linalg.norm(self.tree.data[hits] - p, axis=1)
+        return self.positions[hits[np.argsort(d, kind="stable")]]
+
+    def nearest(self, lat: float, lng: float, k: int, radius_km: float | None = None):
+        """가까운 순 최대 k개의 (거리 km 배열, 코스 위치 배열). radius_km 밖은 제외."""
+        if self.tree is None or k <= 0:
+            return np.empty(0), np.empty(0, dtype=np.intp)
+        k = min(k, len(self.positions))
+        bound = _km_to_chord(radius_km) if radius_km is not None else np.inf
+        dist, hits = self.tree.query(self._query_point(lat, lng), k=k, distance_upper_bound=bound)
+        dist, hits = np.atleast_1d(dist), np.atleast_1d(hits)
+        found = np.isfinite(dist)
+        return _chord_to_km(dist[found]), self.positions[hits[found]]
+
+    def nearest_many(self, lats, lngs, radius_km: float | None = None) -> np.ndarray:
+        """여러 점 각각의 가장 가까운 코스 위치 배열 (radius_km 안에 없으면 -1) - 트리 조회 한 번"""
+        lats, lngs = np.asarray(lats, dtype=float), np.asarray(lngs, dtype=float)
+        out = np.full(len(lats), -1, dtype=np.intp)
+        if self.tree is None or not len(lats):
+            return out
+        bound = _km_to_chord(radius_km) if radius_km is not None else np.inf
+        dist, hits = self.tree.query(_to_unit_xyz(np.radians(lats), np.radians(lngs)), k=1, distance_upper_bound=bound)
+        found = np.isfinite(dist)
+        out[found] = self.positions[hits[found]]
+        return out
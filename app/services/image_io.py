@@ -0,0 +1,72 @@
+import io
+import math
+from PIL import Image, ImageOps
+from app.core.config import settings
+
+EXIF_ORIENTATION = 0x0112
+
+
+class ImageTooLarge(ValueError):
+    """허용 픽셀 수 초과 (라우터에서 413으로 변환)"""
+
+
+class DecodedImage:
+    """
+    업로드 이미지를 추론용 크기로 디코딩한 결과.
+    - image: RGB, EXIF 회전 적용, 긴 변이 max_side 이하
+    - orig_size: EXIF 회전 적용 후 원본 (w, h) → 박스 좌표의 기준 공간
+    """
+    __slots__ = ("image", "orig_size", "scale")
+
+    def __init__(self, image: Image.Image, orig_size):
+        self.image = image
+        self.orig_size = orig_size
+        self.scale = (orig_size[0] / image.width, orig_size[1] / image.height)
+
+    @property
+    def resized(self) -> bool:
+        return self.image.size != tuple(self.orig_size)
+
+    def to_original(self, xyxy: list) -> list:
+        """디코딩 공간 박스 → 원본 공간 박스 (크기가 같으면 그대로)"""
+        if not self.resized:
+            return xyxy
+        sx, sy = self.scale
+        return [[x1 * sx, y1 * sy, x2 * sx, y2 * sy] for x1, y1, x2, y2 in xyxy]
+
+
+def decode_upload(data: bytes, max_side: int | None = None, max_pixels: int | None = None) -> DecodedImage:
+    """
+    업로드 바이트 → 추론용 RGB 이미지.
+    JPEG은 draft 모드(DCT 스케일링)로 1/2·1/4·1/8 크기로 바로 디코딩해
+    12MP 사진도 전체 해상도 버퍼를 만들지 않는다.
+    """
+    max_side = max_side or settings.DECODE_MAX_SIDE
+    max_pixels = max_pixels or settings.MAX_UPLOAD_PIXELS
+
+    try:
+        img = Image.open(io.BytesIO(data))
+    except Image.DecompressionBombError as e:
+        # PIL 자체 상한(MAX_IMAGE_PIXELS의 2배)을 넘으면 크기 검사 전에 열기부터 실패 → 같은 413으로
+        raise ImageTooLarge(f"이미지 해상도가 너무 큽니다 ({e})") from e
+    raw_w, raw_h = img.size
+    if raw_w * raw_h > max_pixels:
+        raise ImageTooLarge(f"이미지 해상도가 너무 큽니다 ({raw_w}x{raw_h}, 최대 {max_pixels}픽셀)")
+
+    # EXIF 회전(5~8)은 가로/세로가 바뀜 → 박스 기준 공간도 회전 후 크기
+    orientation = img.getexif().get(EXIF_ORIENTATION, 1)
+    orig_size = (raw_h, raw_w) if orientation in (5, 6, 7, 8) else (raw_w, raw_h)
+
+    long_side = max(raw_w, raw_h)
+    if long_side > max_side:
+        s = max_side / long_side
+        # 요청 크기 이상을 보장하는 가장 큰 축소 배율을 libjpeg이 선택 (JPEG 외 포맷은 무시됨)
+        img.draft("RGB", (math.ceil(raw_w * s), math.ceil(raw_h * s)))
+
+    if img.mode != "RGB":
+        img = img.convert("RGB")
+    if max(img.size) > max_side:
+        # 축소가 먼저 (회전할 픽셀 수를 줄임). 축소 전용이라 BOX(면적 평균)로 충분
+        img.thumbnail((max_side, max_side), Image.BOX)
+    img = ImageOps.exif_transpose(img)
+    return DecodedImage(img, orig_size)
@@ -0,0 +1,331 @@
+import os
+import time
+import threading
+import itertools
+import multiprocessing as mp
+from multiprocessing import shared_memory
+import numpy as np
+from app.core.config import settings
+from app.services.yolo_backends import resolve_weights
+
+
+# -----------------------------
+# 결과 객체 (ultralytics Results 중 라우터가 쓰는 부분만)
+# -----------------------------
+class PooledBoxes:
+    __slots__ = ("xyxy", "cls", "conf")
+
+    def __init__(self, xyxy, cls, conf):
+        self.xyxy = xyxy
+        self.cls = cls
+        self.conf = conf
+
+
+class PooledResult:
+    """워커에서 돌아온 추론 결과. res.boxes.xyxy / res.boxes.cls / res.speed 계약 유지."""
+    __slots__ = ("boxes", "speed")
+
+    def __init__(self, xyxy, cls, conf, speed):
+        self.boxes = PooledBoxes(xyxy, cls, conf)
+        self.speed = speed
+
+
+class WorkerCrashed(RuntimeError):
+    pass
+
+
+def _attach_shm(name: str):
+    # 부모가 만든 세그먼트에 붙기만 함 (생성/삭제 책임은 부모)
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)  # Python 3.13+
+    except TypeError:
+        # 3.12 이하: spawn 워커는 부모의 resource_tracker를 공유하므로 등록이 중복될 뿐 해제하면 안 됨
+        return shared_memory.SharedMemory(name=name)
+
+
+# -----------------------------
+# 워커 프로세스
+# -----------------------------
+def _predict_views(model, shm, specs, opts):
+    # 부모가 BGR로 써 두었으므로 복사 없이 뷰로 바로 추론
+    imgs = [np.ndarray(shape, dtype=np.uint8, buffer=shm.buf, offset=offset) for offset, shape in specs]
+    out = []
+    for r in model.predict(imgs, **opts):
+        b = r.boxes
+        if b is None:
+            out.append((np.empty((0, 4), dtype=np.float32), np.empty(0, dtype=np.float32),
+                        np.empty(0, dtype=np.float32), dict(r.speed)))
+        else:
+            out.append((b.xyxy.numpy(), b.cls.numpy(), b.conf.numpy(), dict(r.speed)))
+    return out
+
+
+def _close_quietly(segments: list):
+    # predictor가 직전 배치 뷰를 들고 있으면 close가 실패하므로 다음 기회에 다시 시도
+    for shm in list(segments):
+        try:
+            shm.close()
+            segments.remove(shm)
+        except BufferError:
+            pass
+
+
+def _worker_main(conn, weights_path: str, cpu_ids, threads: int):
+    if cpu_ids and hasattr(os, "sched_setaffinity"):
+        try:
+            os.sched_setaffinity(0, cpu_ids)
+        except OSError:
+            pass
+    os.environ["OMP_NUM_THREADS"] = str(threads)
+    from ultralytics import YOLO
+    if weights_path.endswith(".pt"):
+        import torch
+        torch.set_num_threads(threads)
+
+    model = YOLO(weights_path, task="detect")
+    opts = dict(imgsz=settings.IMG_SIZE, conf=settings.CONF, iou=settings.IOU, device="cpu", verbose=False)
+    model.predict(np.zeros((settings.IMG_SIZE, settings.IMG_SIZE, 3), dtype=np.uint8), **opts)  # 워밍업
+    conn.send(("ready", os.getpid()))
+
+    shm, stale = None, []
+    while True:
+        try:
+            msg = conn.recv()
+        except EOFError:
+            break
+        kind = msg[0]
+        if kind == "stop":
+            break
+        if kind == "ping":
+            conn.send(("pong", os.getpid()))
+            continue
+        if kind != "predict":
+            continue
+        _, shm_name, specs = msg
+        try:
+            if shm is None or shm.name != shm_name:
+                if shm is not None:
+                    stale.append(shm)
+                shm = _attach_shm(shm_name)
+            _close_quietly(stale)
+            conn.send(("ok", _predict_views(model, shm, specs, opts)))
+        except Exception as e:
+            conn.send(("error", f"{e.__class__.__name__}: {e}"))
+
+
+# -----------------------------
+# 부모 쪽 핸들/풀
+# -----------------------------
+class _WorkerHandle:
+    def __init__(self, ctx, index: int, weights_path: str, cpu_ids, threads: int):
+        self.ctx = ctx
+        self.index = index
+        self.weights_path = weights_path
+        self.cpu_ids = cpu_ids
+        self.threads = threads
+        self.lock = threading.Lock()  # 워커 하나당 요청 하나씩
+        self.proc = None
+        self.conn = None
+        self.shm = None               # 워커 전용 재사용 버퍼
+        self.restarts = 0
+        self.last_ok = None
+
+    def spawn(self, timeout: float = 120.0):
+        parent, child = self.ctx.Pipe()
+        self.proc = self.ctx.Process(
+            target=_worker_main,
+            args=(child, self.weights_path, self.cpu_ids, self.threads),
+            name=f"yolo-worker-{self.index}",
+            daemon=True,
+        )
+        self.proc.start()
+        child.close()
+        self.conn = parent
+        try:
+            if not parent.poll(timeout):
+                raise WorkerCrashed(f"worker {self.index} 시작 시간 초과")
+            parent.recv()  # ("ready", pid)
+        except (EOFError, OSError) as e:
+            self.kill()
+            raise WorkerCrashed(f"worker {self.index} 시작 실패: {e}")
+        except WorkerCrashed:
+            self.kill()
+            raise
+        self.last_ok = time.time()
+
+    def kill(self):
+        if self.proc is not None and self.proc.is_alive():
+            self.proc.kill()
+            self.proc.join(timeout=5)
+        if self.conn is not None:
+            self.conn.close()
+        self.proc, self.conn = None, None
+
+    def restart(self):
+        self.kill()
+        self.restarts += 1
+        self.spawn()
+
+    def alive(self) -> bool:
+        return self.proc is not None and self.proc.is_alive()
+
+    def _buffer(self, nbytes: int):
+        if self.shm is None or self.shm.size < nbytes:
+            self.release_buffer()
+            self.shm = shared_memory.SharedMemory(create=True, size=max(nbytes, 1 << 20))
+        return self.shm
+
+    def release_buffer(self):
+        if self.shm is not None:
+            self.shm.close()
+            self.shm.unlink()
+            self.shm = None
+
+    def run(self, arrays: list, timeout: float):
+        # 이미지들을 공유메모리에 이어 붙이고 (offset, shape)만 전달 → pickle 없음
+        total = sum(a.nbytes for a in arrays)
+        shm = self._buffer(total)
+        specs, offset = [], 0
+        for a in arrays:
+            np.ndarray(a.shape, dtype=np.uint8, buffer=shm.buf, offset=offset)[...] = a[..., ::-1]  # RGB → BGR
+            specs.append((offset, a.shape))
+            offset += a.nbytes
+        try:
+            self.conn.send(("predict", shm.name, specs))
+            if not self.conn.poll(timeout):
+                raise WorkerCrashed(f"worker {self.index} 응답 시간 초과")
+            status, payload = self.conn.recv()
+        except (EOFError, OSError, BrokenPipeError) as e:
+            raise WorkerCrashed(f"worker {self.index} 종료됨: {e}")
+        if status != "ok":
+            raise RuntimeError(payload)
+        self.last_ok = time.time()
+        return [PooledResult(*r) for r in payload]
+
+    def ping(self, timeout: float = 5.0) -> bool:
+        if not self.alive():
+            return False
+        if not self.lock.acquire(blocking=False):
+            return True  # 추론 중이면 살아있는 것으로 간주
+        try:
+            self.conn.send(("ping",))
+            if not self.conn.poll(timeout):
+                return False
+            self.conn.recv()
+            self.last_ok = time.time()
+            return True
+        except (EOFError, OSError):
+            return False
+        finally:
+            self.lock.release()
+
+
+class InferencePool:
+    """
+    멀티 프로세스 추론 풀.
+    - 워커마다 YOLO 모델 복제본 + 전용 CPU 코어 묶음(affinity)
+    - 디코딩된 이미지는 multiprocessing.shared_memory로 전달
+    - 주기적 헬스체크, 비정상 종료 시 재기동 후 1회 재시도
+    """
+
+    def __init__(self, workers: int = 2, threads: int = 0, health_sec: float = 10.0, timeout_sec: float = 60.0):
+        self.size = max(1, workers)
+        self.threads = threads
+        self.health_sec = health_sec
+        self.timeout_sec = timeout_sec
+        self._workers = []
+        self._rr = itertools.count()
+        self._start_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._monitor = None
+
+    def _cpu_groups(self):
+        cpus = sorted(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else list(range(os.cpu_count() or 1))
+        per = max(1, len(cpus) // self.size)
+        groups = [cpus[i * per:(i + 1) * per] or cpus for i in range(self.size)]
+        return groups, (self.threads or per)
+
+    def start(self):
+        with self._start_lock:
+            if self._workers:
+                return
+            ctx = mp.get_context("spawn")  # torch/스레드 상태를 fork로 복제하지 않음
+            groups, threads = self._cpu_groups()
+            # 변환(export)은 부모에서 한 번만 → 워커들은 같은 산출물을 로드
+            weights_path = resolve_weights()
+            workers = [_WorkerHandle(ctx, i, weights_path, groups[i], threads) for i in range(self.size)]
+            for w in workers:
+                w.spawn()
+            self._workers = workers
+            self._stop.clear()
+            if self.health_sec:
+                self._monitor = threading.Thread(target=self._health_loop, name="yolo-pool-health", daemon=True)
+                self._monitor.start()
+
+    def close(self):
+        self._stop.set()
+        for w in self._workers:
+            with w.lock:
+                try:
+                    if w.alive():
+                        w.conn.send(("stop",))
+                        w.proc.join(timeout=5)
+                except (OSError, EOFError):
+                    pass
+                w.kill()
+                w.release_buffer()
+        self._workers = []
+
+    def _health_loop(self):
+        while not self._stop.wait(self.health_sec):
+            for w in list(self._workers):
+                if not w.ping():
+                    print(f"[YOLO_POOL] worker {w.index} 응답 없음 → 재기동")
+                    with w.lock:
+                        try:
+                            w.restart()
+                        except Exception as e:
+                            print(f"[YOLO_POOL] worker {w.index} 재기동 실패:", e)
+
+    def _pick(self):
+        # 쉬고 있는 워커 우선, 모두 바쁘면 라운드로빈으로 대기
+        for w in self._workers:
+            if w.lock.acquire(blocking=False):
+                return w
+        w = self._workers[next(self._rr) % len(self._workers)]
+        w.lock.acquire()
+        return w
+
+    def predict_batch(self, imgs: list):
+        """PIL 이미지(RGB) 리스트 → PooledResult 리스트 (YOLOService.predict_batch와 같은 계약)"""
+        if not imgs:
+            return []
+        self.start()
+        arrays = [np.asarray(img.convert("RGB") if img.mode != "RGB" else img) for img in imgs]
+        w = self._pick()
+        try:
+            try:
+                return w.run(arrays, self.timeout_sec)
+            except WorkerCrashed as e:
+                print(f"[YOLO_POOL] {e} → 재기동 후 재시도")
+                w.restart()
+                return w.run(arrays, self.timeout_sec)
+        finally:
+            w.lock.release()
+
+    def metrics(self) -> dict:
+        now = time.time()
+        return {
+            "workers": [
+                {
+                    "index": w.index,
+                    "pid": w.proc.pid if w.proc is not None else None,
+                    "alive": w.alive(),
+                    "busy": w.lock.locked(),
+                    "cpus": w.cpu_ids,
+                    "restarts": w.restarts,
+                    "since_ok_sec": round(now - w.last_ok, 1) if w.last_ok else None,
+                }
+                for w in self._workers
+            ]
+        }
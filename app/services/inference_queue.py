@@ -0,0 +1,170 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from app.core.config import settings
+
+
+class QueueFullError(Exception):
+    """추론 대기열이 가득 참 (라우터에서 503으로 변환)"""
+
+
+class InferenceBatcher:
+    """
+    동적 마이크로 배칭 추론 스케줄러.
+    - 요청 코루틴은 이미지를 대기열에 넣고 future를 await
+    - 전용 워커가 최대 max_batch장 또는 max_wait_ms까지 모아 한 번에 forward
+    - 결과를 각 future로 돌려줌 (추론은 전용 스레드에서 실행 → 이벤트 루프 비차단)
+    - concurrency > 1이면 배치 여러 개를 동시에 실행 (프로세스 풀 백엔드용)
+    """
+
+    def __init__(self, predict_batch, max_batch: int = 8, max_wait_ms: float = 10, max_queue: int = 64,
+                 concurrency: int = 1, on_start=None, on_stop=None):
+        self.predict_batch = predict_batch
+        self.max_batch = max(1, max_batch)
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+        self.max_queue = max_queue
+        self.concurrency = max(1, concurrency)
+        self.on_start = on_start
+        self.on_stop = on_stop
+        self.pool = None  # pool 모드일 때 InferencePool (지표용)
+        self._queue = None
+        self._worker = None
+        self._loop = None
+        self._slots = None
+        self._executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="yolo-batch")
+        # 지표
+        self.batches = 0
+        self.images = 0
+        self.rejected = 0
+
+    def _ensure_started(self):
+        loop = asyncio.get_running_loop()
+        if self._worker is not None and self._loop is loop and not self._worker.done():
+            return
+        self._loop = loop
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._slots = asyncio.Semaphore(self.concurrency)
+        self._worker = loop.create_task(self._run(), name="yolo-batcher")
+
+    async def start(self):
+        if self.on_start is not None:
+            await asyncio.get_running_loop().run_in_executor(None, self.on_start)
+        self._ensure_started()
+
+    async def stop(self):
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+        if self.on_stop is not None:
+            await asyncio.get_running_loop().run_in_executor(None, self.on_stop)
+
+    async def submit(self, img):
+        """이미지 1장 추론 결과(ultralytics Results)를 반환. 대기열이 차면 QueueFullError."""
+        self._ensure_started()
+        fut = self._loop.create_future()
+        try:
+            self._queue.put_nowait((img, fut))
+        except asyncio.QueueFull:
+            self.rejected += 1
+            raise QueueFullError("추론 대기열이 가득 찼습니다. 잠시 후 다시 시도하세요.")
+        return await fut
+
+    async def _collect(self):
+        batch = [await self._queue.get()]
+        deadline = self._loop.time() + self.max_wait
+        while len(batch) < self.max_batch:
+            # 이미 쌓여 있는 건 기다리지 않고 바로 가져옴
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            timeout = deadline - self._loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        while True:
+            await self._slots.acquire()
+            try:
+                batch = await self._collect()
+            except BaseException:
+                self._slots.release()
+                raise
+            self._loop.create_task(self._execute(batch))
+
+    async def _execute(self, batch):
+        try:
+            # 클라이언트가 끊겨 취소된 요청은 건너뜀
+            live = [(img, fut) for img, fut in batch if not fut.done()]
+            if not live:
+                return
+            try:
+                results = await self._loop.run_in_executor(
+                    self._executor, self.predict_batch, [img for img, _ in live]
+                )
+            except Exception as e:
+                for _, fut in live:
+                    if not fut.done():
+                        fut.set_exception(e)
+                return
+            self.batches += 1
+            self.images += len(live)
+            for (_, fut), res in zip(live, results):
+                if not fut.done():
+                    fut.set_result(res)
+        finally:
+            self._slots.release()
+
+    def metrics(self) -> dict:
+        return {
+            "mode": settings.INFER_MODE,
+            "concurrency": self.concurrency,
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "max_queue": self.max_queue,
+            "batches": self.batches,
+            "images": self.images,
+            "avg_batch_size": round(self.images / self.batches, 2) if self.batches else None,
+            "rejected": self.rejected,
+        }
+
+
+def _build_batcher() -> InferenceBatcher:
+    opts = dict(
+        max_batch=settings.INFER_BATCH_SIZE,
+        max_wait_ms=settings.INFER_MAX_WAIT_MS,
+        max_queue=settings.INFER_QUEUE_SIZE,
+    )
+    if settings.INFER_MODE == "pool":
+        # 프로세스 풀: 워커 수만큼 배치를 동시에 돌림 (부모 프로세스는 모델을 올리지 않음)
+        from app.services.inference_pool import InferencePool
+        pool = InferencePool(
+            workers=settings.INFER_POOL_WORKERS,
+            threads=settings.INFER_POOL_THREADS,
+            health_sec=settings.INFER_POOL_HEALTH_SEC,
+        )
+        batcher = InferenceBatcher(pool.predict_batch, concurrency=pool.size,
+                                   on_start=pool.start, on_stop=pool.close, **opts)
+        batcher.pool = pool
+        return batcher
+    # 모델 로드(+워밍업)는 start()에서 - import 시점에는 ultralytics도 읽지 않음
+    return InferenceBatcher(_inprocess_predict_batch, on_start=_load_inprocess_model, **opts)
+
+
+def _load_inprocess_model():
+    from app.services.yolo_service import YOLOService
+    YOLOService.get()
+
+
+def _inprocess_predict_batch(imgs: list):
+    from app.services.yolo_service import YOLOService
+    return YOLOService.get().predict_batch(imgs)
+
+
+inference_batcher = _build_batcher()
@@ -0,0 +1,88 @@
+import numpy as np
+import scipy.sparse as sp
+from scipy.sparse.linalg import svds
+
+
+class LsaIndex:
+    """
+    잠재 의미(LSA) 검색: TF-IDF 문서-용어 행렬의 절단 SVD로 만든 저차원 코사인 유사도.
+    정확히 같은 토큰이 없어도 함께 자주 나오는 용어로 이어진 코스를 찾는다 (BM25 보완).
+
+    - BM25 역색인(InvertedBM25)의 posting(필드 가중 tf)에서 바로 만든다 → 추가 형태소 분석 없음
+    - 용어 번호/조회는 BM25와 공유 (vocab = bm25.vocab)
+    - 문서 벡터: 정규화한 float32 (문서 수 × 차원) 연속 배열 → 질의 1건 = 행렬-벡터 곱 한 번
+    - 질의 벡터: 질의 토큰 TF-IDF를 같은 사영(components: 용어 × 차원)으로 옮겨 정규화
+    """
+
+    ARRAYS = ("vectors", "components", "idf")
+
+    def __init__(self, vectors: np.ndarray, components: np.ndarray, idf: np.ndarray, vocab):
+        self.vectors = vectors          # (문서, 차원) 단위 벡터 (빈 문서는 0)
+        self.components = components    # (용어, 차원) 사영 행렬
+        self.idf = idf                  # 용어별 IDF
+        self.vocab = vocab
+
+    @classmethod
+    def from_bm25(cls, bm25, dim: int = 128, seed: int = 0) -> "LsaIndex | None":
+        """BM25 posting → TF-IDF(부선형 tf, smooth idf, 문서별 L2 정규화) → 절단 SVD. 만들 수 없으면 None"""
+        n_docs, n_terms = bm25.corpus_size, len(bm25.vocab)
+        dim = min(dim, n_docs - 1, n_terms - 1)
+        if dim < 1:
+            return None
+        indptr = np.asarray(bm25.indptr)
+        df = np.diff(indptr)
+        idf = np.log((1 + n_docs) / (1 + df)) + 1.0
+        term_of = np.repeat(np.arange(n_terms), df)
+        data = (1.0 + np.log(np.asarray(bm25.tfs, dtype=float))) * idf[term_of]
+        # 용어별 posting(CSR) = 문서 × 용어 행렬의 CSC
+        x = sp.csc_matrix((data, np.asarray(bm25.doc_ids), indptr), shape=(n_docs, n_terms)).tocsr()
+        norms = np.sqrt(np.asarray(x.multiply(x).sum(axis=1)).ravel())
+        x = sp.diags(1.0 / np.where(norms > 0, norms, 1.0)) @ x
+        # 시작 벡터 고정 → 같은 코퍼스면 워커/재기동과 무관하게 같은 결과
+        v0 = np.random.default_rng(seed).standard_normal(min(x.shape))
+        _, _, vt = svds(x, k=dim, v0=v0)
+        components = np.ascontiguousarray(vt.T, dtype=np.float32)
+        vectors = _normalize_rows(np.asarray(x @ components, dtype=np.float32))
+        return cls(vectors, components, idf.astype(np.float32), bm25.vocab)
+
+    def to_arrays(self) -> dict:
+        return {name: getattr(self, name) for name in self.ARRAYS}
+
+    @classmethod
+    def from_arrays(cls, arrays: dict, vocab) -> "LsaIndex":
+        """to_arrays 결과(mmap 배열)로 생성 - vocab은 같은 BM25의 용어 조회"""
+        return cls(arrays["vectors"], arrays["components"], arrays["idf"], vocab)
+
+    def query_vector(self, query: list):
+        """질의 토큰 → 단위 벡터 (아는 용어가 없으면 None)"""
+        counts = {}
+        for q in query:
+            t = self.vocab.get(q)
+            if t is not None:
+                counts[t] = counts.get(t, 0) + 1
+        if not counts:
+            return None
+        ids = np.fromiter(counts, dtype=np.intp, count=len(counts))
+        w = (1.0 + np.log(np.fromiter(counts.values(), dtype=np.float32, count=len(counts)))) * self.idf[ids]
+        v = w @ self.components[ids]
+        norm = float(np.linalg.norm(v))
+        return v / norm if norm > 0 else None
+
+    def get_scores(self, query: list) -> np.ndarray:
+        """문서별 코사인 유사도 (-1~1, 질의를 표현할 수 없으면 모두 0)"""
+        v = self.query_vector(query)
+        if v is None:
+            return np.zeros(len(self.vectors), dtype=np.float32)
+        return self.vectors @ v
+
+    def stats(self) -> dict:
+        return {
+            "documents": int(self.vectors.shape[0]),
+            "dim": int(self.vectors.shape[1]),
+            "bytes": int(self.vectors.nbytes + self.components.nbytes + self.idf.nbytes),
+        }
+
+
+def _normalize_rows(m: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(m, axis=1, keepdims=True)
+    return np.ascontiguousarray(m / np.where(norms > 0, norms, 1.0), dtype=np.float32)
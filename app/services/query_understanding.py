@@ -0,0 +1,131 @@
+import re
+import time
+import threading
+from collections import OrderedDict, deque
+
+
+class KeywordMatcher:
+    """
+    여러 동의어/키워드 목록을 하나로 묶은 Aho–Corasick 매처.
+    텍스트를 한 번만 훑어 `w in text`(부분 문자열 포함)를 모든 목록에 대해 동시에 판정한다.
+    """
+
+    def __init__(self, groups: dict):
+        self.groups = {name: list(words) for name, words in groups.items()}
+        words = list(dict.fromkeys(w for ws in self.groups.values() for w in ws if w))
+        self._goto = [{}]      # 상태 → {문자: 다음 상태}
+        self._out = [()]       # 상태 → 이 상태에서 끝나는 단어들
+        for w in words:
+            s = 0
+            for ch in w:
+                nxt = self._goto[s].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[s][ch] = nxt
+                    self._goto.append({})
+                    self._out.append(())
+                s = nxt
+            self._out[s] = self._out[s] + (w,)
+        self._fail = [0] * len(self._goto)
+        # BFS로 실패 링크 + 출력 병합
+        queue = deque(self._goto[0].values())
+        while queue:
+            s = queue.popleft()
+            for ch, nxt in self._goto[s].items():
+                queue.append(nxt)
+                f = self._fail[s]
+                while f and ch not in self._goto[f]:
+                    f = self._fail[f]
+                f = self._goto[f].get(ch, 0)
+                self._fail[nxt] = f if f != nxt else 0   # 깊이 1 상태는 루트로
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def found(self, text: str) -> set:
+        """text에 (부분 문자열로) 등장하는 단어 집합"""
+        goto, fail, out = self._goto, self._fail, self._out
+        hits = set()
+        s = 0
+        for ch in text:
+            while s and ch not in goto[s]:
+                s = fail[s]
+            s = goto[s].get(ch, 0)
+            if out[s]:
+                hits.update(out[s])
+        return hits
+
+    def match(self, text: str) -> dict:
+        """{목록 이름: 등장한 단어들(원래 목록 순서)}"""
+        hits = self.found(text)
+        return {name: [w for w in words if w in hits] for name, words in self.groups.items()}
+
+
+_WS_RE = re.compile(r"\s+")
+
+def normalize_story(text: str) -> str:
+    """캐시 키용 정규화: 앞뒤 공백 제거 + 연속 공백 하나로"""
+    return _WS_RE.sub(" ", (text or "").strip())
+
+
+class QueryUnderstanding:
+    """
+    사연 → (prefs, 질의 토큰) 변환 결과를 정규화된 사연 기준 LRU로 보관.
+    단계별(매칭/형태소 분석) 누적 시간과 캐시 적중률을 집계한다.
+    """
+
+    STAGES = ("prefs", "tokens")
+
+    def __init__(self, prefs_fn, query_fn, maxsize: int = 4096):
+        self.prefs_fn = prefs_fn    # text → prefs
+        self.query_fn = query_fn    # (text, prefs) → 질의 토큰
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._cache = OrderedDict()
+        # 지표
+        self.hits = 0
+        self.misses = 0
+        self._stage_ms = dict.fromkeys(self.STAGES, 0.0)
+
+    def analyze(self, text: str):
+        """(prefs, query) - 호출측이 수정해도 캐시가 오염되지 않게 복사본 반환"""
+        key = normalize_story(text)
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+        if entry is None:
+            t0 = time.perf_counter()
+            prefs = self.prefs_fn(key)
+            t1 = time.perf_counter()
+            query = self.query_fn(key, prefs)
+            t2 = time.perf_counter()
+            entry = (prefs, tuple(query))
+            with self._lock:
+                self.misses += 1
+                self._stage_ms["prefs"] += (t1 - t0) * 1000
+                self._stage_ms["tokens"] += (t2 - t1) * 1000
+                self._cache[key] = entry
+                while len(self._cache) > self.maxsize:
+                    self._cache.popitem(last=False)
+        prefs, query = entry
+        return {k: (list(v) if isinstance(v, list) else v) for k, v in prefs.items()}, list(query)
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+    def metrics(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "items": len(self._cache),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / total, 4) if total else None,
+                # 미스 1건당 평균 단계별 시간
+                "avg_ms": {
+                    stage: (round(ms / self.misses, 3) if self.misses else None)
+                    for stage, ms in self._stage_ms.items()
+                },
+            }
@@ -1,10 +1,34 @@
 import re
+import copy
+import math
+import heapq
+import hashlib
+import threading
+import numpy as np
+from bisect import bisect_right
+from collections import Counter
 from math import log1p
-from kiwipiepy import Kiwi
-from rank_bm25 import BM25Okapi
-from app.services.geo import haversine
-
-kiwi = Kiwi()
+from app.core.config import settings
+from app.core.metrics import span
+from app.services.geo import haversine, distance_to_many, to_radians
+from app.services.geo_index import TrailGeoIndex
+from app.services.bm25_index import InvertedBM25
+from app.services.lsa_index import LsaIndex
+from app.services.trail_features import (
+    DIFF_EASY, DIFF_HARD, DIFF_BITS, SOURCE_COLUMNS, FeatureExtractor, TrailFeatures, TrailFeatureStore,
+)
+from app.services.trail_index import TrailIndex
+from app.services.shared_index import SharedIndexStore, SHARED_FORMAT_VERSION
+from app.services.query_understanding import KeywordMatcher, QueryUnderstanding
+from app.services.tokenizer import KiwiPool, KeywordTokenizer
+
+# 형태소 분석기 풀: 시작 오케스트레이터가 미리 생성(kiwi_pool.warm), 아니면 첫 사용 시 - 모델 로드가 수 초 걸림
+kiwi_pool = KiwiPool(
+    size=settings.KIWI_POOL_SIZE,
+    num_workers=settings.KIWI_NUM_WORKERS,
+    user_dict_path=settings.KIWI_USER_DICT,
+)
+keyword_tokenizer = KeywordTokenizer(kiwi_pool, cache_size=settings.TOKEN_CACHE_SIZE)
 
 # -----------------------------
 # 동의어/키워드 사전 (필드에 맞춰 간결화)
@@ -30,6 +54,21 @@ SCENERY_KEYWORDS = [
     "전망","전망대","야경","노을","일몰","일출"
 ]
 
+# 위 사전 전체를 한 번에 훑는 매처 (목록별 `w in text` 결과를 한 번의 순회로)
+PREF_MATCHER = KeywordMatcher({
+    "short": SHORT_SYNONYMS,
+    "medium": MEDIUM_SYNONYMS,
+    "long": LONG_SYNONYMS,
+    "easy": EASY_SYNONYMS,
+    "medium_diff": MEDIUM_DIFF_SYNONYMS,
+    "hard": HARD_SYNONYMS,
+    "trash": TRASH_SYNONYMS,
+    "toilet": TOILET_SYNONYMS,
+    "store": STORE_SYNONYMS,
+    "region": REGION_SYNONYMS,
+    "scenery": SCENERY_KEYWORDS,
+})
+
 # 숫자/단위 파싱
 KM_RE = re.compile(r"(\d+(?:\.\d+)?)\s*(?:km|킬로|키로)")
 HOUR_RE = re.compile(r"(\d+(?:\.\d+)?)\s*시간")
@@ -46,13 +85,10 @@ def duration_to_km(hours=0.0, minutes=0.0) -> float:
 # 형태소/키워드 추출
 # -----------------------------
 def extract_keywords(text: str) -> list:
-    if not text:
-        return []
-    tokens = kiwi.tokenize(text)
-    return [t.form for t in tokens if t.tag in ("NNG", "NNP", "VV", "VA")]
+    return keyword_tokenizer.tokenize(text)
 
-def parse_length_intent(text: str):
-    """사용자 입력에서 길이/시간 의도를 km 범위로 변환."""
+def parse_length_intent(text: str, matches: dict | None = None):
+    """사용자 입력에서 길이/시간 의도를 km 범위로 변환. matches: PREF_MATCHER.match(text) 결과(있으면 재사용)"""
     if not text:
         return None
     m = RANGE_RE.search(text)
@@ -84,11 +120,13 @@ def parse_length_intent(text: str):
         return (km * 0.8, km * 1.2)
 
     # 키워드 기반 근사
-    if any(w in text for w in SHORT_SYNONYMS):
+    if matches is None:
+        matches = PREF_MATCHER.match(text)
+    if matches["short"]:
         return (0.5, 3.0)
-    if any(w in text for w in LONG_SYNONYMS):
+    if matches["long"]:
         return (10.0, 100.0)
-    if any(w in text for w in MEDIUM_SYNONYMS):
+    if matches["medium"]:
         return (4.0, 8.0)
     return None
 
@@ -98,46 +136,39 @@ def parse_length_intent(text: str):
 def extract_user_prefs(text: str) -> dict:
     text = (text or "").strip()
     prefs = {}
+    m = PREF_MATCHER.match(text)
 
     # 길이(범위) + 과거 호환(short/long)
-    rng = parse_length_intent(text)
+    rng = parse_length_intent(text, m)
     if rng:
         prefs["length_range_km"] = rng
-    if any(word in text for word in SHORT_SYNONYMS):
+    if m["short"]:
         prefs["length"] = "short"
-    elif any(word in text for word in LONG_SYNONYMS):
+    elif m["long"]:
         prefs["length"] = "long"
 
     # 난이도
-    if any(w in text for w in EASY_SYNONYMS): prefs["difficulty"] = "쉬움"
-    elif any(w in text for w in HARD_SYNONYMS): prefs["difficulty"] = "어려움"
-    elif any(w in text for w in MEDIUM_DIFF_SYNONYMS): prefs["difficulty"] = "보통"
+    if m["easy"]: prefs["difficulty"] = "쉬움"
+    elif m["hard"]: prefs["difficulty"] = "어려움"
+    elif m["medium_diff"]: prefs["difficulty"] = "보통"
 
     # 플로깅/편의
-    if any(w in text for w in TRASH_SYNONYMS): prefs["trash"] = True
-    if any(w in text for w in TOILET_SYNONYMS): prefs["toilet"] = True
-    if any(w in text for w in STORE_SYNONYMS): prefs["store"] = True
+    if m["trash"]: prefs["trash"] = True
+    if m["toilet"]: prefs["toilet"] = True
+    if m["store"]: prefs["store"] = True
 
-    # 지역
-    for region in REGION_SYNONYMS:
-        if region in text:
-            prefs["region"] = region
-            break
+    # 지역 (목록 순서상 첫 번째)
+    if m["region"]:
+        prefs["region"] = m["region"][0]
 
     # 경치/테마 키워드
-    prefs["keywords"] = [kw for kw in SCENERY_KEYWORDS if kw in text]
+    prefs["keywords"] = m["scenery"]
 
     # 질의 확장을 위해 원문에서 쓰인 동의어도 저장
     prefs["synonyms_in_text"] = [
-        *[w for w in SHORT_SYNONYMS if w in text],
-        *[w for w in MEDIUM_SYNONYMS if w in text],
-        *[w for w in LONG_SYNONYMS if w in text],
-        *[w for w in EASY_SYNONYMS if w in text],
-        *[w for w in MEDIUM_DIFF_SYNONYMS if w in text],
-        *[w for w in HARD_SYNONYMS if w in text],
-        *[w for w in TRASH_SYNONYMS if w in text],
-        *[w for w in TOILET_SYNONYMS if w in text],
-        *[w for w in STORE_SYNONYMS if w in text],
+        *m["short"], *m["medium"], *m["long"],
+        *m["easy"], *m["medium_diff"], *m["hard"],
+        *m["trash"], *m["toilet"], *m["store"],
     ]
     return prefs
 
@@ -156,19 +187,106 @@ def trail_to_text(t) -> str:
     ]
     return " ".join(p for p in parts if p)
 
-def build_bm25_corpus(trails: list):
-    # 필드 가중치: 이름/도시/설명을 약하게 복제해서 가중치 부여
-    docs = []
+# 예전 BM25 문서 f"{이름} {이름} {trail_to_text} {도시}"를 이루는 원문 필드 (trail_to_text 순서)
+BM25_TEXT_PARTS = ("name", "description", "description_detail", "city", "amenity", "toilet", "length")
+# 예전 문서에서 여러 번 나오는 필드 (이름 3번, 도시 2번 = 기본 필드 가중치)
+BM25_REPEATED_FIELDS = ("name", "city")
+
+def bm25_fields(t) -> dict:
+    """BM25 원문 필드. 토큰 필드(name/body/city/extra)는 tokenize_fields_many가 만든다"""
+    return {
+        "name": str(getattr(t, "trail_name", "") or ""),
+        "description": str(getattr(t, "description", "") or ""),
+        "description_detail": str(getattr(t, "description_detail", "") or ""),
+        "city": str(getattr(t, "city_name", "") or ""),
+        "amenity": str(getattr(t, "amenity_description", "") or ""),
+        "toilet": str(getattr(t, "toilet_description", "") or ""),
+        "length": str(getattr(t, "length", "") or ""),
+    }
+
+def bm25_document(fields: dict) -> tuple:
+    """예전 BM25 문서 문자열과 조각별 (시작 위치, 원문 필드)"""
+    parts = [(name, fields[name]) for name in BM25_TEXT_PARTS if fields[name]] or [(None, "")]
+    pieces = [("name", fields["name"]), ("name", fields["name"]), *parts, ("city", fields["city"])]
+    spans, pos = [], 0
+    for name, text in pieces:
+        spans.append((pos, name))
+        pos += len(text) + 1
+    return " ".join(text for _, text in pieces), spans
+
+def split_document_tokens(spans: list, tokens: list) -> dict:
+    """
+    예전 문서 한 번의 분석 결과 [(형태, 시작 위치)]를 시작 위치로 조각에 나눠 토큰 필드로.
+    - body: 본문 조각 토큰
+    - name/city: 모든 등장에 공통인 토큰 (가중치 = 등장 횟수)
+    - extra: 등장마다 문맥 때문에 다르게 분석된 나머지 (가중치 1)
+    → 기본 가중치에서 필드 가중 tf/문서 길이가 예전 BM25Okapi 문서와 정확히 같다
+    """
+    starts = [start for start, _ in spans]
+    pieces = [[] for _ in spans]
+    for form, start in tokens:
+        pieces[bisect_right(starts, start) - 1].append(form)
+    out = {"name": [], "body": [], "city": [], "extra": []}
+    seen = {name: [] for name in BM25_REPEATED_FIELDS}
+    for (_, name), forms in zip(spans, pieces):
+        if name in seen:
+            seen[name].append(forms)
+        else:
+            out["body"].extend(forms)
+    for name, occurrences in seen.items():
+        common = Counter(occurrences[0])
+        for forms in occurrences[1:]:
+            common &= Counter(forms)
+        for i, forms in enumerate(occurrences):
+            left = Counter(common)
+            for form in forms:
+                if left[form] > 0:
+                    left[form] -= 1
+                    if i == 0:
+                        out[name].append(form)
+                else:
+                    out["extra"].append(form)
+    return out
+
+def tokenize_fields(fields: dict) -> dict:
+    return tokenize_fields_many([fields])[0]
+
+def tokenize_fields_many(fields_list: list) -> list:
+    """원문 필드 dict 목록 → 토큰 필드 dict 목록. 문서마다 예전 BM25 문서를 한 번의 배치로 분석"""
+    documents = [bm25_document(fields) for fields in fields_list]
+    tokens = keyword_tokenizer.tokenize_many_offsets(text for text, _ in documents)
+    return [split_document_tokens(spans, doc) for (_, spans), doc in zip(documents, tokens)]
+
+# 사용자 사전에 넣을 장소명 접미사 ('둘레길', '생태탐방로'가 '둘레 + 길' 식으로 쪼개지지 않게)
+PLACE_SUFFIXES = ("길", "로")
+_HANGUL_WORD_RE = re.compile(r"[가-힣]{2,}")
+
+def trail_place_words(trails: list) -> set:
+    """코스 스냅샷의 장소명: 시군구 이름 + 코스명 중 '~길/~로'로 끝나는 단어"""
+    words = set()
     for t in trails:
-        name = (getattr(t, "trail_name", "") or "")
-        city = (getattr(t, "city_name", "") or "")
-        text = trail_to_text(t)
-        weighted = f"{name} {name} {text} {city}"
-        docs.append(weighted)
-    tokenized_docs = [extract_keywords(doc) for doc in docs]
-    bm25 = BM25Okapi(tokenized_docs)
+        city = (getattr(t, "city_name", "") or "").split()
+        words.update(w for w in city[1:] if _HANGUL_WORD_RE.fullmatch(w))  # 시도는 기본 사전에 있음
+        for w in (getattr(t, "trail_name", "") or "").split():
+            if len(w) >= 3 and w.endswith(PLACE_SUFFIXES) and _HANGUL_WORD_RE.fullmatch(w):
+                words.add(w)
+    return words
+
+def build_bm25_corpus(trails: list):
+    docs = tokenize_fields_many([bm25_fields(t) for t in trails])
+    bm25 = InvertedBM25(docs, weights=settings.BM25_FIELD_WEIGHTS)
     return bm25, trails
 
+# 프로세스 전역 인덱스: 바뀐 코스만 다시 토큰화하고 디스크에 보존
+trail_index = TrailIndex(
+    settings.TRAIL_INDEX_PATH,
+    fields_fn=bm25_fields,
+    tokenizer=keyword_tokenizer,
+    tokenize_fn=tokenize_fields_many,
+    weights=settings.BM25_FIELD_WEIGHTS,
+    lsa_dim=settings.LSA_DIM,
+)
+
 def expand_query_tokens(user_text: str, prefs: dict) -> list:
     q = extract_keywords(user_text)
     q.extend(prefs.get("keywords", []))
@@ -177,13 +295,64 @@ def expand_query_tokens(user_text: str, prefs: dict) -> list:
         q.append(prefs["region"])
     return list(dict.fromkeys(q))  # dedupe
 
+# 같은/비슷한 사연이 반복되므로 (prefs, 질의 토큰)을 정규화된 사연 기준으로 캐시
+query_understanding = QueryUnderstanding(
+    extract_user_prefs, expand_query_tokens, maxsize=settings.QUERY_CACHE_SIZE,
+)
+
+def understand_query(user_text: str):
+    """사연 → (prefs, 질의 토큰) - LRU 캐시 경유"""
+    return query_understanding.analyze(user_text)
+
+def top_k_indices(scores, k: int):
+    """
+    점수 내림차순 상위 k개 인덱스 (동점은 앞선 인덱스 우선 - sorted(..., reverse=True)와 동일).
+    전체 정렬 대신 argpartition으로 k개만 고른 뒤 그 안에서만 정렬.
+    """
+    scores = np.asarray(scores, dtype=float)
+    n = len(scores)
+    if k <= 0 or n == 0:
+        return np.empty(0, dtype=np.intp)
+    if k >= n:
+        return np.lexsort((np.arange(n), -scores))
+    part = np.argpartition(-scores, k - 1)[:k]
+    # 경계값 동점은 인덱스가 작은 쪽을 택해야 결과가 정렬 방식과 같아짐
+    kth = scores[part].min()
+    above = np.flatnonzero(scores > kth)
+    ties = np.flatnonzero(scores == kth)[:k - len(above)]
+    idx = np.concatenate([above, ties])
+    return idx[np.lexsort((idx, -scores[idx]))]
+
+def fuse_scores(bm25_scores, semantic_scores, weight: float) -> np.ndarray:
+    """
+    BM25(최댓값으로 나눠 0~1) + LSA 코사인(음수는 0)의 가중 합.
+    BM25가 모두 0이면(겹치는 토큰 없음) LSA 순서, 강하게 맞는 코스는 BM25가 앞에 둔다.
+    """
+    bm25 = np.asarray(bm25_scores, dtype=float)
+    top = bm25.max() if len(bm25) else 0.0
+    if top > 0:
+        bm25 = bm25 / top
+    return (1.0 - weight) * bm25 + weight * np.maximum(np.asarray(semantic_scores, dtype=float), 0.0)
+
+def retrieval_scores(trails: list, query: list, version=None):
+    """
+    후보 선정 점수: BM25, LSA 인덱스가 있고 가중치가 0보다 크면 하이브리드.
+    두 인덱스는 sync 한 번으로 받은 같은 코퍼스의 쌍 (다른 스냅샷 요청과 섞이지 않게).
+    """
+    bm25, lsa = trail_index.sync(trails, version=version)
+    if bm25 is None or not query:
+        return [0.0] * len(trails)
+    scores = bm25.get_scores(query)
+    weight = settings.RECOMMEND_SEMANTIC_WEIGHT
+    if weight <= 0 or lsa is None:
+        return scores
+    with span("recommend.semantic"):
+        return fuse_scores(scores, lsa.get_scores(query), weight)
+
 def get_top_k_routes(user_text: str, trails: list, k: int = 10) -> list:
-    bm25, trails = build_bm25_corpus(trails)
-    prefs = extract_user_prefs(user_text)
-    query = expand_query_tokens(user_text, prefs)
-    scores = bm25.get_scores(query) if query else [0.0] * len(trails)
-    top_indices = sorted(range(len(scores)), key=lambda i: scores[i], reverse=True)[:k]
-    return [trails[i] for i in top_indices]
+    _, query = understand_query(user_text)
+    scores = retrieval_scores(trails, query)
+    return [trails[i] for i in top_k_indices(scores, k)]
 
 # -----------------------------
 # 스코어링 (가용 컬럼만 활용)
@@ -205,6 +374,34 @@ def _get_route_km(route):
         return km
     return _parse_length_from_text(getattr(route, "length", None))
 
+# 코스별 특성(길이/난이도/편의시설/지역·경치 비트마스크): 스냅샷 적재 시 계산, 디스크에 보존
+trail_feature_extractor = FeatureExtractor(SCENERY_KEYWORDS, REGION_SYNONYMS, _get_route_km)
+trail_features = TrailFeatureStore(settings.TRAIL_FEATURES_PATH, trail_feature_extractor)
+
+def _has_keyword(route, features, kw: str) -> bool:
+    """설명/상세 설명에 kw 포함 여부 - 경치 키워드는 비트 검사, 그 외는 문자열 검사"""
+    bit = trail_feature_extractor.scenery_bits.get(kw)
+    if bit is not None:
+        return bool(features.scenery & bit)
+    return kw in f"{getattr(route,'description','') or ''} {getattr(route,'description_detail','') or ''}"
+
+def _has_region(route, features, region: str) -> bool:
+    bit = trail_feature_extractor.region_bits.get(region)
+    if bit is not None:
+        return bool(features.region & bit)
+    return (getattr(route, "city_name", "") or "").find(region) >= 0
+
+def _difficulty_score(route, features, desired: str):
+    """difficulty_match_score와 같은 규칙을 난이도 비트로"""
+    bit = DIFF_BITS.get(desired) if desired else None
+    if bit is None:
+        return difficulty_match_score(getattr(route, "difficulty_level", None), desired)
+    if features.diff & bit:
+        return 1.0
+    if desired == "보통" and features.diff & (DIFF_EASY | DIFF_HARD):
+        return 0.5
+    return 0.0
+
 def length_match_score(route_km: float, desired_range):
     if not route_km or not desired_range:
         return 0.0
@@ -239,7 +436,8 @@ WEIGHTS = {
     "keywords": 1.6,
 }
 
-def score_route(route, user_prefs, user_location=None):
+def score_route(route, user_prefs, user_location=None, dist_km=None):
+    """dist_km: 미리 일괄 계산한 user_location까지 거리 (없으면 여기서 계산)"""
     score = 0.0
 
     # 길이 (연속 스코어)
@@ -267,7 +465,8 @@ def score_route(route, user_prefs, user_location=None):
 
     # 거리(가까울수록 ↑)
     if user_location and getattr(route, "spot_latitude", None) and getattr(route, "spot_longitude", None):
-        dist_km = haversine(user_location, (route.spot_latitude, route.spot_longitude))
+        if dist_km is None:
+            dist_km = haversine(user_location, (route.spot_latitude, route.spot_longitude))
         score += WEIGHTS["distance"] * max(0.0, 1.0 - (dist_km / 10.0))  # 0km→1, 10km→0
 
     # 편의 시설
@@ -294,21 +493,316 @@ def score_route(route, user_prefs, user_location=None):
 
     return score
 
-def rerank_routes(routes, user_prefs, user_location=None):
-    scored = [(score_route(route, user_prefs, user_location), route) for route in routes]
+def route_distances(routes, user_location):
+    """코스 목록의 시작점까지 거리(km) 배열을 한 번에 (좌표 없는 코스는 NaN)"""
+    lat_rad, lng_rad, cos_lat, valid = to_radians(
+        [getattr(r, "spot_latitude", None) for r in routes],
+        [getattr(r, "spot_longitude", None) for r in routes],
+    )
+    dist = distance_to_many(user_location[0], user_location[1], lat_rad, lng_rad, cos_lat,
+                            settings.GEO_DISTANCE_METHOD)
+    return np.where(valid, dist, np.nan)
+
+def rerank_routes(routes, user_prefs, user_location=None, k: int | None = None):
+    if user_location and routes:
+        dists = route_distances(routes, user_location).tolist()
+    else:
+        dists = [None] * len(routes)
+    scored = [(score_route(route, user_prefs, user_location, d), route) for route, d in zip(routes, dists)]
+    if k is not None:
+        # 상위 k개만 필요하면 크기 k 힙 (sorted(..., reverse=True)[:k]와 같은 결과)
+        return [route for _, route in heapq.nlargest(k, scored, key=lambda x: x[0])]
     scored.sort(reverse=True, key=lambda x: x[0])
     return [route for _, route in scored]
 
+# -----------------------------
+# 컬럼형 일괄 스코어링 (후보 전체를 NumPy로 한 번에)
+# -----------------------------
+class _ColumnFeatures:
+    """컬럼 배열 → 위치별 TrailFeatures (공유 파일에서 연 컬럼은 객체 목록 대신 필요할 때 만든다)"""
+    __slots__ = ("cols",)
+
+    def __init__(self, cols):
+        self.cols = cols
+
+    def __len__(self):
+        return self.cols.n
+
+    def __getitem__(self, i):
+        c = self.cols
+        km = float(c.km[i])
+        return TrailFeatures(
+            km=None if math.isnan(km) else km, diff=int(c.diff[i]), toilet=bool(c.toilet[i]),
+            store=bool(c.store[i]), region=int(c.region[i]), scenery=int(c.scenery[i]),
+        )
+
+class TrailColumns:
+    """
+    코스 특성(TrailFeatures)을 후보 배열 단위로 쓰기 위한 컬럼 배열.
+    score_route_with_breakdown과 같은 규칙을 후보 배열 단위로 적용한다.
+    """
+
+    # 공유 인덱스 파일로 내보내는 배열 (report는 제보 반영으로 자주 바뀌므로 프로세스마다 스냅샷에서 만든다)
+    ARRAYS = ("km", "diff", "toilet", "store", "region", "scenery", "lat_rad", "lng_rad", "cos_lat", "has_coord")
+
+    def __init__(self, trails: list, features: list):
+        n = len(trails)
+        self.n = n
+        self.trails = trails
+        self.features = features
+        self.km = np.array([np.nan if f.km is None else f.km for f in features], dtype=float)  # 없으면 NaN
+        self.diff = np.fromiter((f.diff for f in features), dtype=np.uint8, count=n)       # 난이도 비트
+        self.toilet = np.fromiter((f.toilet for f in features), dtype=bool, count=n)
+        self.store = np.fromiter((f.store for f in features), dtype=bool, count=n)
+        self.region = np.fromiter((f.region for f in features), dtype=np.uint64, count=n)    # 지역 비트마스크
+        self.scenery = np.fromiter((f.scenery for f in features), dtype=np.uint64, count=n)  # 경치 키워드 비트마스크
+        self.report = np.zeros(n)              # report_count (None → 0)
+        self.lat_rad = np.zeros(n)
+        self.lng_rad = np.zeros(n)
+        self.has_coord = np.zeros(n, dtype=bool)
+
+        for i, t in enumerate(trails):
+            self.report[i] = getattr(t, "report_count", 0) or 0
+            lat = getattr(t, "spot_latitude", None)
+            lng = getattr(t, "spot_longitude", None)
+            if lat and lng:
+                self.has_coord[i] = True
+                self.lat_rad[i] = math.radians(lat)
+                self.lng_rad[i] = math.radians(lng)
+
+        self.cos_lat = np.cos(self.lat_rad)   # 거리 계산용 (요청마다 다시 계산하지 않음)
+
+        # 근접 후보 생성용 공간 인덱스 (스냅샷 버전과 함께 생성/교체)
+        self.geo = TrailGeoIndex(self.lat_rad, self.lng_rad, self.has_coord)
+
+    def distances(self, user_location, idx):
+        """후보 idx의 시작점까지 거리(km) 배열 (좌표 없는 코스 값은 쓰지 않음 - has_coord로 거른다)"""
+        return distance_to_many(user_location[0], user_location[1], self.lat_rad[idx], self.lng_rad[idx],
+                                self.cos_lat[idx], settings.GEO_DISTANCE_METHOD)
+
+    def to_arrays(self) -> dict:
+        return {name: getattr(self, name) for name in self.ARRAYS}
+
+    @classmethod
+    def from_arrays(cls, trails: list, arrays: dict) -> "TrailColumns":
+        """to_arrays 결과(mmap 배열)로 생성 - 특성 배열은 복사 없이 공유, 제보 배열/공간 인덱스만 새로 만든다"""
+        cols = cls.__new__(cls)
+        cols.n = len(trails)
+        cols.trails = trails
+        for name in cls.ARRAYS:
+            setattr(cols, name, arrays[name])
+        cols.features = _ColumnFeatures(cols)
+        cols.report = np.fromiter((getattr(t, "report_count", 0) or 0 for t in trails), dtype=float, count=len(trails))
+        cols.geo = TrailGeoIndex(cols.lat_rad, cols.lng_rad, cols.has_coord)
+        return cols
+
+    def with_reports(self, trails: list) -> "TrailColumns":
+        """report_count만 바뀐 같은 순서의 코스 목록 → 제보 배열만 새로 만들고 나머지 배열/공간 인덱스는 공유"""
+        cols = copy.copy(self)
+        cols.trails = trails
+        cols.report = np.fromiter((getattr(t, "report_count", 0) or 0 for t in trails), dtype=float, count=len(trails))
+        return cols
+
+    def region_mask(self, region: str, idx):
+        bit = trail_feature_extractor.region_bits.get(region)
+        if bit is not None:
+            return (self.region[idx] & np.uint64(bit)) != 0
+        return np.array([_has_region(self.trails[i], self.features[i], region) for i in idx], dtype=bool)
+
+    def keyword_hits(self, keywords: list, idx):
+        hits = np.zeros(len(idx))
+        scenery = self.scenery[idx]
+        for kw in keywords:
+            bit = trail_feature_extractor.scenery_bits.get(kw)
+            if bit is not None:
+                hits += (scenery & np.uint64(bit)) != 0
+            else:
+                hits += np.array([_has_keyword(self.trails[i], self.features[i], kw) for i in idx])
+        return hits
+
+_columns_lock = threading.Lock()
+_columns_cache = {"version": None, "base_version": None, "columns": None}
+
+def get_trail_columns(trails: list, version=None, base_version=None) -> TrailColumns:
+    """
+    스냅샷 버전별로 컬럼을 캐시 (버전이 없으면 매번 생성).
+    base_version이 캐시와 같으면(제보 수만 바뀐 스냅샷) 제보 배열만 바꾼다.
+    """
+    if version is None:
+        return TrailColumns(trails, trail_features.sync(trails))
+    with _columns_lock:
+        if _columns_cache["version"] != version:
+            prev = _columns_cache["columns"]
+            if prev is not None and base_version is not None and _columns_cache["base_version"] == base_version:
+                cols = prev.with_reports(trails)
+            else:
+                features = trail_features.sync(trails, version=base_version if base_version is not None else version)
+                cols = TrailColumns(trails, features)
+            _columns_cache.update(version=version, base_version=base_version, columns=cols)
+        return _columns_cache["columns"]
+
+# -----------------------------
+# 워커 공유 인덱스 (BM25 역색인 + 특성/좌표 컬럼을 버전별 파일로 만들어 mmap으로 공유)
+# -----------------------------
+shared_index = SharedIndexStore(settings.TRAIL_SHARED_INDEX_DIR, keep=settings.TRAIL_SHARED_INDEX_KEEP)
+
+def shared_index_key(trails) -> str:
+    """공유 인덱스 내용 해시: 코스 순서/텍스트/좌표 + 토크나이저(사용자 사전) + 특성 단어 목록 + 필드 가중치 + LSA 차원"""
+    h = hashlib.blake2b(digest_size=16)
+    h.update(repr((SHARED_FORMAT_VERSION, keyword_tokenizer.fingerprint, trail_feature_extractor.fingerprint,
+                   sorted(trail_index.weights.items()), trail_index.lsa_dim)).encode("utf-8"))
+    for t in trails:
+        h.update(repr((
+            t.trail_id, bm25_fields(t), [getattr(t, c, None) for c in SOURCE_COLUMNS],
+            getattr(t, "spot_latitude", None), getattr(t, "spot_longitude", None),
+        )).encode("utf-8"))
+        h.update(b"\x1e")
+    return h.hexdigest()
+
+def _build_shared_arrays(trails, version):
+    """이 프로세스에서 역색인/컬럼을 만들어 공유 파일용 배열로 (빌드 잠금 안에서만 호출)"""
+    bm25, _ = trail_index.sync(trails, version=version)
+    cols = TrailColumns(trails, trail_features.sync(trails, version=version))
+    bm25_arrays, bm25_meta = bm25.to_arrays()
+    arrays = {f"bm25.{name}": arr for name, arr in bm25_arrays.items()}
+    # LSA는 파일 쪽 용어 번호(정렬 순서)에 맞춰 다시 만든다
+    lsa = LsaIndex.from_bm25(InvertedBM25.from_arrays(bm25_arrays, bm25_meta), dim=trail_index.lsa_dim) \
+        if trail_index.lsa_dim > 0 else None
+    if lsa is not None:
+        arrays.update((f"lsa.{name}", arr) for name, arr in lsa.to_arrays().items())
+    arrays.update((f"cols.{name}", arr) for name, arr in cols.to_arrays().items())
+    arrays["trail_ids"] = np.fromiter((t.trail_id for t in trails), dtype=np.int64, count=len(trails))
+    return arrays, {"bm25": bm25_meta, "trails": len(trails)}
+
+def _prepare_shared(snapshot):
+    """
+    공유 인덱스를 열어(없으면 한 워커만 만들어 게시) 이 프로세스의 역색인/컬럼 캐시를 교체.
+    열기만 하는 워커는 형태소 분석/특성 계산/디스크 인덱스 역직렬화를 하지 않는다.
+    """
+    trails = snapshot.trails
+    key = shared_index_key(trails)
+    if key == shared_index.key and trail_index.version == snapshot.base_version:
+        return
+    arrays, meta, _ = shared_index.acquire(key, lambda: _build_shared_arrays(trails, snapshot.base_version))
+    bm25 = InvertedBM25.from_arrays({name[5:]: a for name, a in arrays.items() if name.startswith("bm25.")},
+                                    meta["bm25"])
+    cols = TrailColumns.from_arrays(trails, {name[5:]: a for name, a in arrays.items() if name.startswith("cols.")})
+    lsa_arrays = {name[4:]: a for name, a in arrays.items() if name.startswith("lsa.")}
+    lsa = LsaIndex.from_arrays(lsa_arrays, bm25.vocab) if lsa_arrays else None
+    trail_index.install(trails, bm25, version=snapshot.base_version, lsa=lsa)
+    with _columns_lock:
+        _columns_cache.update(version=snapshot.version, base_version=snapshot.base_version, columns=cols)
+
+def prepare_trails(snapshot):
+    """
+    새 코스 스냅샷 적재 직후 호출 (trail_snapshot 리스너).
+    특성 테이블/컬럼/BM25 인덱스를 미리 맞춰 첫 요청이 이 비용을 내지 않게 한다.
+    제보 수만 바뀐 스냅샷(base_version 유지)이면 특성/인덱스는 그대로, 컬럼의 제보 배열만 바뀐다.
+    공유 인덱스를 쓰면 전체 적재 때 파일 버전을 열어 교체 (실패하면 이 프로세스에서 직접 계산).
+    """
+    with span("trails.prepare"):
+        base_version = snapshot.base_version
+        full_load = base_version == snapshot.version
+        # 장소명을 사용자 사전에 반영 - 새 단어가 있으면 토큰이 달라지므로 질의 캐시도 비움
+        if (settings.KIWI_TRAIL_WORDS and full_load
+                and kiwi_pool.add_user_words(trail_place_words(snapshot.trails))):
+            query_understanding.clear()
+        if shared_index.enabled and full_load and snapshot.trails:
+            try:
+                with span("trails.shared_index"):
+                    _prepare_shared(snapshot)
+            except Exception as e:
+                print("[SHARED_INDEX] 공유 인덱스 사용 실패, 프로세스 내에서 계산합니다:", e)
+        get_trail_columns(snapshot.trails, version=snapshot.version, base_version=base_version)
+        trail_index.sync(snapshot.trails, version=base_version)
+
+def score_candidates(cols: TrailColumns, idx, user_prefs, user_location=None, dist=None):
+    """
+    후보 인덱스 배열 idx에 대한 총점 배열.
+    항목별 계산/합산 순서는 score_route_with_breakdown과 동일.
+    dist: cols.distances(user_location, idx)를 이미 계산했으면 전달
+    """
+    idx = np.asarray(idx, dtype=np.intp)
+    total = np.zeros(len(idx))
+    km = cols.km[idx]
+    has_km = ~np.isnan(km) & (km != 0)
+
+    # 길이
+    rng = user_prefs.get("length_range_km")
+    if rng:
+        lo, hi = rng
+        d = np.minimum(np.abs(km - lo), np.abs(km - hi))
+        s = np.where((lo <= km) & (km <= hi), 1.0, np.maximum(0.0, 1.0 - d / 5.0))
+        total += np.where(has_km, WEIGHTS["length"] * s, 0.0)
+    elif user_prefs.get("length") == "short":
+        total += np.where(has_km & (km < 3), 2.0, 0.0)
+    elif user_prefs.get("length") == "long":
+        total += np.where(has_km & (km > 10), 2.0, 0.0)
+
+    # 난이도
+    desired = user_prefs.get("difficulty")
+    if desired:
+        diff = cols.diff[idx]
+        bit = DIFF_BITS.get(desired)
+        if bit is None:
+            s = np.zeros(len(idx))
+        else:
+            s = np.where(diff & bit, 1.0, 0.0)
+            if desired == "보통":
+                s = np.where((s == 0) & (diff & (DIFF_EASY | DIFF_HARD) > 0), 0.5, s)
+        total += WEIGHTS["difficulty"] * s
+
+    # 플로깅 밀도
+    if user_prefs.get("trash"):
+        rpt = cols.report[idx]
+        length = np.where(has_km, km, 1.0)
+        dens = np.where((rpt != 0) & (length > 0), rpt / np.maximum(0.5, length), 0.0)
+        total += WEIGHTS["trash"] * np.minimum(1.5, np.log1p(dens + 1))
+
+    # 근접성
+    if user_location:
+        if dist is None:
+            dist = cols.distances(user_location, idx)
+        total += np.where(cols.has_coord[idx], WEIGHTS["distance"] * np.maximum(0.0, 1.0 - (dist / 10.0)), 0.0)
+
+    # 편의시설
+    if user_prefs.get("toilet"):
+        total += np.where(cols.toilet[idx], WEIGHTS["toilet"], 0.0)
+    if user_prefs.get("store"):
+        total += np.where(cols.store[idx], WEIGHTS["store"], 0.0)
+
+    # 지역
+    if user_prefs.get("region"):
+        total += np.where(cols.region_mask(user_prefs["region"], idx), WEIGHTS["region"], 0.0)
+
+    # 테마 키워드
+    if user_prefs.get("keywords"):
+        hits = cols.keyword_hits(user_prefs["keywords"], idx)
+        total += np.where(hits > 0, WEIGHTS["keywords"] * np.minimum(1.0, hits / 3.0), 0.0)
+
+    return total
+
+def rank_candidates(totals, k: int):
+    """
+    총점 내림차순 상위 k개의 (후보 내) 위치.
+    부동소수 오차 수준의 차이는 동점으로 보고 기존처럼 입력 순서를 유지.
+    """
+    return top_k_indices(np.round(totals, 9), k)
+
 # -----------------------------
 # 점수 + 내러티브 reason 생성
 # -----------------------------
-def score_route_with_breakdown(route, user_prefs, user_location=None):
-    """총점과 이유 생성을 위한 부가정보를 함께 계산."""
+def score_route_with_breakdown(route, user_prefs, user_location=None, features=None, dist_km=None):
+    """
+    총점과 이유 생성을 위한 부가정보를 함께 계산. features: 미리 계산한 TrailFeatures (없으면 여기서 계산)
+    dist_km: 미리 일괄 계산한 user_location까지 거리 (없으면 여기서 계산)
+    """
+    f = features if features is not None else trail_feature_extractor.compute(route)
     breakdown = {}
     total = 0.0
 
     # 길이
-    route_km = _get_route_km(route)
+    route_km = f.km
     rng = user_prefs.get("length_range_km")
     part = 0.0
     if rng and route_km:
@@ -323,10 +817,7 @@ def score_route_with_breakdown(route, user_prefs, user_location=None):
     breakdown["_route_km"] = route_km
 
     # 난이도
-    part = WEIGHTS["difficulty"] * difficulty_match_score(
-        getattr(route, "difficulty_level", None),
-        user_prefs.get("difficulty")
-    )
+    part = WEIGHTS["difficulty"] * _difficulty_score(route, f, user_prefs.get("difficulty"))
     if part:
         breakdown["difficulty"] = round(part, 3); total += part
 
@@ -342,30 +833,28 @@ def score_route_with_breakdown(route, user_prefs, user_location=None):
 
     # 근접성
     if user_location and getattr(route, "spot_latitude", None) and getattr(route, "spot_longitude", None):
-        dist_km = haversine(user_location, (route.spot_latitude, route.spot_longitude))
+        if dist_km is None:
+            dist_km = haversine(user_location, (route.spot_latitude, route.spot_longitude))
         ppart = WEIGHTS["distance"] * max(0.0, 1.0 - (dist_km / 10.0))
         if ppart:
             breakdown["proximity"] = round(ppart, 3); total += ppart
             breakdown["_distance_km"] = round(dist_km, 2)
 
     # 편의시설
-    toilet_desc = (getattr(route, "toilet_description", "") or "")
-    amen_desc = (getattr(route, "amenity_description", "") or "")
-    if user_prefs.get("toilet") and toilet_desc and "없음" not in toilet_desc:
+    if user_prefs.get("toilet") and f.toilet:
         breakdown["toilet"] = round(WEIGHTS["toilet"], 3); total += WEIGHTS["toilet"]
-    if user_prefs.get("store") and amen_desc and "없음" not in amen_desc:
+    if user_prefs.get("store") and f.store:
         breakdown["store"] = round(WEIGHTS["store"], 3); total += WEIGHTS["store"]
 
     # 지역
-    if user_prefs.get("region") and (getattr(route, "city_name", "") or "").find(user_prefs["region"]) >= 0:
+    if user_prefs.get("region") and _has_region(route, f, user_prefs["region"]):
         breakdown["region"] = round(WEIGHTS["region"], 3); total += WEIGHTS["region"]
 
     # 테마 키워드
     kw_hits = 0
     if user_prefs.get("keywords"):
-        blob = f"{getattr(route,'description','') or ''} {getattr(route,'description','') or ''} {getattr(route,'description_detail','') or ''}"
         for kw in user_prefs["keywords"]:
-            if kw in blob:
+            if _has_keyword(route, f, kw):
                 kw_hits += 1
         if kw_hits:
             kpart = WEIGHTS["keywords"] * min(1.0, kw_hits / 3.0)
@@ -374,9 +863,9 @@ def score_route_with_breakdown(route, user_prefs, user_location=None):
 
     return total, breakdown
 
-def _matched_keywords(route, prefs):
-    blob = f"{getattr(route,'description','') or ''} {getattr(route,'description_detail','') or ''}"
-    return [kw for kw in prefs.get('keywords', []) if kw in blob]
+def _matched_keywords(route, prefs, features=None):
+    f = features if features is not None else trail_feature_extractor.compute(route)
+    return [kw for kw in prefs.get('keywords', []) if _has_keyword(route, f, kw)]
 
 def _describe_distance_km(d):
     if d is None:
@@ -393,7 +882,8 @@ def _describe_density(dens, cnt):
     if dens < 1.5:          return f"플로깅 제보 {cnt}건으로 보통 수준입니다"
     return f"플로깅 제보 {cnt}건으로 활동 포인트가 많은 편입니다"
 
-def format_reason_narrative(route, prefs, breakdown, score, rank=None, top_score=None, total_candidates=None):
+def format_reason_narrative(route, prefs, breakdown, score, rank=None, top_score=None, total_candidates=None,
+                            features=None):
     """
     줄글로 reason 생성. 만점 없이 상대 점수/순위를 함께 표현.
     """
@@ -401,7 +891,7 @@ def format_reason_narrative(route, prefs, breakdown, score, rank=None, top_score
     dist = breakdown.get("_distance_km")
     cnt = breakdown.get("_report_count", 0)
     dens = breakdown.get("_report_density")
-    kws = _matched_keywords(route, prefs)
+    kws = _matched_keywords(route, prefs, features) if breakdown.get("_keyword_hits") else []
     parts = []
 
     # 헤더: 점수/상대 지표
@@ -432,7 +922,7 @@ def format_reason_narrative(route, prefs, breakdown, score, rank=None, top_score
     if prefs.get("trash"):
         dens_text = _describe_density(dens, cnt)
         if dens_text: detail_bits.append(dens_text)
-    if prefs.get("region") and prefs["region"] in (getattr(route,"city_name","") or ""):
+    if prefs.get("region") and "region" in breakdown:   # breakdown의 지역 판정과 같은 조건
         detail_bits.append(f"{prefs['region']} 권역 조건에도 부합합니다")
     if breakdown.get("_keyword_hits"):
         if kws:
@@ -451,8 +941,11 @@ def format_reason_narrative(route, prefs, breakdown, score, rank=None, top_score
 # -----------------------------
 # 추천 결과: 총점 + 내러티브 reason (최대 3개)
 # -----------------------------
-def recommend_routes_brief(user_text: str, trails: list, user_location=None, k: int = 3):
+def recommend_routes_brief(user_text: str, trails: list, user_location=None, k: int = 3, trails_version=None,
+                           trails_base_version=None):
     """
+    trails_version: 스냅샷 버전을 넘기면 같은 버전에서는 인덱스 동기화를 생략
+    trails_base_version: 스냅샷의 base_version (제보 수만 바뀐 스냅샷에서도 인덱스/특성을 그대로 사용)
     반환:
     [
       {"trail_id": 1, "trail_name": "○○코스", "score": 7.42, "reason": "사연 유사도 점수는 ..."},
@@ -461,43 +954,64 @@ def recommend_routes_brief(user_text: str, trails: list, user_location=None, k:
     """
     k = min(k, 3)
 
-    # 1) BM25 넉넉히 뽑기
+    # 1) BM25(+ LSA 의미 유사도) 점수로 넉넉히 뽑기
     initial_k = max(50, k * 3)
-    bm25, _ = build_bm25_corpus(trails)
-    prefs = extract_user_prefs(user_text)
-    query = expand_query_tokens(user_text, prefs)
-    scores = bm25.get_scores(query) if query else [0.0] * len(trails)
-    top_idx = sorted(range(len(scores)), key=lambda i: scores[i], reverse=True)[:initial_k]
+    with span("recommend.query"):
+        prefs, query = understand_query(user_text)
+    # 스냅샷이 바뀐 직후면 인덱스 동기화(바뀐 코스 형태소 분석)도 이 구간에 포함
+    with span("recommend.bm25"):
+        index_version = trails_base_version if trails_base_version is not None else trails_version
+        scores = retrieval_scores(trails, query, version=index_version)
+        top_idx = top_k_indices(scores, initial_k).tolist()
+    cols = get_trail_columns(trails, version=trails_version, base_version=trails_base_version)
+
+    # 1-1) 위치가 있으면 반경 내 근처 코스도 후보에 합침 (텍스트 매칭이 약해도 근접 점수 기회 부여)
+    if user_location and settings.RECOMMEND_GEO_MAX_CANDIDATES > 0:
+        with span("recommend.geo"):
+            _, near = cols.geo.nearest(
+                user_location[0], user_location[1],
+                k=settings.RECOMMEND_GEO_MAX_CANDIDATES,
+                radius_km=settings.RECOMMEND_GEO_RADIUS_KM,
+            )
+        seen = set(top_idx)
+        top_idx = top_idx + [int(i) for i in near if int(i) not in seen]
     selected = [trails[i] for i in top_idx]
 
-    # 2) 재정렬 + 내러티브 생성
-    rows = []
-    for r in selected:
-        total, bd = score_route_with_breakdown(r, prefs, user_location)
-        rows.append((total, r, bd))
-    rows.sort(key=lambda x: x[0], reverse=True)
+    # 2) 후보 전체를 컬럼 단위로 일괄 채점 → 상위 k개만 breakdown 생성
+    with span("recommend.rerank"):
+        # 거리는 후보 전체에 한 번만 계산해 일괄 채점과 상위 k개 breakdown이 같은 값을 쓴다
+        dist = cols.distances(user_location, top_idx) if user_location else None
+        totals = score_candidates(cols, top_idx, prefs, user_location, dist=dist)
+        rows = []
+        for pos in rank_candidates(totals, k):
+            r = selected[pos]
+            f = cols.features[top_idx[pos]]
+            total, bd = score_route_with_breakdown(r, prefs, user_location, features=f,
+                                                   dist_km=float(dist[pos]) if dist is not None else None)
+            rows.append((total, r, bd, f))
+        rows.sort(key=lambda x: x[0], reverse=True)
 
     out = []
     top_score = rows[0][0] if rows else None
-    total_candidates = len(rows)
-    for idx, (total, r, bd) in enumerate(rows[:k], start=1):
-        reason_text = format_reason_narrative(
-            route=r, prefs=prefs, breakdown=bd, score=total,
-            rank=idx, top_score=top_score, total_candidates=total_candidates
-        )
-        out.append({
-            "trail_id": getattr(r, "trail_id", None),
-            "trail_name": getattr(r, "trail_name", None),
-            "score": round(total, 2),
-            "reason": reason_text,
-        })
+    total_candidates = len(selected)
+    with span("recommend.narrative"):
+        for idx, (total, r, bd, f) in enumerate(rows[:k], start=1):
+            reason_text = format_reason_narrative(
+                route=r, prefs=prefs, breakdown=bd, score=total,
+                rank=idx, top_score=top_score, total_candidates=total_candidates, features=f,
+            )
+            out.append({
+                "trail_id": getattr(r, "trail_id", None),
+                "trail_name": getattr(r, "trail_name", None),
+                "score": round(total, 2),
+                "reason": reason_text,
+            })
     return out
 
 # 기존 리스트만 필요할 때 (최대 3개)
 def recommend_routes(user_text: str, trails: list, user_location=None, k: int = 3) -> list:
     k = min(k, 3)
-    user_prefs = extract_user_prefs(user_text)
+    user_prefs, _ = understand_query(user_text)
     initial_k = max(50, k * 3)
     top_k = get_top_k_routes(user_text, trails, initial_k)
-    reranked = rerank_routes(top_k, user_prefs, user_location)
-    return reranked[:k]
+    return rerank_routes(top_k, user_prefs, user_location, k=k)
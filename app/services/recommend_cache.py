@@ -0,0 +1,136 @@
+import time
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from app.core.config import settings
+from app.services.geo import geohash_encode, geohash_center
+from app.services.query_understanding import normalize_story
+
+
+class RecommendCache:
+    """
+    추천 응답 캐시.
+    - 키: (정규화된 사연, 위치 geohash 칸, k, 코스 스냅샷 버전)
+      (제보 수와 무관한 사연은 호출측이 base_version을 넣어 제보 반영 패치 뒤에도 적중)
+    - 위치는 칸 중심으로 바꿔 계산 → 같은 칸의 요청은 같은 결과
+    - 세대(get_or_compute의 version, 전체 적재 버전)가 바뀌면 전부 비움, LRU(항목 수) + TTL
+    - coalesce=True면 같은 키의 동시 미스는 한 번만 계산하고 나머지는 결과를 기다림
+    """
+
+    def __init__(self, max_items: int = 2048, ttl_sec: float = 600, precision: int = 7, coalesce: bool = True):
+        self.max_items = max_items
+        self.ttl_sec = ttl_sec
+        self.precision = precision
+        self.coalesce = coalesce
+        self._lock = threading.Lock()
+        self._items = OrderedDict()   # key → (expires_at, value)
+        self._inflight = {}           # key → Future
+        self._version = None
+        # 지표
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.expired = 0
+        self.evicted = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_items > 0
+
+    def key(self, story: str, user_location, version, k: int = 3):
+        """(캐시 키, 계산에 쓸 위치) - 위치는 geohash 칸 중심으로 스냅"""
+        cell = None
+        if user_location is not None and self.enabled:
+            cell = geohash_encode(user_location[0], user_location[1], self.precision)
+            user_location = geohash_center(cell)
+        return (normalize_story(story), cell, k, version), user_location
+
+    def _lookup(self, key, version):
+        """락 안에서 호출. 유효한 값이면 (True, value)"""
+        if version != self._version:
+            if self._items:
+                self.invalidations += 1
+            self._items.clear()
+            self._version = version
+        entry = self._items.get(key)
+        if entry is None:
+            return False, None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._items[key]
+            self.expired += 1
+            return False, None
+        self._items.move_to_end(key)
+        return True, value
+
+    def get_or_compute(self, key, version, compute):
+        """(값, "hit" | "miss" | "coalesced")"""
+        if not self.enabled:
+            return compute(), "miss"
+        with self._lock:
+            found, value = self._lookup(key, version)
+            if found:
+                self.hits += 1
+                return value, "hit"
+            waiter = self._inflight.get(key) if self.coalesce else None
+            if waiter is None:
+                self.misses += 1
+                fut = Future()
+                if self.coalesce:
+                    self._inflight[key] = fut
+            else:
+                self.coalesced += 1
+        if waiter is not None:
+            return waiter.result(), "coalesced"
+
+        try:
+            value = compute()
+        except BaseException as e:
+            fut.set_exception(e)
+            raise
+        finally:
+            if self.coalesce:
+                with self._lock:
+                    self._inflight.pop(key, None)
+        fut.set_result(value)
+        with self._lock:
+            if version == self._version:
+                self._items[key] = (time.monotonic() + self.ttl_sec, value)
+                self._items.move_to_end(key)
+                while len(self._items) > self.max_items:
+                    self._items.popitem(last=False)
+                    self.evicted += 1
+        return value, "miss"
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+    def metrics(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses + self.coalesced
+            return {
+                "enabled": self.enabled,
+                "items": len(self._items),
+                "max_items": self.max_items,
+                "ttl_sec": self.ttl_sec,
+                "geohash_precision": self.precision,
+                "version": self._version,
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "hit_ratio": round((self.hits + self.coalesced) / total, 4) if total else None,
+                "expired": self.expired,
+                "evicted": self.evicted,
+                "invalidations": self.invalidations,
+                "inflight": len(self._inflight),
+            }
+
+
+recommend_cache = RecommendCache(
+    max_items=settings.RECOMMEND_CACHE_SIZE,
+    ttl_sec=settings.RECOMMEND_CACHE_TTL_SEC,
+    precision=settings.RECOMMEND_CACHE_GEOHASH_PRECISION,
+    coalesce=settings.RECOMMEND_CACHE_COALESCE,
+)
@@ -0,0 +1,157 @@
+import os
+import asyncio
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from app.core.config import settings
+from app.core.metrics import span
+
+
+class RenderStore:
+    """
+    주석(박스) 이미지 렌더링 + 보관소.
+    - 렌더링은 전용 스레드 풀에서 실행 → 탐지 JSON 응답과 분리
+    - 결과 JPEG 바이트는 detection_id 키로 메모리 LRU(바이트 상한)에 보관
+    - disk_dir을 주면 디스크에도 저장 (메모리에서 밀려나도 조회 가능, 파일 수 상한)
+    """
+
+    def __init__(self, workers: int = 2, max_bytes: int = 64 << 20, disk_dir: str | None = None,
+                 disk_max_files: int = 1000):
+        self.max_bytes = max_bytes
+        self.disk_dir = disk_dir
+        self.disk_max_files = disk_max_files
+        self._executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="render")
+        self._lock = threading.Lock()
+        self._mem = OrderedDict()   # detection_id → JPEG bytes
+        self._mem_bytes = 0
+        self._pending = {}          # detection_id → concurrent.futures.Future
+        self._disk_files = OrderedDict()
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+            # 재기동 시 기존 파일을 오래된 순으로 등록
+            names = sorted(
+                (f for f in os.listdir(disk_dir) if f.endswith(".jpg")),
+                key=lambda f: os.path.getmtime(os.path.join(disk_dir, f)),
+            )
+            for f in names:
+                self._disk_files[f[:-4]] = None
+        # 지표
+        self.rendered = 0
+        self.evicted = 0
+
+    # -----------------------------
+    # 렌더링 요청
+    # -----------------------------
+    def submit(self, detection_id: str, render_fn, *args):
+        """render_fn(*args) → JPEG bytes 를 백그라운드에서 실행하고 결과를 보관. Future 반환."""
+        # 등록 전에 렌더링이 끝나 pending이 남는 일이 없도록 락 안에서 제출
+        with self._lock:
+            fut = self._executor.submit(self._render, detection_id, render_fn, args)
+            self._pending[detection_id] = fut
+        return fut
+
+    def _render(self, detection_id: str, render_fn, args) -> bytes:
+        try:
+            with span("render.jpeg"):   # 박스 그리기 + JPEG 인코딩
+                data = render_fn(*args)
+            self.put(detection_id, data)
+            self.rendered += 1
+            return data
+        finally:
+            with self._lock:
+                self._pending.pop(detection_id, None)
+
+    async def render(self, detection_id: str, render_fn, *args) -> bytes:
+        """렌더링 후 결과를 기다림 (inline 응답용)"""
+        return await asyncio.wrap_future(self.submit(detection_id, render_fn, *args))
+
+    # -----------------------------
+    # 보관/조회
+    # -----------------------------
+    def put(self, detection_id: str, data: bytes):
+        with self._lock:
+            old = self._mem.pop(detection_id, None)
+            if old is not None:
+                self._mem_bytes -= len(old)
+            self._mem[detection_id] = data
+            self._mem_bytes += len(data)
+            while self._mem_bytes > self.max_bytes and len(self._mem) > 1:
+                _, dropped = self._mem.popitem(last=False)
+                self._mem_bytes -= len(dropped)
+                self.evicted += 1
+        if self.disk_dir:
+            self._put_disk(detection_id, data)
+
+    def _disk_path(self, detection_id: str) -> str:
+        return os.path.join(self.disk_dir, f"{detection_id}.jpg")
+
+    def _put_disk(self, detection_id: str, data: bytes):
+        path = self._disk_path(detection_id)
+        tmp = f"{path}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+        with self._lock:
+            self._disk_files[detection_id] = None
+            self._disk_files.move_to_end(detection_id)
+            stale = []
+            while len(self._disk_files) > self.disk_max_files:
+                stale.append(self._disk_files.popitem(last=False)[0])
+        for old in stale:
+            try:
+                os.remove(self._disk_path(old))
+            except FileNotFoundError:
+                pass
+
+    def _get_local(self, detection_id: str):
+        with self._lock:
+            data = self._mem.get(detection_id)
+            if data is not None:
+                self._mem.move_to_end(detection_id)
+                return data
+            pending = self._pending.get(detection_id)
+            on_disk = detection_id in self._disk_files
+        if pending is not None:
+            return pending
+        if on_disk:
+            try:
+                with open(self._disk_path(detection_id), "rb") as f:
+                    return f.read()
+            except FileNotFoundError:
+                return None
+        return None
+
+    async def get(self, detection_id: str) -> bytes | None:
+        """보관된 이미지 (렌더링 중이면 끝날 때까지 대기). 없으면 None."""
+        found = self._get_local(detection_id)
+        if found is None or isinstance(found, bytes):
+            return found
+        try:
+            return await asyncio.wrap_future(found)
+        except Exception:
+            return None
+
+    def has(self, detection_id: str) -> bool:
+        with self._lock:
+            return (detection_id in self._mem or detection_id in self._pending
+                    or detection_id in self._disk_files)
+
+    def metrics(self) -> dict:
+        with self._lock:
+            return {
+                "memory_items": len(self._mem),
+                "memory_bytes": self._mem_bytes,
+                "max_bytes": self.max_bytes,
+                "disk_items": len(self._disk_files),
+                "pending": len(self._pending),
+                "rendered": self.rendered,
+                "evicted": self.evicted,
+            }
+
+
+render_store = RenderStore(
+    workers=settings.RENDER_WORKERS,
+    max_bytes=settings.RENDER_CACHE_MB << 20,
+    disk_dir=settings.RENDER_DISK_DIR,
+    disk_max_files=settings.RENDER_DISK_MAX_FILES,
+)
@@ -0,0 +1,197 @@
+import time
+import threading
+import numpy as np
+from app.core.config import settings
+from app.core.db import new_session
+from app.core.metrics import span
+from app.repositories.trail_repo import add_report_counts
+from app.repositories.trail_snapshot import trail_snapshot
+from app.services.recommend import get_trail_columns
+
+
+class ReportIngestor:
+    """
+    위치가 붙은 탐지 제보 → 가장 가까운 코스의 report_count 증가 (쓰기 지연 일괄 반영).
+    - 요청 경로: 위치를 메모리 버퍼에 추가만 (이벤트 루프에서 호출 - 인덱스 조회/잠금 대기 없음)
+    - 백그라운드 스레드: flush_sec마다(대기 제보가 max_pending 이상이면 바로) 모아 둔 위치를
+      공간 인덱스 조회 한 번으로 최근접 코스에 붙이고 UPDATE 한 번(executemany)
+      → 제보가 몇 건이든 DB 쓰기는 주기당 1회, 행 수는 제보가 들어온 코스 수
+    - 반영 후 DB의 새 값으로 메모리 스냅샷의 해당 행만 교체 (전체 재적재 없음)
+    - DB 오류면 증가분을 버퍼로 되돌려 다음 주기에 다시 시도
+    """
+
+    def __init__(self, store, session_factory, snap_radius_km: float = 1.0, flush_sec: float = 5.0,
+                 max_pending: int = 500):
+        self.store = store
+        self.session_factory = session_factory
+        self.snap_radius_km = snap_radius_km
+        self.flush_sec = flush_sec
+        self.max_pending = max_pending
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()   # 주기 반영과 종료 시 반영이 겹치지 않게
+        self._points = []                     # (lat, lng, n) - 아직 코스에 붙이지 않은 제보
+        self._pending = {}                    # trail_id → 아직 반영하지 않은 증가분
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        # 지표
+        self.received = 0
+        self.unsnapped = 0       # 반경 안에 코스가 없어 버린 제보
+        self.flushes = 0
+        self.flushed_reports = 0
+        self.flushed_rows = 0
+        self.flush_errors = 0
+        self.last_flush_ms = None
+        self.last_error = None
+
+    # -----------------------------
+    # 요청 경로
+    # -----------------------------
+    def submit(self, lat: float, lng: float, n: int = 1):
+        """제보 n건 위치를 버퍼에 추가 (코스 찾기는 반영 스레드에서)"""
+        with self._lock:
+            self.received += n
+            self._points.append((lat, lng, n))
+            full = len(self._points) + len(self._pending) >= self.max_pending
+        if full:
+            self._wake.set()
+
+    def snap_many(self, points: list) -> list:
+        """[(lat, lng, n)] → 점마다 반경 안 가장 가까운 코스 trail_id (없으면 None)"""
+        snap = self.store.get()
+        cols = get_trail_columns(snap.trails, version=snap.version, base_version=snap.base_version)
+        lats = np.fromiter((p[0] for p in points), dtype=float, count=len(points))
+        lngs = np.fromiter((p[1] for p in points), dtype=float, count=len(points))
+        pos = cols.geo.nearest_many(lats, lngs, radius_km=self.snap_radius_km)
+        return [snap.trails[i].trail_id if i >= 0 else None for i in pos.tolist()]
+
+    def _snap_pending(self):
+        """버퍼의 위치를 코스별 증가분으로 (실패하면 위치를 버퍼로 되돌림)"""
+        with self._lock:
+            points, self._points = self._points, []
+        if not points:
+            return
+        try:
+            with span("reports.snap"):
+                trail_ids = self.snap_many(points)
+        except Exception:
+            with self._lock:
+                self._points[:0] = points
+            raise
+        unsnapped = 0
+        with self._lock:
+            for (_, _, n), tid in zip(points, trail_ids):
+                if tid is None:
+                    unsnapped += n
+                else:
+                    self._pending[tid] = self._pending.get(tid, 0) + n
+            self.unsnapped += unsnapped
+
+    # -----------------------------
+    # 일괄 반영
+    # -----------------------------
+    def _requeue(self, batch: dict):
+        with self._lock:
+            for tid, n in batch.items():
+                self._pending[tid] = self._pending.get(tid, 0) + n
+
+    def flush(self) -> int:
+        """모아 둔 위치를 코스에 붙여 DB에 반영하고 스냅샷을 패치. 반영한 제보 수."""
+        with self._flush_lock:
+            try:
+                self._snap_pending()
+            except Exception as e:
+                self.flush_errors += 1
+                self.last_error = f"{e.__class__.__name__}: {e}"
+                print("[REPORT_INGEST] 제보 위치 처리 실패:", e)
+                return 0
+            with self._lock:
+                batch, self._pending = self._pending, {}
+            if not batch:
+                return 0
+            t0 = time.perf_counter()
+            try:
+                db = self.session_factory()
+                try:
+                    with span("reports.flush"):
+                        counts = add_report_counts(db, batch)
+                    # 자기 쓰기로 바뀐 변경 신호를 스냅샷에 맞춰 둔다 (실패해도 반영은 끝났으므로 재시도하지 않음)
+                    try:
+                        signature = tuple(db.execute(self.store.PROBE_SQL).one())
+                    except Exception:
+                        signature = None
+                finally:
+                    db.close()
+            except Exception as e:
+                self._requeue(batch)
+                self.flush_errors += 1
+                self.last_error = f"{e.__class__.__name__}: {e}"
+                print("[REPORT_INGEST] 제보 반영 실패:", e)
+                return 0
+            self.store.apply_report_counts(counts, signature)
+            reports = sum(batch.values())
+            self.flushes += 1
+            self.flushed_reports += reports
+            self.flushed_rows += len(batch)
+            self.last_flush_ms = round((time.perf_counter() - t0) * 1000, 2)
+            self.last_error = None
+            return reports
+
+    # -----------------------------
+    # 백그라운드 반영
+    # -----------------------------
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="report-ingest", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """스레드를 멈추고 남은 증가분을 반영"""
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=10)
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.flush_sec)
+            self._wake.clear()
+            self.flush()
+        self.flush()
+
+    # -----------------------------
+    # 지표
+    # -----------------------------
+    def metrics(self) -> dict:
+        with self._lock:
+            pending_points = len(self._points)
+            pending_rows = len(self._pending)
+            pending_reports = sum(self._pending.values()) + sum(p[2] for p in self._points)
+        return {
+            "enabled": settings.REPORT_INGEST_ENABLED,
+            "received": self.received,
+            "unsnapped": self.unsnapped,
+            "pending_points": pending_points,
+            "pending_rows": pending_rows,
+            "pending_reports": pending_reports,
+            "flushes": self.flushes,
+            "flushed_reports": self.flushed_reports,
+            "flushed_rows": self.flushed_rows,
+            # 제보 1건당 DB 행 쓰기 (1보다 작을수록 같은 코스 제보가 많이 합쳐짐)
+            "rows_per_report": round(self.flushed_rows / self.flushed_reports, 4) if self.flushed_reports else None,
+            "flush_errors": self.flush_errors,
+            "last_flush_ms": self.last_flush_ms,
+            "last_error": self.last_error,
+        }
+
+
+report_ingestor = ReportIngestor(
+    trail_snapshot,
+    new_session,
+    snap_radius_km=settings.REPORT_SNAP_RADIUS_KM,
+    flush_sec=settings.REPORT_FLUSH_SEC,
+    max_pending=settings.REPORT_FLUSH_MAX_PENDING,
+)
@@ -0,0 +1,178 @@
+import os
+import json
+import time
+import shutil
+import threading
+from contextlib import contextmanager
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:   # Windows - 빌드 잠금 없이 (동시에 만들어도 같은 내용이고 rename 한 번만 성공)
+    fcntl = None
+
+# 파일 구성/배열 의미가 바뀌면 올려서 예전 버전을 쓰지 않게 한다 (key에 포함)
+SHARED_FORMAT_VERSION = 1
+
+
+class SharedIndexStore:
+    """
+    여러 워커 프로세스가 함께 읽는 버전별 읽기 전용 인덱스 파일.
+
+        root/
+          <key>/manifest.json, <배열 이름>.npy   key = 내용 해시 (같은 코스/토크나이저면 같은 디렉터리)
+          CURRENT                                 마지막으로 게시한 key
+          .lock                                   빌드 배타 잠금 (한 프로세스만 만들고 나머지는 기다렸다 연다)
+
+    - 게시: 임시 디렉터리에 모두 쓴 뒤 rename 한 번으로 공개 → 읽는 쪽은 반쯤 쓴 버전을 볼 수 없음
+    - 열기: np.load(mmap_mode="r") → 페이지 캐시를 프로세스끼리 공유 (복사/역직렬화 없음)
+    - 오래된 버전은 keep개만 남기고 지운다 (이미 매핑한 프로세스는 계속 읽을 수 있음 - POSIX)
+    """
+
+    def __init__(self, root: str, keep: int = 3):
+        self.root = root
+        self.keep = max(1, keep)
+        self._lock = threading.Lock()   # 같은 프로세스 안의 동시 빌드 방지 (flock은 프로세스 단위)
+        self.key = None                 # 지금 열어 둔 버전
+        # 지표
+        self.opened = 0
+        self.built = 0
+        self.last_open_ms = None
+        self.last_build_ms = None
+        self.mapped_bytes = 0
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.root)
+
+    def _path(self, *parts) -> str:
+        return os.path.join(self.root, *parts)
+
+    # -----------------------------
+    # 열기
+    # -----------------------------
+    def open(self, key: str):
+        """게시된 key 버전을 mmap으로 열기 → (배열 dict, 메타) / 없거나 손상됐으면 None"""
+        directory = self._path(key)
+        try:
+            with open(os.path.join(directory, "manifest.json"), encoding="utf-8") as f:
+                manifest = json.load(f)
+            if manifest.get("format") != SHARED_FORMAT_VERSION or manifest.get("key") != key:
+                return None
+            arrays = {}
+            for name, spec in manifest["arrays"].items():
+                path = os.path.join(directory, f"{name}.npy")
+                # 빈 배열은 mmap할 데이터가 없으므로 그냥 읽는다
+                arrays[name] = np.load(path, mmap_mode="r" if spec["size"] else None)
+        except (OSError, ValueError, KeyError) as e:
+            if not isinstance(e, FileNotFoundError):
+                print("[SHARED_INDEX] 공유 인덱스 열기 실패:", key, e)
+            return None
+        return arrays, manifest["meta"]
+
+    # -----------------------------
+    # 게시
+    # -----------------------------
+    def publish(self, key: str, arrays: dict, meta: dict):
+        """배열을 새 버전으로 쓰고 원자적으로 공개 + CURRENT 교체"""
+        os.makedirs(self.root, exist_ok=True)
+        target = self._path(key)
+        tmp = self._path(f".{key}.{os.getpid()}.tmp")
+        shutil.rmtree(tmp, ignore_errors=True)
+        os.makedirs(tmp)
+        specs = {}
+        for name, arr in arrays.items():
+            arr = np.ascontiguousarray(arr)
+            np.save(os.path.join(tmp, f"{name}.npy"), arr, allow_pickle=False)
+            specs[name] = {"dtype": arr.dtype.str, "shape": list(arr.shape), "size": int(arr.size)}
+        manifest = {"format": SHARED_FORMAT_VERSION, "key": key, "published_at": time.time(),
+                    "arrays": specs, "meta": meta}
+        with open(os.path.join(tmp, "manifest.json"), "w", encoding="utf-8") as f:
+            json.dump(manifest, f, ensure_ascii=False)
+        try:
+            os.rename(tmp, target)
+        except OSError:
+            # 다른 프로세스가 같은 key를 먼저 게시함 (내용이 같으므로 버림)
+            shutil.rmtree(tmp, ignore_errors=True)
+        current_tmp = self._path(f"CURRENT.{os.getpid()}.tmp")
+        with open(current_tmp, "w", encoding="ascii") as f:
+            f.write(key)
+        os.replace(current_tmp, self._path("CURRENT"))
+        self._prune(key)
+
+    def _prune(self, current: str):
+        """최근 keep개 버전만 남김 (지금 게시한 버전은 항상 남김)"""
+        try:
+            versions = [
+                e for e in os.scandir(self.root)
+                if e.is_dir() and not e.name.startswith(".") and e.name != current
+            ]
+        except OSError:
+            return
+        versions.sort(key=lambda e: e.stat().st_mtime, reverse=True)
+        for e in versions[self.keep - 1:]:
+            shutil.rmtree(e.path, ignore_errors=True)
+
+    @contextmanager
+    def _build_lock(self):
+        with self._lock:
+            if fcntl is None:
+                yield
+                return
+            os.makedirs(self.root, exist_ok=True)
+            with open(self._path(".lock"), "a+") as f:
+                fcntl.flock(f, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+
+    def acquire(self, key: str, build_fn):
+        """
+        key 버전을 연다. 없으면 빌드 잠금을 잡고(다른 워커가 만드는 중이면 기다림) 다시 확인한 뒤
+        build_fn() → (배열 dict, 메타)로 만들어 게시하고 연다. 반환: (배열 dict, 메타, 이 프로세스가 만들었는지)
+        """
+        t0 = time.perf_counter()
+        found = self.open(key)
+        built = False
+        if found is None:
+            with self._build_lock():
+                found = self.open(key)
+                if found is None:
+                    arrays, meta = build_fn()
+                    self.publish(key, arrays, meta)
+                    found = self.open(key)
+                    if found is None:
+                        raise RuntimeError(f"게시한 공유 인덱스를 열 수 없습니다: {key}")
+                    built = True
+        elapsed = round((time.perf_counter() - t0) * 1000, 2)
+        if built:
+            self.built += 1
+            self.last_build_ms = elapsed
+        else:
+            self.opened += 1
+            self.last_open_ms = elapsed
+        self.key = key
+        self.mapped_bytes = sum(int(a.nbytes) for a in found[0].values())
+        return found[0], found[1], built
+
+    def current(self):
+        """마지막으로 게시된 key (없으면 None)"""
+        try:
+            with open(self._path("CURRENT"), encoding="ascii") as f:
+                return f.read().strip() or None
+        except OSError:
+            return None
+
+    def stats(self) -> dict:
+        return {
+            "root": self.root,
+            "enabled": self.enabled,
+            "key": self.key,
+            "published": self.current() if self.enabled else None,
+            "opened": self.opened,
+            "built": self.built,
+            "last_open_ms": self.last_open_ms,
+            "last_build_ms": self.last_build_ms,
+            "mapped_bytes": self.mapped_bytes,
+        }
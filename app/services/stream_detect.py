@@ -0,0 +1,147 @@
+import asyncio
+from collections import Counter
+
+
+class LatestFrame:
+    """
+    프레임 한 칸짜리 보관함: 추론이 밀리면 처리 전 프레임은 새 프레임으로 덮어쓴다 (최신 프레임만 처리).
+    수신 태스크가 put, 처리 루프가 get.
+    """
+
+    def __init__(self):
+        self._item = None
+        self._event = asyncio.Event()
+        self._closed = False
+
+    def put(self, seq: int, data: bytes) -> bool:
+        """덮어써서 버린 프레임이 있으면 True"""
+        dropped = self._item is not None
+        self._item = (seq, data)
+        self._event.set()
+        return dropped
+
+    def close(self):
+        self._closed = True
+        self._event.set()
+
+    async def get(self):
+        """(seq, 바이트) 또는 닫혔으면 None"""
+        while self._item is None:
+            if self._closed:
+                return None
+            self._event.clear()
+            await self._event.wait()
+        item, self._item = self._item, None
+        return item
+
+
+class FrameRateController:
+    """
+    클라이언트에 권장할 프레임 전송 간격(next_ms) 조절.
+    - 기본: 처리 시간 EWMA × headroom (최소 1000/max_fps)
+    - 프레임을 버렸거나 대기열이 가득 차면 간격을 곱으로 늘리고, 밀리지 않으면 조금씩 줄인다 (AIMD)
+    """
+
+    def __init__(self, max_fps: float = 10, max_interval_ms: float = 2000, headroom: float = 1.2,
+                 alpha: float = 0.2):
+        self.max_fps = max_fps
+        self.max_interval_ms = max_interval_ms
+        self.headroom = headroom
+        self.alpha = alpha
+        self.ewma_ms = None
+        self.interval_ms = self.min_interval_ms
+
+    @property
+    def min_interval_ms(self) -> float:
+        return 1000.0 / self.max_fps if self.max_fps > 0 else 0.0
+
+    def _clamp(self, v: float) -> float:
+        return min(self.max_interval_ms, max(self.min_interval_ms, v))
+
+    def update(self, proc_ms: float, dropped: int = 0) -> float:
+        """프레임 1장 처리 후 호출. dropped: 직전 처리 이후 버린 프레임 수"""
+        self.ewma_ms = proc_ms if self.ewma_ms is None else self.alpha * proc_ms + (1 - self.alpha) * self.ewma_ms
+        target = self.ewma_ms * self.headroom
+        if dropped:
+            self.interval_ms = self._clamp(max(target, self.interval_ms * 1.5))
+        else:
+            # 목표보다 크면 10%씩 줄여 천천히 따라감
+            self.interval_ms = self._clamp(max(target, self.interval_ms * 0.9))
+        return self.interval_ms
+
+    def overload(self) -> float:
+        """추론 대기열이 가득 차 프레임을 처리하지 못함"""
+        self.interval_ms = self._clamp(self.interval_ms * 2)
+        return self.interval_ms
+
+
+class BoxDeltaEncoder:
+    """
+    프레임별 결과를 직전에 보낸 값 대비 변화만 담은 dict로.
+    - boxes : 박스 구성이 바뀌었을 때만 전체 {"label": [...], "xyxy": [x1, y1, x2, y2, ...]} (정수 픽셀)
+              (라벨과 개수가 같고 좌표가 모두 tolerance_px 이내면 생략)
+    - counts: 개수가 바뀐 라벨만 (사라진 라벨은 0)
+    """
+
+    def __init__(self, tolerance_px: int = 8):
+        self.tolerance_px = tolerance_px
+        self._boxes = None    # 마지막으로 보낸 [(label, x1, y1, x2, y2), ...] (정렬)
+        self._counts = Counter()
+
+    def _same(self, boxes: list) -> bool:
+        if self._boxes is None or len(boxes) != len(self._boxes):
+            return False
+        tol = self.tolerance_px
+        for a, b in zip(boxes, self._boxes):
+            if a[0] != b[0] or any(abs(p - q) > tol for p, q in zip(a[1:], b[1:])):
+                return False
+        return True
+
+    def encode(self, xyxy, labels) -> dict:
+        boxes = sorted(
+            (label, round(x1), round(y1), round(x2), round(y2))
+            for label, (x1, y1, x2, y2) in zip(labels, xyxy)
+        )
+        out = {}
+        if not self._same(boxes):
+            out["boxes"] = {
+                "label": [b[0] for b in boxes],
+                "xyxy": [v for b in boxes for v in b[1:]],
+            }
+            self._boxes = boxes
+        counts = Counter(labels)
+        changed = {k: counts[k] for k in counts.keys() | self._counts.keys() if counts[k] != self._counts[k]}
+        if changed:
+            out["counts"] = changed
+        self._counts = counts
+        return out
+
+
+class StreamMetrics:
+    """스트리밍 탐지 세션 누적 지표"""
+
+    def __init__(self):
+        self.active = 0
+        self.sessions = 0
+        self.received = 0    # 받은 프레임
+        self.processed = 0   # 추론까지 마친 프레임
+        self.dropped = 0     # 최신 프레임에 밀려 버린 프레임
+        self.overloads = 0   # 대기열이 가득 차 건너뛴 프레임
+        self.errors = 0      # 디코딩 실패 등
+        self.proc_ms = 0.0   # 처리한 프레임의 디코딩 시작 → 결과 전송 시간 합
+
+    def metrics(self) -> dict:
+        return {
+            "active": self.active,
+            "sessions": self.sessions,
+            "received": self.received,
+            "processed": self.processed,
+            "dropped": self.dropped,
+            "overloads": self.overloads,
+            "errors": self.errors,
+            "drop_ratio": round(self.dropped / self.received, 4) if self.received else None,
+            "avg_proc_ms": round(self.proc_ms / self.processed, 2) if self.processed else None,
+        }
+
+
+stream_metrics = StreamMetrics()
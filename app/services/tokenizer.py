@@ -0,0 +1,214 @@
+import os
+import queue
+import hashlib
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from kiwipiepy import Kiwi
+
+# 키워드로 쓰는 품사: 일반/고유 명사, 동사, 형용사
+KEYWORD_TAGS = ("NNG", "NNP", "VV", "VA")
+
+
+class KiwiPool:
+    """
+    Kiwi 인스턴스 풀.
+    - 인스턴스 하나를 여러 스레드가 동시에 쓰지 않게 빌려 쓰고 반납 (모델 로드 1회 ≈ 1초, 수백 MB라 스레드별 생성 대신 풀)
+    - num_workers: 여러 문서를 한 번에 넘기면(tokenize(iterable)) Kiwi 내부 스레드로 병렬 분석 (-1이면 코어 수)
+    - 사용자 사전: 추가만 가능. 빌려 줄 때 아직 반영 안 된 단어를 그 인스턴스에 넣는다
+    """
+
+    def __init__(self, size: int = 2, num_workers: int = -1, user_dict_path: str = ""):
+        self.size = max(1, size)
+        self.num_workers = num_workers
+        self.user_dict_path = user_dict_path
+        self._lock = threading.Lock()
+        self._idle = queue.LifoQueue()   # [kiwi, 반영한 단어 수]
+        self._created = 0
+        self._words = []                  # 사용자 사전 단어 (추가 순서)
+        self._word_set = set()
+        self._base = self._dict_digest()
+        self.fingerprint = self._base
+        # 지표
+        self.waits = 0   # 빈 인스턴스가 없어 기다린 횟수
+
+    def _dict_digest(self) -> str:
+        h = hashlib.blake2b(digest_size=8)
+        if self.user_dict_path and os.path.exists(self.user_dict_path):
+            with open(self.user_dict_path, "rb") as f:
+                h.update(f.read())
+        return h.hexdigest()
+
+    def _create(self) -> list:
+        kiwi = Kiwi(num_workers=self.num_workers)
+        if self.user_dict_path:
+            kiwi.load_user_dictionary(self.user_dict_path)
+        kiwi.tokenize("형태소 분석기 워밍업")   # 첫 호출의 지연 초기화를 미리
+        return [kiwi, 0]
+
+    def _new_entry(self) -> list:
+        try:
+            return self._create()
+        except Exception:
+            with self._lock:
+                self._created -= 1
+            raise
+
+    def warm(self):
+        """풀 크기만큼 미리 생성 (시작 오케스트레이터 구성요소)"""
+        while True:
+            with self._lock:
+                if self._created >= self.size:
+                    return
+                self._created += 1
+            self._idle.put(self._new_entry())
+
+    def _apply_words(self, entry: list):
+        with self._lock:
+            pending = self._words[entry[1]:]
+            entry[1] = len(self._words)
+        for word, tag in pending:
+            entry[0].add_user_word(word, tag)
+
+    @contextmanager
+    def acquire(self):
+        try:
+            entry = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                create = self._created < self.size
+                if create:
+                    self._created += 1
+                else:
+                    self.waits += 1
+            entry = self._new_entry() if create else self._idle.get()
+        try:
+            self._apply_words(entry)
+            yield entry[0]
+        finally:
+            self._idle.put(entry)
+
+    def add_user_words(self, words, tag: str = "NNP") -> int:
+        """새 단어 수. 하나라도 추가되면 fingerprint가 바뀐다 (그 단어가 든 저장 토큰 무효화 신호)."""
+        new = sorted(set(w for w in words if w) - self._word_set)
+        if not new:
+            return 0
+        with self._lock:
+            new = [w for w in new if w not in self._word_set]
+            self._word_set.update(new)
+            self._words.extend((w, tag) for w in new)
+            h = hashlib.blake2b(self._base.encode("ascii"), digest_size=8)
+            for word, t in sorted(self._words):
+                h.update(f"{word}\x1f{t}\x1e".encode("utf-8"))
+            self.fingerprint = h.hexdigest()
+        return len(new)
+
+    def dictionary(self) -> tuple:
+        """(fingerprint, 사용자 사전 파일 해시, 추가한 단어 frozenset) - 같은 시점의 값"""
+        with self._lock:
+            return self.fingerprint, self._base, frozenset(self._word_set)
+
+    def stats(self) -> dict:
+        return {
+            "size": self.size,
+            "created": self._created,
+            "idle": self._idle.qsize(),
+            "num_workers": self.num_workers,
+            "user_words": len(self._words),
+            "waits": self.waits,
+            "fingerprint": self.fingerprint,
+        }
+
+
+class KeywordTokenizer:
+    """
+    문자열 → 키워드 토큰 (KEYWORD_TAGS 품사의 형태).
+    - tokenize: 질의용. 문서 해시 기준 LRU (사용자 사전이 바뀌면 비움)
+    - tokenize_many: 코퍼스 구축용. 중복 문서를 합쳐 한 번의 배치로 병렬 분석 (LRU는 거치지 않음)
+    - tokenize_many_offsets: tokenize_many + 토큰 시작 위치 (한 문서를 구간별로 나눌 때)
+    """
+
+    def __init__(self, pool: KiwiPool, tags=KEYWORD_TAGS, cache_size: int = 8192):
+        self.pool = pool
+        self.tags = frozenset(tags)
+        self.cache_size = cache_size
+        self._lock = threading.Lock()
+        self._cache = OrderedDict()   # blake2b(text) → 토큰 튜플
+        self._fingerprint = pool.fingerprint
+        # 지표
+        self.hits = 0
+        self.misses = 0
+        self.batch_docs = 0
+
+    @property
+    def fingerprint(self) -> str:
+        """토큰화 결과를 바꾸는 설정(사용자 사전)의 해시"""
+        return self.pool.fingerprint
+
+    def dictionary(self) -> tuple:
+        """KiwiPool.dictionary - 바뀐 단어가 든 문서만 다시 분석할 때"""
+        return self.pool.dictionary()
+
+    def _keywords(self, tokens) -> list:
+        return [t.form for t in tokens if t.tag in self.tags]
+
+    def tokenize(self, text: str) -> list:
+        if not text:
+            return []
+        key = hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+        fp = self.pool.fingerprint
+        with self._lock:
+            if fp != self._fingerprint:
+                self._cache.clear()
+                self._fingerprint = fp
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return list(cached)
+            self.misses += 1
+        with self.pool.acquire() as kiwi:
+            tokens = self._keywords(kiwi.tokenize(text))
+        if self.cache_size > 0:
+            with self._lock:
+                if fp == self._fingerprint:
+                    self._cache[key] = tuple(tokens)
+                    while len(self._cache) > self.cache_size:
+                        self._cache.popitem(last=False)
+        return tokens
+
+    def _batch(self, texts, convert) -> list:
+        texts = list(texts)
+        unique = list(dict.fromkeys(t for t in texts if t))
+        result = {}
+        if unique:
+            with self.pool.acquire() as kiwi:
+                for text, tokens in zip(unique, kiwi.tokenize(unique)):
+                    result[text] = convert(tokens)
+            self.batch_docs += len(unique)
+        return [list(result[t]) if t else [] for t in texts]
+
+    def tokenize_many(self, texts) -> list:
+        """texts 순서에 맞춘 토큰 리스트 목록"""
+        return self._batch(texts, self._keywords)
+
+    def tokenize_many_offsets(self, texts) -> list:
+        """tokenize_many와 같고 토큰마다 (형태, 원문 시작 위치)"""
+        return self._batch(texts, lambda tokens: [(t.form, t.start) for t in tokens if t.tag in self.tags])
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+    def metrics(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "items": len(self._cache),
+                "maxsize": self.cache_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / total, 4) if total else None,
+                "batch_docs": self.batch_docs,
+                "pool": self.pool.stats(),
+            }
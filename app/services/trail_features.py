@@ -0,0 +1,167 @@
+import os
+import hashlib
+import threading
+from dataclasses import dataclass
+import joblib
+
+# 저장 포맷이 바뀌면 올려서 예전 파일을 무시하게 한다
+FEATURES_FORMAT_VERSION = 1
+
+# 난이도 비트 (difficulty_level 문자열에 포함된 단어)
+DIFF_EASY, DIFF_MEDIUM, DIFF_HARD = 1, 2, 4
+DIFF_BITS = {"쉬움": DIFF_EASY, "보통": DIFF_MEDIUM, "어려움": DIFF_HARD}
+
+# 특성 계산에 쓰는 컬럼 - 이 값들이 같으면 특성도 같다
+SOURCE_COLUMNS = (
+    "length_detail", "length", "difficulty_level", "toilet_description",
+    "amenity_description", "city_name", "description", "description_detail",
+)
+
+
+@dataclass(frozen=True, slots=True)
+class TrailFeatures:
+    """요청과 무관한 코스별 값 (스냅샷 적재 시 한 번 계산)"""
+    km: float | None   # length_detail, 없으면 length 문자열에서 파싱
+    diff: int          # DIFF_* 비트 합
+    toilet: bool       # 화장실 정보 있고 "없음" 아님
+    store: bool        # 편의시설 정보 있고 "없음" 아님
+    region: int        # region_words 비트마스크 (city_name에 포함된 지역명)
+    scenery: int       # scenery_words 비트마스크 (설명 + 상세 설명에 포함된 키워드)
+
+
+def _digest(t) -> str:
+    h = hashlib.blake2b(digest_size=16)
+    for col in SOURCE_COLUMNS:
+        h.update(f"{getattr(t, col, None)!r}\x1e".encode("utf-8"))
+    return h.hexdigest()
+
+
+class FeatureExtractor:
+    """
+    코스 → TrailFeatures. 키워드/지역 목록 순서가 곧 비트 순서 (판정은 `kw in blob`과 같음).
+    """
+
+    def __init__(self, scenery_words, region_words, km_fn):
+        self.scenery_words = tuple(scenery_words)
+        self.region_words = tuple(region_words)
+        self.km_fn = km_fn   # 코스 → km (없으면 None)
+        self.scenery_bits = {w: 1 << i for i, w in enumerate(self.scenery_words)}
+        self.region_bits = {w: 1 << i for i, w in enumerate(self.region_words)}
+        # 목록이 바뀌면 저장된 비트마스크의 의미가 달라지므로 파일을 무시해야 한다
+        self.fingerprint = hashlib.blake2b(
+            "\x1f".join(self.scenery_words + ("\x1e",) + self.region_words).encode("utf-8"), digest_size=8,
+        ).hexdigest()
+
+    def compute(self, t) -> TrailFeatures:
+        diff = getattr(t, "difficulty_level", None) or ""
+        toilet_desc = getattr(t, "toilet_description", "") or ""
+        amen_desc = getattr(t, "amenity_description", "") or ""
+        city = getattr(t, "city_name", "") or ""
+        blob = f"{getattr(t, 'description', '') or ''} {getattr(t, 'description_detail', '') or ''}"
+        return TrailFeatures(
+            km=self.km_fn(t),
+            diff=sum(bit for word, bit in DIFF_BITS.items() if word in diff),
+            toilet=bool(toilet_desc) and "없음" not in toilet_desc,
+            store=bool(amen_desc) and "없음" not in amen_desc,
+            region=self.mask(city, self.region_bits),
+            scenery=self.mask(blob, self.scenery_bits),
+        )
+
+    @staticmethod
+    def mask(text: str, bits: dict) -> int:
+        """text에 포함된 단어들의 비트 합"""
+        m = 0
+        for w, bit in bits.items():
+            if w in text:
+                m |= bit
+        return m
+
+
+class TrailFeatureStore:
+    """
+    코스별 특성 테이블 (trail_id → (원본 컬럼 해시, TrailFeatures)).
+    - 스냅샷이 바뀌면 원본 컬럼이 바뀐 코스만 다시 계산
+    - joblib으로 디스크에 저장 (추천 인덱스 옆) → 재기동 시 그대로 로드
+    """
+
+    def __init__(self, path: str, extractor: FeatureExtractor):
+        self.path = path
+        self.extractor = extractor
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._items = {}
+        self._version = None
+        self._features = []   # 마지막 sync의 trails 순서에 맞춘 목록
+        self.computed = 0      # 지표: 새로 계산한 코스 수 (누적)
+
+    def load(self) -> bool:
+        with self._lock:
+            return self._load_locked()
+
+    def _load_locked(self) -> bool:
+        self._loaded = True
+        if not self.path or not os.path.exists(self.path):
+            return False
+        try:
+            state = joblib.load(self.path)
+        except Exception as e:
+            print("[TRAIL_FEATURES] 특성 테이블 로드 실패, 새로 만듭니다:", e)
+            return False
+        if state.get("format") != FEATURES_FORMAT_VERSION or state.get("vocab") != self.extractor.fingerprint:
+            return False
+        self._items = {tid: (digest, TrailFeatures(*values)) for tid, (digest, values) in state["items"].items()}
+        return True
+
+    def _save_locked(self):
+        if not self.path:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp = f"{self.path}.tmp"
+        state = {
+            "format": FEATURES_FORMAT_VERSION,
+            "vocab": self.extractor.fingerprint,
+            # 데이터클래스 대신 튜플로 저장 (클래스 경로가 바뀌어도 읽힘)
+            "items": {
+                tid: (digest, (f.km, f.diff, f.toilet, f.store, f.region, f.scenery))
+                for tid, (digest, f) in self._items.items()
+            },
+        }
+        try:
+            joblib.dump(state, tmp)
+            os.replace(tmp, self.path)  # 원자적 교체
+        except Exception as e:
+            print("[TRAIL_FEATURES] 특성 테이블 저장 실패:", e)
+
+    def sync(self, trails: list, version=None) -> list:
+        """trails 순서에 맞춘 TrailFeatures 목록. 같은 스냅샷 버전이면 바로 반환."""
+        with self._lock:
+            if not self._loaded:
+                self._load_locked()
+            if version is not None and version == self._version:
+                return self._features
+            items = {}
+            changed = 0
+            for t in trails:
+                digest = _digest(t)
+                prev = self._items.get(t.trail_id)
+                if prev is not None and prev[0] == digest:
+                    items[t.trail_id] = prev
+                else:
+                    items[t.trail_id] = (digest, self.extractor.compute(t))
+                    changed += 1
+            if changed or len(items) != len(self._items):
+                self._items = items
+                self.computed += changed
+                self._save_locked()
+            self._features = [items[t.trail_id][1] for t in trails]
+            self._version = version
+            return self._features
+
+    def stats(self) -> dict:
+        return {
+            "path": self.path,
+            "trails": len(self._items),
+            "version": self._version,
+            "computed": self.computed,
+            "vocab": self.extractor.fingerprint,
+        }
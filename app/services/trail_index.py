@@ -0,0 +1,281 @@
+import os
+import re
+import hashlib
+import threading
+from collections import OrderedDict
+import joblib
+from app.core.metrics import span
+from app.services.bm25_index import InvertedBM25
+from app.services.lsa_index import LsaIndex
+
+# 저장 포맷이 바뀌면 올려서 예전 파일을 무시하게 한다
+INDEX_FORMAT_VERSION = 3
+
+
+def _digest(fields: dict) -> str:
+    h = hashlib.blake2b(digest_size=16)
+    for name, text in fields.items():
+        h.update(f"{name}\x1f{text}\x1e".encode("utf-8"))
+    return h.hexdigest()
+
+
+def _corpus_key(fp, entries) -> str:
+    """토크나이저 + (trail_id, 필드 해시) 순서 - 같으면 같은 역색인"""
+    h = hashlib.blake2b(digest_size=16)
+    h.update(repr(fp).encode("utf-8"))
+    for trail_id, digest in entries:
+        h.update(f"{trail_id}\x1f{digest}\x1e".encode("utf-8"))
+    return h.hexdigest()
+
+
+class TrailIndex:
+    """
+    프로세스 전역 BM25 인덱스.
+    - 코스별 (필드 해시, 필드별 토큰)을 보관하고, 해시가 바뀐 코스만 한 번의 배치로 다시 형태소 분석
+      (tokenize_fn으로 원문 필드 → 토큰 필드 변환을 바꿀 수 있음)
+    - 사용자 사전 단어가 추가/삭제되면 그 단어가 든 코스만 다시 분석 (사전 파일이 바뀌면 전체)
+    - 점수는 역색인 BM25(InvertedBM25) - 필드 가중치는 문서 복제 대신 tf에 반영
+    - 토큰/역색인은 joblib으로 디스크에 저장 → 재기동 시 그대로 로드 (가중치가 바뀌면 역색인만 재구성)
+    - lsa_dim > 0이면 역색인 posting으로 LSA 의미 검색 인덱스도 함께 만든다 (역색인이 바뀔 때마다)
+    - 최근 코퍼스 몇 개의 (역색인, LSA)를 기억 → 재적재 직후 이전/새 스냅샷 요청이 번갈아 와도 다시 만들지 않음
+    """
+
+    RECENT_CORPORA = 2
+
+    def __init__(self, path: str, fields_fn, tokenizer, weights: dict | None = None, lsa_dim: int = 0,
+                 tokenize_fn=None):
+        self.path = path
+        self.fields_fn = fields_fn      # trail → {필드: 문자열}
+        self.tokenizer = tokenizer      # tokenize_many(문자열 목록) → 토큰 리스트 목록, fingerprint
+        self.tokenize_fn = tokenize_fn or self._tokenize_each   # [{필드: 문자열}] → [{필드: tokens}]
+        self.weights = dict(weights or {})
+        self.lsa_dim = lsa_dim
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._docs = {}      # trail_id → (digest, {필드: tokens})
+        self._order = ()     # BM25 문서 순서 (trail_id 튜플)
+        self._bm25 = None
+        self._version = None  # 마지막으로 동기화한 스냅샷 버전(있으면)
+        self._token_fp = None  # _docs 토큰을 만든 토크나이저 fingerprint
+        self._token_dict = None  # _docs 토큰을 만든 (사용자 사전 파일 해시, 추가 단어 frozenset)
+        self._key = None       # 현재 역색인의 코퍼스 키
+        self._bm25_fp = None   # 현재 역색인을 만든 토크나이저 fingerprint
+        self._shared = False   # 공유 인덱스(mmap)에서 받은 역색인 사용 중
+        self._lsa = None
+        self._lsa_bm25 = None  # _lsa를 만든 역색인 (다르면 다시 만든다)
+        self._recent = OrderedDict()   # 코퍼스 키 → (bm25, lsa, 공유 인덱스 여부)
+        self.last_tokenized = 0        # 마지막 재구성에서 다시 분석한 코스 수
+
+    # -----------------------------
+    # 디스크 저장/로드
+    # -----------------------------
+    def load(self) -> bool:
+        """디스크 인덱스 로드. 없거나 포맷이 다르면 빈 상태로 시작."""
+        with self._lock:
+            return self._load_locked()
+
+    def _load_locked(self) -> bool:
+        self._loaded = True
+        if not self.path or not os.path.exists(self.path):
+            return False
+        try:
+            state = joblib.load(self.path)
+        except Exception as e:
+            print("[TRAIL_INDEX] 인덱스 로드 실패, 새로 만듭니다:", e)
+            return False
+        if state.get("format") != INDEX_FORMAT_VERSION:
+            return False
+        self._docs = state["docs"]
+        self._order = tuple(state["order"])
+        self._token_fp = state.get("tokenizer")
+        self._token_dict = state.get("tokenizer_words")
+        # 가중치가 바뀌었으면 토큰은 그대로 쓰고 역색인만 다음 sync에서 다시 만든다
+        self._bm25 = state["bm25"] if state.get("weights") == self.weights else None
+        if self._bm25 is not None:
+            self._key = state.get("corpus")   # 없으면(예전 파일) 다음 sync에서 캐시된 토큰으로 재구성
+            self._bm25_fp = state.get("bm25_tokenizer")
+            if state.get("lsa_dim") == self.lsa_dim:
+                self._lsa, self._lsa_bm25 = state.get("lsa"), self._bm25
+        return True
+
+    def _save_locked(self):
+        if not self.path:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp = f"{self.path}.tmp"
+        state = {
+            "format": INDEX_FORMAT_VERSION,
+            "docs": self._docs,
+            "order": list(self._order),
+            "weights": self.weights,
+            "tokenizer": self._token_fp,
+            "tokenizer_words": self._token_dict,
+            "corpus": self._key,
+            "bm25_tokenizer": self._bm25_fp,
+            "bm25": self._bm25,
+            "lsa_dim": self.lsa_dim,
+            "lsa": self._lsa if self._lsa_bm25 is self._bm25 else None,
+        }
+        try:
+            joblib.dump(state, tmp)
+            os.replace(tmp, self.path)  # 원자적 교체
+        except Exception as e:
+            print("[TRAIL_INDEX] 인덱스 저장 실패:", e)
+
+    # -----------------------------
+    # 동기화/조회
+    # -----------------------------
+    def sync(self, trails: list, version=None) -> tuple:
+        """
+        trails 순서에 맞춘 (BM25, LSA) - 같은 코퍼스에서 만든 쌍을 락 안에서 함께 반환.
+        version이 주어지고 직전 동기화와 같으면 해시 비교도 생략.
+        """
+        with self._lock:
+            if not self._loaded:
+                self._load_locked()
+            if not (version is not None and version == self._version and self._bm25 is not None
+                    and self._bm25_fp == self.tokenizer.fingerprint):
+                with span("trail_index.sync"):
+                    self._sync_locked(trails, version)
+            if self._lsa_bm25 is not self._bm25:
+                # 디스크에서 읽은 역색인에 LSA가 없던 경우 (차원 변경/예전 파일)
+                self._build_lsa_locked()
+                if self._key is not None:
+                    self._remember_locked(self._key, self._shared)
+                if self._lsa is not None and not self._shared:
+                    self._save_locked()
+            return self._bm25, self._lsa
+
+    def _build_lsa_locked(self):
+        """현재 역색인으로 LSA 재구성 (역색인 저장 파일에 함께 보존)"""
+        self._lsa_bm25 = self._bm25
+        self._lsa = None
+        if self._bm25 is None or self.lsa_dim <= 0:
+            return
+        with span("trail_index.lsa"):
+            try:
+                self._lsa = LsaIndex.from_bm25(self._bm25, dim=self.lsa_dim)
+            except Exception as e:
+                print("[TRAIL_INDEX] LSA 구성 실패, BM25만 사용합니다:", e)
+
+    def _sync_locked(self, trails: list, version):
+        """
+        락 안에서 호출. 코퍼스 키(순서 + 필드 해시 + 토크나이저)가 같으면 그대로,
+        최근 코퍼스면 그 (역색인, LSA)를 재사용, 아니면 해시가 바뀐 코스만 토큰화해 재구성 + 저장
+        """
+        fp, dict_base, words = self.tokenizer.dictionary()
+        entries = []
+        for t in trails:
+            fields = self.fields_fn(t)
+            entries.append((t.trail_id, _digest(fields), fields))
+        key = _corpus_key(fp, ((trail_id, digest) for trail_id, digest, _ in entries))
+        if key == self._key:
+            self._bm25_fp = fp   # 키에 fingerprint가 포함되므로 같음 (예전 파일에는 값이 없음)
+            self._version = version
+            return
+        order = tuple(trail_id for trail_id, _, _ in entries)
+
+        recent = self._recent.get(key)
+        if recent is not None:
+            # 재적재 직후 이전 스냅샷 요청 등 - 토큰화/역색인/SVD 없이 교체 (잠깐 오가는 상태라 저장하지 않음)
+            self._recent.move_to_end(key)
+            bm25, lsa, shared = recent
+            self._set_current_locked(key, order, bm25, lsa, fp, shared)
+            self._version = version
+            return
+
+        stale = self._stale_pattern_locked(fp, dict_base, words)
+        docs = {}
+        pending = []   # (trail_id, digest, fields) - 한 번의 배치로 토큰화
+        for trail_id, digest, fields in entries:
+            prev = self._docs.get(trail_id)
+            if (prev is not None and prev[0] == digest
+                    and not (stale is not None and stale.search("\x1f".join(fields.values())))):
+                docs[trail_id] = prev
+            else:
+                pending.append((trail_id, digest, fields))
+        self.last_tokenized = len(pending)
+        if pending:
+            with span("trail_index.tokenize"):
+                tokens = self.tokenize_fn([fields for _, _, fields in pending])
+            for (trail_id, digest, _), doc in zip(pending, tokens):
+                docs[trail_id] = (digest, doc)
+        self._docs = docs
+        self._token_fp = fp
+        self._token_dict = (dict_base, words)
+        # 빈 코퍼스면 평균 문서 길이가 없으므로 만들지 않음
+        bm25 = InvertedBM25([docs[i][1] for i in order], weights=self.weights) if order else None
+        self._set_current_locked(key, order, bm25, None, fp, False)
+        self._build_lsa_locked()
+        self._remember_locked(key, False)
+        self._save_locked()
+        self._version = version
+
+    def _stale_pattern_locked(self, fp, dict_base, words):
+        """
+        저장 토큰을 다시 분석해야 하는 문서 판별 정규식 (None이면 해당 없음).
+        사용자 단어는 원문에 그 문자열이 있을 때만 분석에 쓰이므로 추가/삭제된 단어가 든 문서만,
+        사전 파일이 바뀌었거나 토큰을 만든 사전을 모르면 전체.
+        """
+        if fp == self._token_fp:
+            return None
+        if self._token_dict is None or self._token_dict[0] != dict_base:
+            return re.compile("")
+        changed = words ^ self._token_dict[1]
+        if not changed:
+            return None
+        return re.compile("|".join(re.escape(w) for w in sorted(changed, key=len, reverse=True)))
+
+    def _tokenize_each(self, fields_list: list) -> list:
+        """필드마다 따로 형태소 분석 (tokenize_fn 기본값)"""
+        tokens = iter(self.tokenizer.tokenize_many(text for fields in fields_list for text in fields.values()))
+        return [{name: next(tokens) for name in fields} for fields in fields_list]
+
+    def _set_current_locked(self, key, order, bm25, lsa, fp, shared: bool):
+        self._key = key
+        self._order = order
+        self._bm25 = bm25
+        self._bm25_fp = fp
+        self._lsa, self._lsa_bm25 = lsa, bm25
+        self._shared = shared
+
+    def _remember_locked(self, key, shared: bool):
+        self._recent[key] = (self._bm25, self._lsa, shared)
+        self._recent.move_to_end(key)
+        while len(self._recent) > self.RECENT_CORPORA:
+            self._recent.popitem(last=False)
+
+    def install(self, trails: list, bm25: InvertedBM25, version, lsa: LsaIndex | None = None):
+        """
+        밖에서 만든 역색인(공유 인덱스 파일)으로 교체. 디스크에는 저장하지 않는다.
+        최근 코퍼스로도 기억 → 이전 스냅샷으로 돌아가는 sync도 토큰화 없이 처리.
+        """
+        fp = self.tokenizer.fingerprint
+        key = _corpus_key(fp, ((t.trail_id, _digest(self.fields_fn(t))) for t in trails))
+        with self._lock:
+            self._loaded = True
+            self._set_current_locked(key, tuple(t.trail_id for t in trails), bm25, lsa, fp, True)
+            self._remember_locked(key, True)
+            self._version = version
+
+    @property
+    def version(self):
+        return self._version
+
+    def get_scores(self, trails: list, query: list, version=None) -> list:
+        bm25, _ = self.sync(trails, version=version)
+        if bm25 is None or not query:
+            return [0.0] * len(trails)
+        return bm25.get_scores(query)
+
+    def stats(self) -> dict:
+        return {
+            "path": self.path,
+            "documents": len(self._order),
+            "version": self._version,
+            "tokenizer": self._token_fp,
+            "last_tokenized": self.last_tokenized,
+            "shared": self._shared,
+            "bm25": self._bm25.stats() if self._bm25 is not None else None,
+            "lsa": self._lsa.stats() if self._lsa is not None else None,
+        }
@@ -0,0 +1,149 @@
+"""
+YOLO 추론 백엔드 (torch / onnx / openvino).
+
+한 번만 내보내기(export)해 두면 서버는 변환된 모델을 그대로 로드한다.
+
+    python -m app.services.yolo_backends --backend onnx
+    python -m app.services.yolo_backends --backend openvino --int8 --calib data/calib
+
+ultralytics가 .onnx / *_openvino_model 을 직접 로드하므로 결과 객체
+(boxes.xyxy / boxes.cls / speed) 계약은 백엔드와 무관하게 동일하다.
+onnxruntime / openvino 패키지는 해당 백엔드를 쓸 때만 필요.
+"""
+import os
+import glob
+import argparse
+import tempfile
+import numpy as np
+from PIL import Image
+from app.core.config import settings
+
+BACKENDS = ("torch", "onnx", "openvino")
+IMAGE_EXTS = (".jpg", ".jpeg", ".png", ".bmp", ".webp")
+
+
+def exported_path(backend: str, weights: str | None = None, int8: bool | None = None) -> str:
+    """백엔드별 모델 경로 (ultralytics export 산출물 이름 규칙을 따름)"""
+    weights = weights or settings.WEIGHTS_PATH
+    int8 = settings.INFER_INT8 if int8 is None else int8
+    stem = os.path.splitext(weights)[0]
+    if backend == "torch":
+        return weights
+    if backend == "onnx":
+        return f"{stem}_int8.onnx" if int8 else f"{stem}.onnx"
+    if backend == "openvino":
+        return f"{stem}_int8_openvino_model" if int8 else f"{stem}_openvino_model"
+    raise ValueError(f"지원하지 않는 INFER_BACKEND: {backend} (가능: {', '.join(BACKENDS)})")
+
+
+def _calib_images(calib_dir: str) -> list:
+    files = sorted(
+        p for p in glob.glob(os.path.join(calib_dir, "**", "*"), recursive=True)
+        if p.lower().endswith(IMAGE_EXTS)
+    )
+    if not files:
+        raise RuntimeError(f"보정(calibration) 이미지가 없습니다: {calib_dir}")
+    return files
+
+
+def _letterbox_chw(path: str, size: int) -> np.ndarray:
+    # ultralytics 전처리와 같은 방식: 비율 유지 리사이즈 + 회색(114) 패딩, RGB/255, NCHW
+    img = Image.open(path).convert("RGB")
+    r = min(size / img.width, size / img.height)
+    w, h = max(1, round(img.width * r)), max(1, round(img.height * r))
+    canvas = Image.new("RGB", (size, size), (114, 114, 114))
+    canvas.paste(img.resize((w, h), Image.BILINEAR), ((size - w) // 2, (size - h) // 2))
+    arr = np.asarray(canvas, dtype=np.float32) / 255.0
+    return arr.transpose(2, 0, 1)[None]
+
+
+def _quantize_onnx(src: str, dst: str, calib_dir: str | None) -> str:
+    from onnxruntime.quantization import (
+        CalibrationDataReader, QuantFormat, QuantType, quantize_dynamic, quantize_static,
+    )
+    if not calib_dir:
+        # 보정 데이터가 없으면 가중치만 INT8 (동적 양자화)
+        quantize_dynamic(src, dst, weight_type=QuantType.QUInt8)
+        return dst
+
+    import onnxruntime as ort
+    input_name = ort.InferenceSession(src, providers=["CPUExecutionProvider"]).get_inputs()[0].name
+    files = _calib_images(calib_dir)
+
+    class _Reader(CalibrationDataReader):
+        def __init__(self):
+            self._it = iter(files)
+
+        def get_next(self):
+            path = next(self._it, None)
+            return None if path is None else {input_name: _letterbox_chw(path, settings.IMG_SIZE)}
+
+    quantize_static(
+        src, dst, _Reader(),
+        quant_format=QuantFormat.QDQ,
+        activation_type=QuantType.QUInt8,
+        weight_type=QuantType.QInt8,
+    )
+    return dst
+
+
+def _calib_yaml(calib_dir: str, names: dict) -> str:
+    # ultralytics INT8 export는 데이터셋 yaml을 요구 → 보정 폴더를 train/val로 지정
+    _calib_images(calib_dir)
+    fd, path = tempfile.mkstemp(suffix=".yaml")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        f.write(f"path: {os.path.abspath(calib_dir)}\ntrain: .\nval: .\nnames:\n")
+        for k, v in sorted(names.items()):
+            f.write(f"  {k}: '{v}'\n")
+    return path
+
+
+def export_model(backend: str, weights: str | None = None, int8: bool | None = None,
+                 calib_dir: str | None = None) -> str:
+    """best.pt → ONNX / OpenVINO IR 변환 (선택적으로 INT8). 산출물 경로 반환."""
+    from ultralytics import YOLO
+    weights = weights or settings.WEIGHTS_PATH
+    int8 = settings.INFER_INT8 if int8 is None else int8
+    calib_dir = calib_dir if calib_dir is not None else settings.INFER_CALIB_DIR
+    target = exported_path(backend, weights, int8)
+    if backend == "torch":
+        return target
+
+    model = YOLO(weights)
+    # dynamic=True: 배칭 대기열이 여러 장을 한 번에 넣을 수 있도록 배치 차원 가변
+    if backend == "onnx":
+        fp32 = model.export(format="onnx", imgsz=settings.IMG_SIZE, dynamic=True, simplify=True)
+        return _quantize_onnx(fp32, target, calib_dir) if int8 else fp32
+    if int8:
+        if not calib_dir:
+            raise RuntimeError("OpenVINO INT8 변환에는 INFER_CALIB_DIR(보정 이미지 폴더)가 필요합니다.")
+        data = _calib_yaml(calib_dir, model.names)
+        try:
+            return model.export(format="openvino", imgsz=settings.IMG_SIZE, dynamic=True, int8=True, data=data)
+        finally:
+            os.remove(data)
+    return model.export(format="openvino", imgsz=settings.IMG_SIZE, dynamic=True)
+
+
+def resolve_weights(backend: str | None = None) -> str:
+    """설정된 백엔드의 모델 경로. 변환본이 없으면 최초 1회 변환."""
+    backend = backend or settings.INFER_BACKEND
+    path = exported_path(backend)
+    if not os.path.exists(path):
+        print(f"[YOLO] {backend} 모델이 없어 변환합니다: {path}")
+        path = export_model(backend)
+    return path
+
+
+def main():
+    ap = argparse.ArgumentParser(description="YOLO 가중치를 ONNX/OpenVINO로 변환")
+    ap.add_argument("--backend", choices=BACKENDS[1:], default="onnx")
+    ap.add_argument("--weights", default=settings.WEIGHTS_PATH)
+    ap.add_argument("--int8", action="store_true")
+    ap.add_argument("--calib", default=settings.INFER_CALIB_DIR)
+    args = ap.parse_args()
+    print(export_model(args.backend, args.weights, args.int8, args.calib))
+
+
+if __name__ == "__main__":
+    main()
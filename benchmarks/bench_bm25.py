@@ -0,0 +1,124 @@
+"""
+BM25 점수 계산: rank_bm25.BM25Okapi(문서 복제) vs InvertedBM25(역색인 + 필드 가중치).
+
+    python -m benchmarks.bench_bm25 --sizes 1000 10000 100000 --queries 200
+    python -m benchmarks.bench_bm25 --out bm25.json
+
+합성 코스(benchmarks.synthetic)를 한 번 형태소 분석한 뒤 그 토큰 묶음을 재표본해서 크기를 늘린다.
+- results: 같은 토큰으로 두 엔진을 만들어 점수 최대 오차와 상위 50개 일치 여부, 구축/질의 시간
+- legacy : 예전 코퍼스(BM25Okapi, "이름 이름 본문 도시" 문서를 통째로 분석) vs 지금 코퍼스
+           (tokenize_fields_many + InvertedBM25) - 토큰화 차이까지 포함한 점수 최대 오차/상위 50개 일치
+"""
+import json
+import time
+import random
+import argparse
+import numpy as np
+from rank_bm25 import BM25Okapi
+from app.core.config import settings
+from app.services.bm25_index import InvertedBM25
+from app.services.recommend import (
+    bm25_fields, tokenize_fields, tokenize_fields_many, trail_to_text, extract_keywords,
+    expand_query_tokens, extract_user_prefs, top_k_indices,
+)
+from benchmarks.synthetic import make_trails, make_stories
+
+
+def _duplicated(fields: dict, weights: dict) -> list:
+    """필드 가중치를 토큰 복제로 흉내 낸 예전 방식 문서"""
+    doc = []
+    for name, tokens in fields.items():
+        doc.extend(list(tokens) * int(weights.get(name, 1)))
+    return doc
+
+
+def _legacy_document(t) -> str:
+    """필드 가중치 도입 전 BM25 문서"""
+    name = str(getattr(t, "trail_name", "") or "")
+    city = str(getattr(t, "city_name", "") or "")
+    return f"{name} {name} {trail_to_text(t)} {city}"
+
+
+def _legacy_check(trails: list, queries: list, weights: dict) -> dict:
+    legacy = BM25Okapi([extract_keywords(_legacy_document(t)) for t in trails])
+    docs = tokenize_fields_many([bm25_fields(t) for t in trails])
+    inverted = InvertedBM25(docs, weights=weights)
+    max_diff, same_top, overlap = 0.0, 0, []
+    for q in queries:
+        a, b = legacy.get_scores(q), inverted.get_scores(q)
+        max_diff = max(max_diff, float(np.max(np.abs(a - b))))
+        ta, tb = top_k_indices(a, 50).tolist(), top_k_indices(b, 50).tolist()
+        same_top += ta == tb
+        overlap.append(len(set(ta) & set(tb)) / max(1, len(ta)))
+    return {
+        "trails": len(trails),
+        "max_abs_diff": max_diff,
+        "top50_identical": f"{same_top}/{len(queries)}",
+        "top50_overlap_min": round(float(np.min(overlap)), 4),
+        "docs_with_extra_tokens": sum(bool(d.get("extra")) for d in docs),
+    }
+
+
+def _timed(fn):
+    t0 = time.perf_counter()
+    out = fn()
+    return out, (time.perf_counter() - t0) * 1000
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    ap.add_argument("--pool", type=int, default=2000, help="실제로 형태소 분석할 합성 코스 수")
+    ap.add_argument("--queries", type=int, default=200)
+    ap.add_argument("--out", default=None, help="결과 JSON 저장 경로")
+    args = ap.parse_args()
+
+    weights = settings.BM25_FIELD_WEIGHTS
+    trails = make_trails(args.pool)
+    pool = [tokenize_fields(bm25_fields(t)) for t in trails]
+    queries = [expand_query_tokens(s, extract_user_prefs(s)) for s in make_stories(args.queries, seed=1)]
+    rng = random.Random(0)
+
+    report = {"weights": weights, "queries": len(queries), "legacy": _legacy_check(trails, queries, weights),
+              "results": {}}
+    for n in args.sizes:
+        docs = [pool[rng.randrange(len(pool))] for _ in range(n)]
+        okapi, okapi_ms = _timed(lambda: BM25Okapi([_duplicated(d, weights) for d in docs]))
+        inverted, inv_ms = _timed(lambda: InvertedBM25(docs, weights=weights))
+
+        max_diff = 0.0
+        same_top = 0
+        okapi_q, inv_q = [], []
+        for q in queries:
+            a, ms = _timed(lambda: okapi.get_scores(q))
+            okapi_q.append(ms)
+            b, ms = _timed(lambda: inverted.get_scores(q))
+            inv_q.append(ms)
+            max_diff = max(max_diff, float(np.max(np.abs(a - b))))
+            same_top += top_k_indices(a, 50).tolist() == top_k_indices(b, 50).tolist()
+
+        report["results"][n] = {
+            "max_abs_diff": max_diff,
+            "top50_identical": f"{same_top}/{len(queries)}",
+            "build_ms": {"okapi": round(okapi_ms, 1), "inverted": round(inv_ms, 1)},
+            "query_p50_ms": {
+                "okapi": round(float(np.median(okapi_q)), 3),
+                "inverted": round(float(np.median(inv_q)), 3),
+            },
+            "query_p95_ms": {
+                "okapi": round(float(np.percentile(okapi_q, 95)), 3),
+                "inverted": round(float(np.percentile(inv_q, 95)), 3),
+            },
+            "speedup_p50": round(float(np.median(okapi_q) / np.median(inv_q)), 1),
+            "index": inverted.stats(),
+        }
+
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text)
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
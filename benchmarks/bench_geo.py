@@ -0,0 +1,157 @@
+"""
+배열 단위 거리 API (app/services/geo.py) 정확도/처리량.
+
+    python -m benchmarks.bench_geo --points 100000 --repeat 20
+    python -m benchmarks.bench_geo --out geo.json
+
+- accuracy  : haversine_to_many / haversine_many_to_many / equirect_to_many를 스칼라 haversine과 비교
+              (equirect는 거리 구간별 최대 상대 오차와 문서화한 상한 (d/R)·(|tan φ| + d/R)/2 이내 여부)
+              within_radius(경계 상자 + 거리) 결과가 스칼라 전수 비교와 같은지 (극/경도 ±180° 근처 포함)
+- throughput: 점 N개에 대해 스칼라 반복 vs 배열 계산(cos 미리 계산 유무) vs equirect vs 반경 조회
+"""
+import json
+import time
+import argparse
+import numpy as np
+from app.services.geo import (
+    EARTH_RADIUS_KM, haversine, to_radians, haversine_to_many, haversine_many_to_many,
+    equirect_to_many, within_radius,
+)
+from app.services.geo_index import TrailGeoIndex
+
+
+def _destinations(lat, lng, km, bearing):
+    """기준점에서 방위각/거리만큼 떨어진 좌표 (도)"""
+    phi, lam, dl = np.radians(lat), np.radians(lng), km / EARTH_RADIUS_KM
+    phi2 = np.arcsin(np.sin(phi) * np.cos(dl) + np.cos(phi) * np.sin(dl) * np.cos(bearing))
+    lam2 = lam + np.arctan2(np.sin(bearing) * np.sin(dl) * np.cos(phi), np.cos(dl) - np.sin(phi) * np.sin(phi2))
+    return np.degrees(phi2), (np.degrees(lam2) + 540) % 360 - 180
+
+
+def _korea_points(n: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    return rng.uniform(33.0, 38.6, n), rng.uniform(124.5, 131.0, n)
+
+
+def accuracy(args) -> dict:
+    rng = np.random.default_rng(1)
+    out = {}
+
+    # 한 점 → 여러 점 (전 지구 무작위)
+    lats, lngs = rng.uniform(-89, 89, 20000), rng.uniform(-180, 180, 20000)
+    lat_rad, lng_rad, cos_lat, _ = to_radians(lats, lngs)
+    worst = 0.0
+    for lat, lng in zip(rng.uniform(-80, 80, 20), rng.uniform(-180, 180, 20)):
+        ref = np.array([haversine((lat, lng), p) for p in zip(lats, lngs)])
+        worst = max(worst, float(np.abs(haversine_to_many(lat, lng, lat_rad, lng_rad, cos_lat) - ref).max()))
+    out["to_many_max_abs_km"] = worst
+
+    # 여러 점 × 여러 점
+    a_lat, a_lng = _korea_points(200, seed=2)
+    b_lat, b_lng = _korea_points(300, seed=3)
+    a, b = to_radians(a_lat, a_lng), to_radians(b_lat, b_lng)
+    mat = haversine_many_to_many(a[0], a[1], b[0], b[1], a[2], b[2])
+    ref = np.array([[haversine(p, q) for q in zip(b_lat, b_lng)] for p in zip(a_lat, a_lng)])
+    out["many_to_many_max_abs_km"] = float(np.abs(mat - ref).max())
+
+    # 등장방형 근사: 거리 구간별 최대 상대 오차 + 문서화한 상한 이내인지
+    equirect = {}
+    for lat_lo, lat_hi in ((33, 39), (0, 45), (45, 60)):
+        for dmax in (1, 10, 50):
+            n = 20000
+            lat = rng.uniform(lat_lo, lat_hi, n)
+            lng = rng.uniform(-179, 179, n)
+            km = rng.uniform(0.01, dmax, n)
+            lat2, lng2 = _destinations(lat, lng, km, rng.uniform(0, 2 * np.pi, n))
+            ref = np.array([haversine(p, q) for p, q in zip(zip(lat, lng), zip(lat2, lng2))])
+            approx = np.array([
+                equirect_to_many(p, q, np.radians([r]), np.radians([s]))[0]
+                for p, q, r, s in zip(lat, lng, lat2, lng2)
+            ])
+            rel = np.abs(approx - ref) / ref
+            d_r = ref / EARTH_RADIUS_KM
+            bound = d_r * (np.abs(np.tan(np.radians(lat))) + d_r) / 2
+            equirect[f"lat{lat_lo}-{lat_hi}/{dmax}km"] = {
+                "max_rel_pct": round(float(rel.max()) * 100, 5),
+                "max_abs_m": round(float(np.abs(approx - ref).max()) * 1000, 2),
+                "within_bound": bool((rel <= bound + 1e-12).all()),
+            }
+    out["equirect"] = equirect
+
+    # 반경 조회 (경계 상자 전처리) = 스칼라 전수 비교
+    cases = {"korea": (37.5, 127.0), "antimeridian": (-16.5, 179.95), "near_pole": (89.9, 10.0)}
+    radius = {}
+    for name, (lat, lng) in cases.items():
+        n = 20000
+        plat, plng = _destinations(np.full(n, lat), np.full(n, lng),
+                                   rng.uniform(0, 3 * args.radius_km, n), rng.uniform(0, 2 * np.pi, n))
+        lat_rad, lng_rad, cos_lat, valid = to_radians(plat, plng)
+        _, pos = within_radius(lat, lng, lat_rad, lng_rad, args.radius_km, cos_lat, valid)
+        ref = {i for i, p in enumerate(zip(plat, plng)) if haversine((lat, lng), p) <= args.radius_km}
+        radius[name] = set(pos.tolist()) == ref
+    out["within_radius_same"] = radius
+    return out
+
+
+def _time(fn, repeat: int) -> float:
+    fn()
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    return round(float(np.median(samples)), 3)
+
+
+def throughput(args) -> dict:
+    n = args.points
+    lats, lngs = _korea_points(n, seed=4)
+    lat_rad, lng_rad, cos_lat, valid = to_radians(lats, lngs)
+    pairs = list(zip(lats.tolist(), lngs.tolist()))
+    q = (37.5665, 126.978)
+    geo = TrailGeoIndex(lat_rad, lng_rad, valid)
+    a_lat, a_lng = _korea_points(args.sources, seed=5)
+    src = to_radians(a_lat, a_lng)
+
+    res = {
+        "scalar_loop_ms": _time(lambda: [haversine(q, p) for p in pairs], max(1, args.repeat // 10)),
+        "to_many_ms": _time(lambda: haversine_to_many(q[0], q[1], lat_rad, lng_rad), args.repeat),
+        "to_many_cos_ms": _time(lambda: haversine_to_many(q[0], q[1], lat_rad, lng_rad, cos_lat), args.repeat),
+        "equirect_ms": _time(lambda: equirect_to_many(q[0], q[1], lat_rad, lng_rad), args.repeat),
+        f"within_radius_{args.radius_km:g}km_ms": _time(
+            lambda: within_radius(q[0], q[1], lat_rad, lng_rad, args.radius_km, cos_lat, valid), args.repeat),
+        f"kdtree_within_{args.radius_km:g}km_ms": _time(lambda: geo.within(q[0], q[1], args.radius_km), args.repeat),
+        f"many_to_many_{args.sources}x{n}_ms": _time(
+            lambda: haversine_many_to_many(src[0], src[1], lat_rad, lng_rad, src[2], cos_lat),
+            max(1, args.repeat // 5)),
+    }
+    res["speedup_to_many_cos"] = round(res["scalar_loop_ms"] / res["to_many_cos_ms"], 1)
+    res["speedup_equirect"] = round(res["scalar_loop_ms"] / res["equirect_ms"], 1)
+    # 점 1개당 ns
+    res["to_many_cos_ns_per_point"] = round(res["to_many_cos_ms"] * 1e6 / n, 2)
+    return res
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--points", type=int, default=100_000)
+    ap.add_argument("--sources", type=int, default=32, help="many-to-many 출발점 수")
+    ap.add_argument("--radius-km", type=float, default=10.0)
+    ap.add_argument("--repeat", type=int, default=20)
+    ap.add_argument("--out", default=None, help="결과 JSON 저장 경로")
+    args = ap.parse_args()
+
+    report = {
+        "points": args.points,
+        "accuracy": accuracy(args),
+        "throughput": throughput(args),
+    }
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text)
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
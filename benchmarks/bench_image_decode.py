@@ -0,0 +1,87 @@
+"""
+업로드 디코딩 경로 비교: 기존(전체 해상도 decode) vs decode_upload(draft + 상한).
+
+    python -m benchmarks.bench_image_decode --mp 12 --repeat 10
+
+방식마다 새 프로세스에서 디코딩 시간(ms)과 최대 RSS 증가량(MB)을 잰다.
+"""
+import io
+import sys
+import json
+import time
+import argparse
+import resource
+import subprocess
+import numpy as np
+from PIL import Image
+
+
+def make_jpeg(megapixels: float, orientation: int = 6) -> bytes:
+    w = int((megapixels * 1e6 * 4 / 3) ** 0.5)
+    h = int(w * 3 / 4)
+    rng = np.random.default_rng(0)
+    # 노이즈만 쓰면 JPEG가 비정상적으로 커지므로 저해상도 노이즈를 키워 사진 비슷하게
+    small = rng.integers(0, 255, (h // 16, w // 16, 3), dtype=np.uint8)
+    img = Image.fromarray(small).resize((w, h), Image.BILINEAR)
+    exif = Image.Exif()
+    exif[0x0112] = orientation
+    buf = io.BytesIO()
+    img.save(buf, format="JPEG", quality=90, exif=exif)
+    return buf.getvalue()
+
+
+def _decode_legacy(data: bytes):
+    return Image.open(io.BytesIO(data)).convert("RGB")
+
+
+def _decode_fast(data: bytes):
+    from app.services.image_io import decode_upload
+    return decode_upload(data).image
+
+
+def _child(method: str, path: str, repeat: int):
+    data = open(path, "rb").read()
+    fn = _decode_fast if method == "fast" else _decode_legacy
+    if method == "fast":
+        import app.services.image_io  # noqa: F401  (임포트 비용은 제외)
+    base = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        img = fn(data)
+        times.append((time.perf_counter() - t0) * 1000)
+        size = img.size
+        del img
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(json.dumps({
+        "decoded_size": size,
+        "p50_ms": round(float(np.percentile(times, 50)), 2),
+        "rss_delta_mb": round((peak - base) / 1024, 1),
+    }))
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--mp", type=float, default=12)
+    ap.add_argument("--repeat", type=int, default=10)
+    ap.add_argument("--child", nargs=2, help=argparse.SUPPRESS)
+    args = ap.parse_args()
+    if args.child:
+        return _child(args.child[0], args.child[1], args.repeat)
+
+    import tempfile
+    with tempfile.NamedTemporaryFile(suffix=".jpg", delete=False) as f:
+        f.write(make_jpeg(args.mp))
+        path = f.name
+    report = {"megapixels": args.mp}
+    for method in ("legacy", "fast"):
+        out = subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_image_decode", "--repeat", str(args.repeat), "--child", method, path],
+            capture_output=True, text=True, check=True,
+        )
+        report[method] = json.loads(out.stdout.strip().splitlines()[-1])
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+추론 백엔드 처리량 벤치마크 (in-process vs 프로세스 풀).
+
+    python -m benchmarks.bench_inference_pool --images 64 --batch 8 --workers 1 2 4
+
+합성 이미지로 초당 처리 이미지 수를 재고, 워커 수별 확장 비율을 JSON으로 출력.
+"""
+import argparse
+import json
+import time
+import concurrent.futures as cf
+import numpy as np
+from PIL import Image
+from app.core.config import settings
+
+
+def _synthetic_images(n: int, size=(1280, 960), seed: int = 0):
+    rng = np.random.default_rng(seed)
+    return [Image.fromarray(rng.integers(0, 255, (size[1], size[0], 3), dtype=np.uint8)) for _ in range(n)]
+
+
+def _throughput(predict_batch, imgs, batch: int, concurrency: int) -> float:
+    chunks = [imgs[i:i + batch] for i in range(0, len(imgs), batch)]
+    predict_batch(chunks[0])  # 워밍업
+    t0 = time.perf_counter()
+    with cf.ThreadPoolExecutor(concurrency) as ex:
+        list(ex.map(predict_batch, chunks))
+    return len(imgs) / (time.perf_counter() - t0)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--images", type=int, default=64)
+    ap.add_argument("--batch", type=int, default=settings.INFER_BATCH_SIZE)
+    ap.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    ap.add_argument("--skip-inprocess", action="store_true")
+    args = ap.parse_args()
+
+    imgs = _synthetic_images(args.images)
+    report = {"images": args.images, "batch": args.batch, "img_size": settings.IMG_SIZE, "results": {}}
+
+    if not args.skip_inprocess:
+        from app.services.yolo_service import YOLOService
+        report["results"]["inprocess"] = round(_throughput(YOLOService.get().predict_batch, imgs, args.batch, 1), 2)
+
+    from app.services.inference_pool import InferencePool
+    base = None
+    for n in args.workers:
+        pool = InferencePool(workers=n, health_sec=0)
+        pool.start()
+        try:
+            ips = _throughput(pool.predict_batch, imgs, args.batch, n)
+        finally:
+            pool.close()
+        base = base or ips
+        report["results"][f"pool_{n}"] = round(ips, 2)
+        report["results"][f"pool_{n}_scaling"] = round(ips / base, 2)
+
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
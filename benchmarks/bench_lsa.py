@@ -0,0 +1,102 @@
+"""
+LSA 의미 검색(TF-IDF + 절단 SVD) 구축/질의 비용과 BM25 하이브리드 후보 선정 비교.
+
+    python -m benchmarks.bench_lsa --sizes 1000 20000 100000 --dim 128 --queries 200
+    python -m benchmarks.bench_lsa --out lsa.json
+
+합성 코스(benchmarks.synthetic)를 한 번 형태소 분석한 뒤 그 토큰 묶음을 재표본해서 크기를 늘린다.
+- build     : InvertedBM25 / LsaIndex.from_bm25 구축 시간, LSA 배열 크기
+- query_ms  : 질의 1건 BM25 점수 / LSA 점수 / 하이브리드 점수 + 상위 50개 선정
+- candidates: 상위 50개 중 BM25만 썼을 때와 겹치는 비율, BM25 점수가 모두 0인 질의 수
+- paraphrase: 코스 문장과 토큰이 거의 겹치지 않는 사연의 BM25/LSA 최고 점수
+"""
+import json
+import time
+import random
+import argparse
+import numpy as np
+from app.core.config import settings
+from app.services.bm25_index import InvertedBM25
+from app.services.lsa_index import LsaIndex
+from app.services.recommend import (
+    bm25_fields, tokenize_fields, expand_query_tokens, extract_user_prefs, top_k_indices, fuse_scores,
+)
+from benchmarks.synthetic import make_trails, make_stories
+
+PARAPHRASES = (
+    "아이랑 조용히 걷고 싶어요",
+    "바람 쐬면서 천천히 걸을 만한 곳 있을까요",
+    "물가를 따라 걷는 길이면 좋겠어요",
+    "꽃 보면서 가볍게 산책하고 싶어요",
+)
+
+
+def _timed(fn):
+    t0 = time.perf_counter()
+    out = fn()
+    return out, (time.perf_counter() - t0) * 1000
+
+
+def _lat(samples: list) -> dict:
+    arr = np.asarray(samples)
+    return {"p50": round(float(np.percentile(arr, 50)), 3), "p95": round(float(np.percentile(arr, 95)), 3)}
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sizes", type=int, nargs="+", default=[1_000, 20_000, 100_000])
+    ap.add_argument("--pool", type=int, default=2000, help="실제로 형태소 분석할 합성 코스 수")
+    ap.add_argument("--dim", type=int, default=settings.LSA_DIM)
+    ap.add_argument("--weight", type=float, default=settings.RECOMMEND_SEMANTIC_WEIGHT)
+    ap.add_argument("--queries", type=int, default=200)
+    ap.add_argument("--out", default=None, help="결과 JSON 저장 경로")
+    args = ap.parse_args()
+
+    weights = settings.BM25_FIELD_WEIGHTS
+    pool = [tokenize_fields(bm25_fields(t)) for t in make_trails(args.pool)]
+    queries = [expand_query_tokens(s, extract_user_prefs(s)) for s in make_stories(args.queries, seed=1)]
+    paraphrases = [(s, expand_query_tokens(s, extract_user_prefs(s))) for s in PARAPHRASES]
+    rng = random.Random(0)
+
+    report = {"dim": args.dim, "weight": args.weight, "queries": len(queries), "results": {}}
+    for n in args.sizes:
+        docs = [pool[rng.randrange(len(pool))] for _ in range(n)]
+        bm25, bm25_ms = _timed(lambda: InvertedBM25(docs, weights=weights))
+        lsa, lsa_ms = _timed(lambda: LsaIndex.from_bm25(bm25, dim=args.dim))
+
+        bm25_q, lsa_q, hybrid_q = [], [], []
+        overlap, zero_bm25 = [], 0
+        for q in queries:
+            b, ms = _timed(lambda: bm25.get_scores(q))
+            bm25_q.append(ms)
+            s, ms = _timed(lambda: lsa.get_scores(q))
+            lsa_q.append(ms)
+            top, ms = _timed(lambda: top_k_indices(fuse_scores(b, s, args.weight), 50))
+            hybrid_q.append(ms)
+            zero_bm25 += int(not b.any())
+            overlap.append(len(set(top.tolist()) & set(top_k_indices(b, 50).tolist())) / max(1, len(top)))
+
+        report["results"][n] = {
+            "build_ms": {"bm25": round(bm25_ms, 1), "lsa": round(lsa_ms, 1)},
+            "lsa": lsa.stats(),
+            "query_ms": {"bm25": _lat(bm25_q), "lsa": _lat(lsa_q), "fuse_top50": _lat(hybrid_q)},
+            "candidates": {
+                "top50_overlap_with_bm25": round(float(np.mean(overlap)), 4),
+                "zero_bm25_queries": zero_bm25,
+            },
+            "paraphrase": {
+                s: {"tokens": q, "bm25_max": round(float(bm25.get_scores(q).max()), 4),
+                    "lsa_max": round(float(lsa.get_scores(q).max()), 4)}
+                for s, q in paraphrases
+            },
+        }
+
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text)
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""
+핫스팟 함수 마이크로벤치마크 (합성 데이터, DB/네트워크 없이).
+
+    python -m benchmarks.bench_micro --trails 500 --stories 300 --repeat 5
+    python -m benchmarks.bench_micro --only extract_user_prefs score_route_with_breakdown
+
+- build_bm25_corpus: 코스 n개 형태소 분석 + 역색인 구축
+- tokenize_corpus: 코스 필드 배치 형태소 분석 처리량 (Kiwi num_workers별, 코어 수에 따른 확장 확인)
+- extract_user_prefs: 사연 1건 → prefs
+- score_route_with_breakdown: (사연, 코스) 1쌍 채점
+- draw_grouped_boxes_pil: 크기별 사진에 박스 그리기 + JPEG base64
+- yolo_predict: YOLOService.predict 1장 (ultralytics/가중치가 없으면 건너뜀)
+호출 1회 기준 p50/p95/mean(ms)을 JSON으로 출력. 커밋 간 비교는 --out 파일끼리 diff.
+"""
+import json
+import time
+import random
+import argparse
+import numpy as np
+from benchmarks.synthetic import make_trails, make_stories, make_images
+
+
+def _stats(samples_ms: list) -> dict:
+    arr = np.asarray(samples_ms)
+    return {
+        "calls": len(arr),
+        "p50_ms": round(float(np.percentile(arr, 50)), 4),
+        "p95_ms": round(float(np.percentile(arr, 95)), 4),
+        "mean_ms": round(float(arr.mean()), 4),
+    }
+
+
+def _measure(fn, inputs: list, repeat: int) -> dict:
+    fn(*inputs[0])  # 워밍업 (지연 로드/캐시 생성 제외)
+    samples = []
+    for _ in range(repeat):
+        for args in inputs:
+            t0 = time.perf_counter()
+            fn(*args)
+            samples.append((time.perf_counter() - t0) * 1000)
+    return _stats(samples)
+
+
+def bench_build_bm25_corpus(ctx, repeat):
+    from app.services.recommend import build_bm25_corpus
+    trails = ctx["trails"]
+    out = _measure(build_bm25_corpus, [(trails,)], repeat)
+    out["trails"] = len(trails)
+    return out
+
+
+def bench_tokenize_corpus(ctx, repeat):
+    import os
+    from app.services.recommend import bm25_fields, bm25_document
+    from app.services.tokenizer import KiwiPool, KeywordTokenizer
+    texts = [bm25_document(bm25_fields(t))[0] for t in ctx["trails"]]
+    out = {"texts": len(texts), "cpus": os.cpu_count()}
+    for workers in sorted({1, 2, 4, os.cpu_count() or 1}):
+        tokenizer = KeywordTokenizer(KiwiPool(size=1, num_workers=workers))
+        tokenizer.pool.warm()
+        stats = _measure(tokenizer.tokenize_many, [(texts,)], repeat)
+        stats["docs_per_s"] = round(len(texts) / (stats["mean_ms"] / 1000), 1)
+        out[f"workers_{workers}"] = stats
+    return out
+
+
+def bench_extract_user_prefs(ctx, repeat):
+    from app.services.recommend import extract_user_prefs
+    return _measure(extract_user_prefs, [(s,) for s in ctx["stories"]], repeat)
+
+
+def bench_score_route_with_breakdown(ctx, repeat):
+    from app.services.recommend import extract_user_prefs, score_route_with_breakdown
+    rng = random.Random(0)
+    pairs = []
+    for s in ctx["stories"]:
+        loc = (37.5 + rng.uniform(-2, 2), 127.0 + rng.uniform(-1, 1))
+        pairs.append((rng.choice(ctx["trails"]), extract_user_prefs(s), loc))
+    return _measure(score_route_with_breakdown, pairs, repeat)
+
+
+def bench_draw_grouped_boxes_pil(ctx, repeat):
+    from app.routers.trash import draw_grouped_boxes_pil
+    from app.services.image_io import decode_upload
+    rng = np.random.default_rng(0)
+    out = {}
+    for size, data in ctx["images"].items():
+        img = decode_upload(data).image
+        w, h = img.size
+        n = 12
+        x1 = rng.uniform(0, w * 0.8, n)
+        y1 = rng.uniform(0, h * 0.8, n)
+        xyxy = np.stack([x1, y1, x1 + rng.uniform(20, w * 0.2, n), y1 + rng.uniform(20, h * 0.2, n)], 1).tolist()
+        cls = rng.integers(0, 12, n).tolist()
+        out[size] = _measure(draw_grouped_boxes_pil, [(img, xyxy, cls)], repeat)
+    return out
+
+
+def bench_yolo_predict(ctx, repeat):
+    try:
+        from app.services.yolo_service import YOLOService
+        service = YOLOService.get()
+    except Exception as e:   # ultralytics 미설치 / 가중치 없음
+        return {"skipped": f"{type(e).__name__}: {e}"}
+    from app.services.image_io import decode_upload
+    out = {}
+    for size, data in ctx["images"].items():
+        out[size] = _measure(service.predict, [(decode_upload(data).image,)], repeat)
+    return out
+
+
+BENCHES = {
+    "build_bm25_corpus": bench_build_bm25_corpus,
+    "tokenize_corpus": bench_tokenize_corpus,
+    "extract_user_prefs": bench_extract_user_prefs,
+    "score_route_with_breakdown": bench_score_route_with_breakdown,
+    "draw_grouped_boxes_pil": bench_draw_grouped_boxes_pil,
+    "yolo_predict": bench_yolo_predict,
+}
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--trails", type=int, default=500)
+    ap.add_argument("--stories", type=int, default=300)
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--only", nargs="+", choices=list(BENCHES), default=list(BENCHES))
+    ap.add_argument("--out", default=None, help="결과 JSON 저장 경로")
+    args = ap.parse_args()
+
+    ctx = {
+        "trails": make_trails(args.trails),
+        "stories": make_stories(args.stories),
+        "images": make_images(),
+    }
+    report = {"trails": args.trails, "stories": args.stories, "repeat": args.repeat, "results": {}}
+    for name in args.only:
+        # 코퍼스 구축은 한 번이 무거우므로 반복 횟수를 줄인다
+        repeat = 1 if name in ("build_bm25_corpus", "tokenize_corpus") else args.repeat
+        report["results"][name] = BENCHES[name](ctx, repeat)
+
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text)
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""
+위치 제보 반영: 제보마다 UPDATE+커밋 vs 메모리 누적 후 주기당 UPDATE 한 번(executemany).
+합성 코스를 채운 SQLite로 실행 (DB 왕복 비용은 Oracle보다 훨씬 작으므로 문장 수/왕복 수를 같이 본다).
+
+    python -m benchmarks.bench_report_ingest --trails 5000 --reports 5000
+    python -m benchmarks.bench_report_ingest --out report_ingest.json
+
+- submit   : 제보 1건 요청 경로 비용 (위치를 버퍼에 추가) µs
+- per_report: 제보마다 UPDATE + COMMIT (DB 문장 수 = 제보 수 × 2)
+- batched  : flush 한 번 (위치 → 최근접 코스 일괄 조회 + UPDATE executemany + 새 값 조회 + 변경 신호) + 스냅샷 패치
+- patch vs reload: 제보 수만 바꾼 스냅샷 교체 vs 전체 재적재 (적재 후 처리 포함)
+- same     : 패치한 스냅샷의 제보 수 = DB 값, 플로깅 추천 결과 = 전체 재적재 후 결과
+"""
+import json
+import time
+import random
+import argparse
+import numpy as np
+from sqlalchemy import event, text
+from benchmarks.synthetic import make_trails, use_sqlite, sqlite_session_factory
+
+
+def _reports(trails: list, n: int, seed: int = 0) -> list:
+    """인기 코스에 몰리는 제보 위치 (순위 역수 가중치, 시작점 ±200m 안)"""
+    rng = random.Random(seed)
+    weights = [1 / (i + 1) for i in range(len(trails))]
+    picked = rng.choices(trails, weights=weights, k=n)
+    return [
+        (t.spot_latitude + rng.uniform(-0.0018, 0.0018), t.spot_longitude + rng.uniform(-0.0018, 0.0018))
+        for t in picked
+    ]
+
+
+def _count_statements(factory) -> list:
+    calls = []
+    event.listen(factory.kw["bind"], "before_cursor_execute",
+                 lambda conn, cursor, stmt, params, ctx, many: calls.append(stmt.split()[0]))
+    return calls
+
+
+def bench_per_report(trails: list, trail_ids: list) -> dict:
+    factory = sqlite_session_factory(trails)
+    calls = _count_statements(factory)
+    stmt = text("UPDATE TRAIL SET REPORT_COUNT = COALESCE(REPORT_COUNT, 0) + 1 WHERE TRAIL_ID = :id")
+    db = factory()
+    t0 = time.perf_counter()
+    for tid in trail_ids:
+        db.execute(stmt, {"id": tid})
+        db.commit()
+    elapsed = time.perf_counter() - t0
+    db.close()
+    return {"ms": round(elapsed * 1000, 2), "statements": len(calls) + len(trail_ids)}   # COMMIT은 이벤트에 안 잡힘
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--trails", type=int, default=5000)
+    ap.add_argument("--reports", type=int, default=5000, help="한 반영 주기 동안 들어온 제보 수")
+    ap.add_argument("--out", default=None, help="결과 JSON 저장 경로")
+    args = ap.parse_args()
+
+    from app.repositories.trail_snapshot import trail_snapshot
+    from app.services.recommend import prepare_trails, recommend_routes_brief
+    from app.services.report_ingest import report_ingestor
+
+    trails = make_trails(args.trails, seed=3)
+    factory = use_sqlite(trails)
+    report_ingestor.session_factory = factory
+    trail_snapshot.add_listener(prepare_trails)
+    base = trail_snapshot.get()
+
+    points = _reports(trails, args.reports)
+
+    # 요청 경로: 버퍼에 추가만
+    samples = []
+    for lat, lng in points:
+        t0 = time.perf_counter()
+        report_ingestor.submit(lat, lng)
+        samples.append((time.perf_counter() - t0) * 1e6)
+    arr = np.asarray(samples)
+    # 제보마다 쓰는 방식과 비교할 대상 코스 (flush가 붙이는 것과 같은 조회)
+    trail_ids = [tid for tid in report_ingestor.snap_many([(lat, lng, 1) for lat, lng in points]) if tid is not None]
+
+    # 일괄 반영 (스냅샷 패치 포함)
+    calls = _count_statements(factory)
+    t0 = time.perf_counter()
+    flushed = report_ingestor.flush()
+    flush_ms = (time.perf_counter() - t0) * 1000
+    patched = trail_snapshot.get()
+
+    db = factory()
+    db_counts = dict(db.execute(text("SELECT TRAIL_ID, REPORT_COUNT FROM TRAIL")).all())
+    db.close()
+    counts_same = all(t.report_count == db_counts[t.trail_id] for t in patched.trails)
+
+    story = "쓰레기 줍기 좋은 바닷가 플로깅 코스 추천해 주세요"
+    after_patch = recommend_routes_brief(story, list(patched.trails), k=3, trails_version=patched.version,
+                                         trails_base_version=patched.base_version)
+
+    # 전체 재적재와 비교
+    t0 = time.perf_counter()
+    trail_snapshot._reload()
+    reload_ms = (time.perf_counter() - t0) * 1000
+    full = trail_snapshot.get()
+    after_reload = recommend_routes_brief(story, list(full.trails), k=3, trails_version=full.version,
+                                          trails_base_version=full.base_version)
+
+    report = {
+        "trails": args.trails,
+        "reports": args.reports,
+        "snapped": len(trail_ids),
+        "distinct_trails": len(set(trail_ids)),
+        "submit_us": {
+            "p50": round(float(np.percentile(arr, 50)), 2),
+            "p95": round(float(np.percentile(arr, 95)), 2),
+            "mean": round(float(arr.mean()), 2),
+        },
+        "per_report": bench_per_report(trails, trail_ids),
+        "batched": {
+            "ms": round(flush_ms, 2),
+            "statements": len(calls) + 1,   # + COMMIT
+            "flushed_reports": flushed,
+        },
+        "patch_vs_reload": {
+            "patch_base_version_kept": patched.base_version == base.base_version,
+            "reload_ms": round(reload_ms, 2),
+        },
+        "same": {
+            "counts": counts_same,
+            "recommend": after_patch == after_reload,
+        },
+        "ingestor": report_ingestor.metrics(),
+    }
+    text_out = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text_out)
+    print(text_out)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+"""
+응답 직렬화 비교: 기존(pydantic 모델 생성 → model_dump → 표준 json) vs 현재(dict → dumps 한 번).
+
+    python -m benchmarks.bench_serialize --boxes 10 100 --repeat 200
+    python -m benchmarks.bench_serialize --out after.json
+
+- detect   : PredictResponse (박스 n개 + 크기별 base64 이미지), box_format=objects/columns
+- recommend: 추천 코스 3개 (기존은 TrailRecommend 생성 + response_model 검증/직렬화 경로)
+응답 1건 기준 p50/mean(µs), tracemalloc 최대 사용량(KB), 바이트 크기와 결과 동일 여부를 JSON으로 출력.
+"""
+import json
+import time
+import random
+import argparse
+import tracemalloc
+from functools import lru_cache
+import numpy as np
+from fastapi.responses import JSONResponse
+from benchmarks.synthetic import make_trails, make_images
+
+
+def _measure(fn, repeat: int) -> dict:
+    body = fn()   # 워밍업
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1e6)
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    arr = np.asarray(samples)
+    return {
+        "p50_us": round(float(np.percentile(arr, 50)), 1),
+        "mean_us": round(float(arr.mean()), 1),
+        "peak_kb": round(peak / 1024, 1),
+        "bytes": len(body),
+    }, body
+
+
+# -----------------------------
+# 탐지 응답
+# -----------------------------
+def _detect_inputs(n: int, seed: int = 0):
+    rng = random.Random(seed)
+    xyxy = []
+    for _ in range(n):
+        x1, y1 = rng.uniform(0, 3000), rng.uniform(0, 2000)
+        xyxy.append([x1, y1, x1 + rng.uniform(20, 800), y1 + rng.uniform(20, 600)])
+    cls = [rng.randrange(12) for _ in range(n)]
+    return xyxy, cls
+
+
+def legacy_detect(xyxy, cls, image_b64):
+    from app.routers.trash import GROUP_MAP_0BASED
+    from app.schemas.trash import PredictResponse, Box, Counts
+    boxes = [
+        Box(cls=k, label=GROUP_MAP_0BASED.get(k, "기타"), conf=0.0,
+            x1=float(x1), y1=float(y1), x2=float(x2), y2=float(y2))
+        for (x1, y1, x2, y2), k in zip(xyxy, cls)
+    ]
+    payload = PredictResponse(
+        boxes=boxes, time_ms=12.5, counts=Counts(fine={"종이": len(cls)}, grouped={"종이": len(cls)}),
+        image_base64=image_b64, detection_id="0" * 32, image_url=None,
+    )
+    return JSONResponse(payload.model_dump()).body
+
+
+def fast_detect(xyxy, cls, image_b64, box_format="objects"):
+    from app.core.serialization import dumps
+    from app.routers.trash import encode_boxes
+    return dumps({
+        "boxes": encode_boxes(xyxy, cls, True, box_format),
+        "time_ms": 12.5,
+        "counts": {"fine": {"종이": len(cls)}, "grouped": {"종이": len(cls)}},
+        "image_base64": image_b64,
+        "detection_id": "0" * 32,
+        "image_url": None,
+    })
+
+
+def bench_detect(args) -> dict:
+    from app.routers.trash import _to_data_url
+    images = {"none": None, **{k: _to_data_url(v) for k, v in make_images().items()}}
+    out = {}
+    for n in args.boxes:
+        xyxy, cls = _detect_inputs(n)
+        for name, img in images.items():
+            before, old = _measure(lambda: legacy_detect(xyxy, cls, img), args.repeat)
+            after, new = _measure(lambda: fast_detect(xyxy, cls, img), args.repeat)
+            columns, _ = _measure(lambda: fast_detect(xyxy, cls, img, "columns"), args.repeat)
+            out[f"boxes_{n}/image_{name}"] = {
+                "before": before, "after": after, "after_columns": columns,
+                "speedup": round(before["mean_us"] / after["mean_us"], 2),
+                "same": json.loads(old) == json.loads(new),
+            }
+    return out
+
+
+# -----------------------------
+# 추천 응답
+# -----------------------------
+@lru_cache(maxsize=1)
+def _response_field():
+    from fastapi.utils import create_model_field
+    from app.schemas.route import RecommendResponse
+    return create_model_field(name="Response_recommend", type_=RecommendResponse, mode="serialization")
+
+
+def legacy_recommend(rows):
+    """
+    기존 경로: TrailRecommend 생성 → response_model 검증/직렬화(fastapi serialize_response와 같은 호출) → JSONResponse.
+    실제로는 동기 핸들러라 검증이 스레드풀 홉을 한 번 더 거쳤지만 여기서는 제외.
+    """
+    from app.schemas.route import RecommendResponse, TrailRecommend
+    field = _response_field()
+    result = [
+        TrailRecommend(**{c: getattr(base, c) for c in TrailRecommend.model_fields if c not in ("score", "reason")},
+                       score=round(score, 2), reason=reason)
+        for base, score, reason in rows
+    ]
+    value, errors = field.validate(RecommendResponse(trails=result), {}, loc=("response",))
+    assert not errors, errors
+    return JSONResponse(field.serialize(value)).body
+
+
+def fast_recommend(rows):
+    from app.core.serialization import dumps
+    from app.routers.route import _trail_row
+    return dumps({"trails": [_trail_row(base, score, reason) for base, score, reason in rows]})
+
+
+def bench_recommend(args) -> dict:
+    trails = make_trails(3, seed=1)
+    rows = [(t, 3.14159 - i, "가까운 거리의 바다 코스예요. 화장실이 있어요.") for i, t in enumerate(trails)]
+    before, old = _measure(lambda: legacy_recommend(rows), args.repeat)
+    after, new = _measure(lambda: fast_recommend(rows), args.repeat)
+    return {
+        "before": before, "after": after,
+        "speedup": round(before["mean_us"] / after["mean_us"], 2),
+        "same": json.loads(old) == json.loads(new),
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--boxes", type=int, nargs="+", default=[10, 100])
+    ap.add_argument("--repeat", type=int, default=200)
+    ap.add_argument("--out", default=None, help="결과 JSON 저장 경로")
+    args = ap.parse_args()
+
+    from app.core.serialization import orjson
+    report = {
+        "encoder": "orjson" if orjson is not None else "json",
+        "repeat": args.repeat,
+        "detect": bench_detect(args),
+        "recommend": bench_recommend(args),
+    }
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text)
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""
+워커 공유 인덱스(mmap) vs 워커별 인덱스: 워커 프로세스 N개를 동시에 띄워 코스 적재 직후 메모리/준비 시간 비교.
+각 워커는 합성 코스를 채운 SQLite로 스냅샷을 적재한다 (uvicorn --workers / gunicorn 워커와 같은 조건).
+
+    python -m benchmarks.bench_shared_index --workers 4 --trails 20000
+    python -m benchmarks.bench_shared_index --out shared_index.json
+
+- local : 워커마다 형태소 분석 + 특성 계산 + 역색인 구성 (공유 인덱스 끔)
+- shared: 한 워커만 만들어 게시하고(빌드 잠금) 나머지는 파일을 mmap으로 연다
+- 워커별 RSS/PSS(/proc/self/smaps_rollup, 모든 워커가 떠 있는 동안 측정), 적재+준비 시간, 만든 워커 수
+- same  : 두 방식의 추천 결과가 같은지 (사연 여러 개, 위치 있음/없음)
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import hashlib
+import argparse
+import tempfile
+import subprocess
+import numpy as np
+
+
+def _memory() -> dict:
+    """현재 프로세스 RSS/PSS (MB) - smaps_rollup이 없으면 RSS만"""
+    out = {}
+    try:
+        with open("/proc/self/smaps_rollup", encoding="ascii") as f:
+            for line in f:
+                name, _, rest = line.partition(":")
+                if name in ("Rss", "Pss", "Shared_Clean", "Private_Dirty"):
+                    out[name.lower()] = round(int(rest.split()[0]) / 1024, 2)
+    except OSError:
+        import resource
+        out["rss"] = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 2)
+    return out
+
+
+def worker(args):
+    """워커 1개: 스냅샷 적재(+준비) → 추천 → 결과 한 줄 출력 → 부모가 stdin을 닫을 때까지 대기"""
+    from benchmarks.synthetic import make_trails, make_stories, use_sqlite
+    from app.repositories.trail_snapshot import trail_snapshot
+    from app.services.recommend import prepare_trails, recommend_routes_brief, kiwi_pool, shared_index
+
+    trails = make_trails(args.trails, seed=7)
+    use_sqlite(trails)
+    shared_index.root = args.dir if args.mode == "shared" else ""
+    kiwi_pool.warm()
+    trail_snapshot.add_listener(prepare_trails)
+    before = _memory()
+
+    t0 = time.perf_counter()
+    snap = trail_snapshot.get()
+    prepare_ms = (time.perf_counter() - t0) * 1000
+
+    h = hashlib.blake2b(digest_size=16)
+    for story in make_stories(args.stories, seed=8):
+        for loc in (None, (37.5665, 126.978)):
+            rows = recommend_routes_brief(story, list(snap.trails), user_location=loc, k=3,
+                                          trails_version=snap.version, trails_base_version=snap.base_version)
+            h.update(repr(rows).encode("utf-8"))
+
+    print(json.dumps({
+        "pid": os.getpid(),
+        "prepare_ms": round(prepare_ms, 2),
+        "built": shared_index.built,
+        "memory_before": before,
+        "memory": _memory(),
+        "results": h.hexdigest(),
+    }), flush=True)
+    sys.stdin.read()
+
+
+def run(args, mode: str, directory: str) -> dict:
+    cmd = [sys.executable, "-m", "benchmarks.bench_shared_index", "--worker", "--mode", mode,
+           "--dir", directory, "--trails", str(args.trails), "--stories", str(args.stories)]
+    procs = [subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+             for _ in range(args.workers)]
+    # 모든 워커가 결과를 낸 뒤(= 모두 떠 있는 상태에서 측정한 뒤) 함께 종료
+    outs = [json.loads(p.stdout.readline()) for p in procs]
+    for p in procs:
+        p.stdin.close()
+        p.wait()
+
+    def agg(key, field):
+        vals = [o[key].get(field) for o in outs if o[key].get(field) is not None]
+        return round(float(np.sum(vals)), 2) if vals else None
+
+    prepare = np.asarray([o["prepare_ms"] for o in outs])
+    return {
+        "workers": outs,
+        "built": sum(o["built"] for o in outs),
+        "prepare_ms": {"max": round(float(prepare.max()), 2), "median": round(float(np.median(prepare)), 2)},
+        "total_rss_mb": agg("memory", "rss"),
+        "total_pss_mb": agg("memory", "pss"),
+        # 적재+준비로 늘어난 PSS 합 (Kiwi 모델 등 적재 전부터 있던 메모리 제외)
+        "prepare_pss_mb": round(agg("memory", "pss") - agg("memory_before", "pss"), 2)
+        if agg("memory", "pss") is not None else None,
+        "results": sorted({o["results"] for o in outs}),
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--workers", type=int, default=4)
+    ap.add_argument("--trails", type=int, default=20000)
+    ap.add_argument("--stories", type=int, default=10, help="결과 비교에 쓰는 사연 수")
+    ap.add_argument("--out", default=None, help="결과 JSON 저장 경로")
+    ap.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    ap.add_argument("--mode", default="shared", help=argparse.SUPPRESS)
+    ap.add_argument("--dir", default="", help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args.worker:
+        worker(args)
+        return
+
+    directory = tempfile.mkdtemp(prefix="trail_shared_")
+    try:
+        local = run(args, "local", directory)
+        cold = run(args, "shared", directory)     # 파일 없음 → 한 워커가 만들어 게시
+        warm = run(args, "shared", directory)     # 재기동: 게시된 파일을 열기만
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+    report = {
+        "workers": args.workers,
+        "trails": args.trails,
+        "local": local,
+        "shared_cold": cold,
+        "shared_warm": warm,
+        "same": {
+            "recommend": len(local["results"]) == 1 and local["results"] == cold["results"] == warm["results"],
+        },
+    }
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text)
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
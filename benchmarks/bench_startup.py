@@ -0,0 +1,65 @@
+"""
+콜드 스타트 측정: uvicorn을 새 프로세스로 띄우고 /health, /ready가 200이 될 때까지 시간.
+
+    python -m benchmarks.bench_startup --port 8765 --timeout 120
+
+/health 는 lifespan 진입 직후(초기화와 무관), /ready 는 모든 구성요소 준비 후 200.
+결과에 /ready 응답(구성요소별 elapsed_ms)을 함께 JSON으로 출력.
+"""
+import sys
+import json
+import time
+import argparse
+import subprocess
+import urllib.request
+import urllib.error
+
+
+def _get(url: str):
+    try:
+        with urllib.request.urlopen(url, timeout=1) as r:
+            return r.status, json.loads(r.read() or b"null")
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read() or b"null")
+    except (urllib.error.URLError, OSError):
+        return None, None
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--timeout", type=float, default=120)
+    args = ap.parse_args()
+
+    base = f"http://127.0.0.1:{args.port}"
+    t0 = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(args.port), "--log-level", "warning"],
+    )
+    report = {"health_ms": None, "ready_ms": None, "ready": None}
+    try:
+        while time.perf_counter() - t0 < args.timeout:
+            if proc.poll() is not None:
+                report["exit_code"] = proc.returncode
+                break
+            if report["health_ms"] is None and _get(f"{base}/health")[0] == 200:
+                report["health_ms"] = round((time.perf_counter() - t0) * 1000, 1)
+            if report["health_ms"] is not None:
+                status, body = _get(f"{base}/ready")
+                report["ready"] = body
+                if status == 200:
+                    report["ready_ms"] = round((time.perf_counter() - t0) * 1000, 1)
+                    break
+            time.sleep(0.05)
+    finally:
+        proc.terminate()
+        try:
+            proc.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+실시간 탐지: WebSocket 스트림(/v1/trash/stream) vs HTTP 1회 요청(/v1/trash/predict) 프레임당 비용 비교.
+떠 있는 서버(모델 준비 완료) 대상.
+
+    python -m benchmarks.bench_stream --url http://127.0.0.1:8000 --frames 200 --size 1280x960
+    python -m benchmarks.bench_stream --fps 30 --out stream.json   # 권장 간격(next_ms) 대신 고정 30fps로 전송
+
+- stream: 서버가 알려 주는 next_ms 간격(또는 --fps 고정)으로 프레임 전송, 응답까지 지연/응답 크기/버린 프레임 수
+- http  : 같은 프레임을 한 장씩 multipart POST (return_image=false, 탐지 캐시를 피하려고 프레임마다 바이트 1개를 덧붙임)
+"""
+import json
+import time
+import asyncio
+import argparse
+import numpy as np
+import httpx
+from benchmarks.synthetic import make_images
+
+
+def _lat(samples: list) -> dict:
+    arr = np.asarray(samples) if samples else np.zeros(1)
+    return {
+        "p50": round(float(np.percentile(arr, 50)), 2),
+        "p95": round(float(np.percentile(arr, 95)), 2),
+        "mean": round(float(arr.mean()), 2),
+    }
+
+
+async def bench_stream(url: str, frame: bytes, frames: int, fps: float | None) -> dict:
+    from websockets.asyncio.client import connect
+
+    ws_url = url.replace("http://", "ws://", 1).replace("https://", "wss://", 1) + "/v1/trash/stream"
+    sent_at = {}
+    latencies, sizes = [], []
+    last = {}
+    async with connect(ws_url, max_size=None) as ws:
+        hello = json.loads(await ws.recv())
+        interval = {"ms": 1000 / fps if fps else hello["next_ms"]}
+
+        async def sender():
+            for seq in range(1, frames + 1):
+                sent_at[seq] = time.perf_counter()
+                await ws.send(frame)
+                await asyncio.sleep(interval["ms"] / 1000)
+
+        async def receiver():
+            while True:
+                # 마지막 프레임이 버려지면 그 응답은 오지 않으므로, 전송이 끝난 뒤에는 잠깐만 기다린다
+                try:
+                    text = await asyncio.wait_for(ws.recv(), timeout=5 if send_task.done() else 60)
+                except asyncio.TimeoutError:
+                    return
+                now = time.perf_counter()
+                msg = json.loads(text)
+                last.update(msg)
+                sizes.append(len(text.encode("utf-8")))
+                if "ms" in msg:
+                    latencies.append((now - sent_at[msg["seq"]]) * 1000)
+                if not fps and "next_ms" in msg:
+                    interval["ms"] = msg["next_ms"]
+                if msg["seq"] >= frames:
+                    return
+
+        t0 = time.perf_counter()
+        send_task = asyncio.create_task(sender())
+        await receiver()
+        await send_task
+        elapsed = time.perf_counter() - t0
+    return {
+        "sent": frames,
+        "processed": len(latencies),
+        "dropped": last.get("dropped"),
+        "processed_fps": round(len(latencies) / elapsed, 2),
+        "last_next_ms": last.get("next_ms"),
+        "latency_ms": _lat(latencies),
+        "response_bytes_mean": round(float(np.mean(sizes)), 1) if sizes else None,
+    }
+
+
+async def bench_http(url: str, frame: bytes, frames: int) -> dict:
+    latencies, sizes = [], []
+    async with httpx.AsyncClient(base_url=url, timeout=60) as client:
+        for i in range(frames):
+            data = frame + bytes([i % 256])
+            t0 = time.perf_counter()
+            r = await client.post("/v1/trash/predict", params={"return_image": "false"},
+                                  files={"file": ("frame.jpg", data, "image/jpeg")})
+            latencies.append((time.perf_counter() - t0) * 1000)
+            r.raise_for_status()
+            sizes.append(len(r.content))
+    return {
+        "sent": frames,
+        "latency_ms": _lat(latencies),
+        "response_bytes_mean": round(float(np.mean(sizes)), 1),
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--url", default="http://127.0.0.1:8000")
+    ap.add_argument("--frames", type=int, default=200)
+    ap.add_argument("--size", default="1280x960", help="합성 프레임 크기 WxH")
+    ap.add_argument("--fps", type=float, default=None, help="고정 전송 속도 (기본은 서버 권장 간격)")
+    ap.add_argument("--out", default=None, help="결과 JSON 저장 경로")
+    args = ap.parse_args()
+
+    w, h = (int(v) for v in args.size.split("x"))
+    frame = make_images(((w, h),))[args.size]
+    report = {
+        "size": args.size,
+        "frame_bytes": len(frame),
+        "stream": asyncio.run(bench_stream(args.url, frame, args.frames, args.fps)),
+        "http": asyncio.run(bench_http(args.url, frame, args.frames)),
+    }
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text)
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
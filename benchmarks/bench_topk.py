@@ -0,0 +1,64 @@
+"""
+BM25 후보 선택: 전체 정렬 vs argpartition 상위 k (합성 점수 10k/100k/1M).
+
+    python -m benchmarks.bench_topk --sizes 10000 100000 1000000 --k 50
+
+BM25 점수는 대부분 0(질의어가 없는 코스)이고 일부만 양수라는 가정으로 생성.
+두 방식의 결과가 같은지 확인하고 p50 시간을 JSON으로 출력.
+"""
+import json
+import time
+import argparse
+import numpy as np
+from app.services.recommend import top_k_indices
+
+
+def _synthetic_scores(n: int, rng) -> np.ndarray:
+    scores = np.zeros(n)
+    hit = rng.random(n) < 0.1
+    scores[hit] = np.round(rng.exponential(3.0, hit.sum()), 3)  # 반올림으로 동점도 섞음
+    return scores
+
+
+def _p50_ms(fn, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - t0) * 1000)
+    return float(np.median(times))
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    ap.add_argument("--k", type=int, default=50)
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args()
+
+    rng = np.random.default_rng(0)
+    report = {"k": args.k, "results": {}}
+    for n in args.sizes:
+        scores = _synthetic_scores(n, rng)
+        as_list = scores.tolist()  # 기존 코드는 파이썬 리스트를 sorted로 정렬
+
+        def full_sort():
+            return sorted(range(len(as_list)), key=lambda i: as_list[i], reverse=True)[:args.k]
+
+        def partial():
+            return top_k_indices(scores, args.k)
+
+        assert full_sort() == partial().tolist(), "결과 불일치"
+        sort_ms = _p50_ms(full_sort, args.repeat)
+        part_ms = _p50_ms(partial, args.repeat)
+        report["results"][n] = {
+            "sorted_ms": round(sort_ms, 3),
+            "argpartition_ms": round(part_ms, 3),
+            "speedup": round(sort_ms / part_ms, 1) if part_ms else None,
+        }
+
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
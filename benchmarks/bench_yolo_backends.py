@@ -0,0 +1,108 @@
+"""
+YOLO 백엔드 정확도 일치 + 지연시간 비교 (.pt 기준).
+
+    python -m benchmarks.bench_yolo_backends --images data/calib --backends onnx openvino
+    python -m benchmarks.bench_yolo_backends --backends onnx --int8
+
+각 백엔드 결과를 .pt 결과와 같은 클래스 + IoU>=0.5로 짝지어
+recall/precision/평균 IoU를 내고, 이미지당 추론 시간 p50/p95를 JSON으로 출력.
+"""
+import os
+import json
+import time
+import argparse
+import numpy as np
+from PIL import Image
+from app.core.config import settings
+from app.services.yolo_backends import BACKENDS, IMAGE_EXTS, exported_path, export_model
+
+
+def _load_images(folder: str | None, n: int):
+    if folder:
+        files = sorted(f for f in os.listdir(folder) if f.lower().endswith(IMAGE_EXTS))[:n]
+        return [Image.open(os.path.join(folder, f)).convert("RGB") for f in files]
+    rng = np.random.default_rng(0)
+    return [Image.fromarray(rng.integers(0, 255, (960, 1280, 3), dtype=np.uint8)) for _ in range(n)]
+
+
+def _iou(a, b):
+    x1, y1 = np.maximum(a[:, None, 0], b[None, :, 0]), np.maximum(a[:, None, 1], b[None, :, 1])
+    x2, y2 = np.minimum(a[:, None, 2], b[None, :, 2]), np.minimum(a[:, None, 3], b[None, :, 3])
+    inter = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+    area_a = (a[:, 2] - a[:, 0]) * (a[:, 3] - a[:, 1])
+    area_b = (b[:, 2] - b[:, 0]) * (b[:, 3] - b[:, 1])
+    return inter / np.maximum(area_a[:, None] + area_b[None, :] - inter, 1e-9)
+
+
+def _match(ref, cand, thr: float = 0.5):
+    """같은 클래스끼리 IoU 큰 순으로 1:1 매칭 → (매칭 수, IoU 리스트)"""
+    (rb, rc), (cb, cc) = ref, cand
+    if not len(rb) or not len(cb):
+        return 0, []
+    iou = _iou(rb, cb) * (rc[:, None] == cc[None, :])
+    matched, ious = 0, []
+    while True:
+        i, j = np.unravel_index(np.argmax(iou), iou.shape)
+        if iou[i, j] < thr:
+            break
+        matched += 1
+        ious.append(float(iou[i, j]))
+        iou[i, :], iou[:, j] = 0, 0
+    return matched, ious
+
+
+def _run(model, imgs):
+    outs, times = [], []
+    opts = dict(imgsz=settings.IMG_SIZE, conf=settings.CONF, iou=settings.IOU, device="cpu", verbose=False)
+    model.predict(imgs[0], **opts)  # 워밍업
+    for img in imgs:
+        t0 = time.perf_counter()
+        r = model.predict(img, **opts)[0]
+        times.append((time.perf_counter() - t0) * 1000)
+        outs.append((r.boxes.xyxy.cpu().numpy(), r.boxes.cls.cpu().numpy()))
+    return outs, times
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--images", default=None, help="실사진 폴더 (없으면 합성 이미지)")
+    ap.add_argument("--n", type=int, default=32)
+    ap.add_argument("--backends", nargs="+", default=["onnx", "openvino"], choices=BACKENDS[1:])
+    ap.add_argument("--int8", action="store_true")
+    args = ap.parse_args()
+
+    from ultralytics import YOLO
+    imgs = _load_images(args.images, args.n)
+    ref, ref_times = _run(YOLO(settings.WEIGHTS_PATH, task="detect"), imgs)
+    report = {
+        "images": len(imgs),
+        "torch": {"p50_ms": round(float(np.percentile(ref_times, 50)), 2),
+                  "p95_ms": round(float(np.percentile(ref_times, 95)), 2)},
+    }
+    n_ref = sum(len(b) for b, _ in ref)
+
+    for backend in args.backends:
+        path = exported_path(backend, int8=args.int8)
+        if not os.path.exists(path):
+            path = export_model(backend, int8=args.int8)
+        outs, times = _run(YOLO(path, task="detect"), imgs)
+        matched, ious = 0, []
+        for r, c in zip(ref, outs):
+            m, i = _match(r, c)
+            matched += m
+            ious += i
+        n_cand = sum(len(b) for b, _ in outs)
+        report[backend + ("_int8" if args.int8 else "")] = {
+            "p50_ms": round(float(np.percentile(times, 50)), 2),
+            "p95_ms": round(float(np.percentile(times, 95)), 2),
+            "speedup_p50": round(float(np.percentile(ref_times, 50) / np.percentile(times, 50)), 2),
+            "recall_vs_pt": round(matched / n_ref, 4) if n_ref else None,
+            "precision_vs_pt": round(matched / n_cand, 4) if n_cand else None,
+            "mean_iou": round(float(np.mean(ious)), 4) if ious else None,
+        }
+
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
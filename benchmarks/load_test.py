@@ -0,0 +1,227 @@
+"""
+비동기 HTTP 부하 생성기: 동시 요청 수를 고정한 closed-loop으로 처리량과 지연 분위수를 잰다.
+
+    # 떠 있는 서버 대상
+    python -m benchmarks.load_test --url http://127.0.0.1:8000 --scenario recommend --concurrency 32 --requests 2000
+    # 서버 없이 인프로세스(ASGI) - 합성 코스를 SQLite에 채워 DB 대신 사용
+    python -m benchmarks.load_test --inprocess --trails 5000 --scenario recommend detect --out after.json
+    # 이전 결과와 비교 (처리량/분위수 변화율)
+    python -m benchmarks.load_test --inprocess --baseline before.json
+
+시나리오:
+- recommend: 합성 사연 + 임의 위치로 POST /v1/route/recommend
+- detect   : 크기별 합성 사진으로 POST /v1/trash/predict (모델이 준비되지 않으면 건너뜀)
+- health   : GET /health (서버/클라이언트 자체 오버헤드 기준선)
+결과는 커밋 해시와 함께 JSON으로 출력 (--out 저장).
+"""
+import json
+import time
+import random
+import asyncio
+import argparse
+import subprocess
+from collections import Counter
+import numpy as np
+import httpx
+from benchmarks.synthetic import make_stories, make_images
+
+READY_COMPONENTS = {"recommend": ("kiwi", "trails"), "detect": ("model",), "health": ()}
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def _request_factory(scenario: str, seed: int):
+    """i번째 요청 → httpx.Client.request 인자"""
+    rng = random.Random(seed)
+    if scenario == "recommend":
+        stories = make_stories(500, seed=seed)
+        locs = [(round(37.5 + rng.uniform(-1.5, 1.5), 5), round(127.0 + rng.uniform(-1, 2), 5)) for _ in range(200)]
+
+        def make(i):
+            lat, lng = locs[i % len(locs)]
+            return {"method": "POST", "url": "/v1/route/recommend",
+                    "json": {"story": stories[i % len(stories)], "lat": lat, "lng": lng}}
+        return make
+    if scenario == "detect":
+        images = list(make_images().items())
+
+        def make(i):
+            name, data = images[i % len(images)]
+            return {"method": "POST", "url": "/v1/trash/predict",
+                    "files": {"file": (f"{name}.jpg", data, "image/jpeg")}}
+        return make
+    return lambda i: {"method": "GET", "url": "/health"}
+
+
+async def run_scenario(client: httpx.AsyncClient, scenario: str, concurrency: int,
+                       total: int, duration: float | None, seed: int = 0) -> dict:
+    make = _request_factory(scenario, seed)
+    latencies = []
+    statuses = Counter()
+    cache = Counter()
+    errors = Counter()
+    counter = iter(range(10 ** 12))
+    deadline = time.perf_counter() + duration if duration else None
+
+    async def worker():
+        for i in counter:
+            if (deadline is None and i >= total) or (deadline is not None and time.perf_counter() >= deadline):
+                return
+            t0 = time.perf_counter()
+            try:
+                r = await client.request(**make(i))
+            except httpx.HTTPError as e:
+                errors[type(e).__name__] += 1
+                continue
+            latencies.append((time.perf_counter() - t0) * 1000)
+            statuses[r.status_code] += 1
+            hit = r.headers.get("x-recommend-cache") or r.headers.get("x-detection-cache")
+            if hit:
+                cache[hit] += 1
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - t0
+
+    lat = np.asarray(latencies) if latencies else np.zeros(1)
+    ok = sum(n for code, n in statuses.items() if 200 <= code < 300)
+    return {
+        "concurrency": concurrency,
+        "requests": len(latencies) + sum(errors.values()),
+        "ok": ok,
+        "duration_s": round(elapsed, 3),
+        "throughput_rps": round(ok / elapsed, 2) if elapsed else None,
+        "latency_ms": {
+            "p50": round(float(np.percentile(lat, 50)), 2),
+            "p95": round(float(np.percentile(lat, 95)), 2),
+            "p99": round(float(np.percentile(lat, 99)), 2),
+            "max": round(float(lat.max()), 2),
+        },
+        "status": {str(k): v for k, v in sorted(statuses.items())},
+        "cache": dict(cache),
+        "errors": dict(errors),
+    }
+
+
+async def _wait_ready(client: httpx.AsyncClient, components, timeout: float) -> dict | None:
+    """필요한 구성요소가 준비되면 None, 시간 초과면 마지막 /ready 응답"""
+    body = None
+    end = time.perf_counter() + timeout
+    while time.perf_counter() < end:
+        try:
+            body = (await client.get("/ready")).json()
+        except (httpx.HTTPError, ValueError):
+            body = None
+        if body and all(body["components"].get(c, {}).get("status") == "ready" for c in components):
+            return None
+        await asyncio.sleep(0.2)
+    return body or {"error": "no /ready response"}
+
+
+async def _run_all(client: httpx.AsyncClient, args) -> dict:
+    results = {}
+    for scenario in args.scenario:
+        not_ready = await _wait_ready(client, READY_COMPONENTS[scenario], args.ready_timeout)
+        if not_ready is not None:
+            results[scenario] = {"skipped": "not ready", "ready": not_ready}
+            continue
+        # 워밍업 (지연 로드/JIT 등 제외) 후 측정
+        await run_scenario(client, scenario, args.concurrency, min(args.concurrency * 2, 50), None, seed=99)
+        results[scenario] = await run_scenario(
+            client, scenario, args.concurrency, args.requests, args.duration, seed=args.seed,
+        )
+    return results
+
+
+async def _inprocess(args) -> dict:
+    """app.main을 같은 프로세스에서 ASGI로 호출. DB는 합성 코스를 채운 SQLite로 대체."""
+    from sqlalchemy import text
+    from app.core.startup import startup
+    from app.services.recommend_cache import recommend_cache
+    from benchmarks.synthetic import make_trails, use_sqlite
+    from app.main import app
+
+    factory = use_sqlite(make_trails(args.trails))
+
+    def _sqlite_ping():
+        with factory() as db:
+            db.execute(text("SELECT 1"))
+
+    startup.add("db", _sqlite_ping)
+    if "detect" not in args.scenario:
+        startup.add("model", lambda: None)   # 필요 없는 YOLO 로드 생략
+    if args.no_cache:
+        recommend_cache.max_items = 0
+
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=args.timeout) as client:
+            return await _run_all(client, args)
+
+
+async def _remote(args) -> dict:
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=args.url, timeout=args.timeout, limits=limits) as client:
+        return await _run_all(client, args)
+
+
+def _compare(report: dict, baseline: dict) -> dict:
+    """시나리오별 (현재 - 기준) / 기준 변화율 %"""
+    def pct(new, old):
+        return round((new - old) / old * 100, 1) if old else None
+
+    out = {}
+    for name, cur in report["scenarios"].items():
+        old = baseline.get("scenarios", {}).get(name)
+        if not old or "latency_ms" not in cur or "latency_ms" not in old:
+            continue
+        out[name] = {
+            "throughput_rps_pct": pct(cur["throughput_rps"], old["throughput_rps"]),
+            **{f"{q}_pct": pct(cur["latency_ms"][q], old["latency_ms"][q]) for q in ("p50", "p95", "p99")},
+        }
+    return out
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--url", default="http://127.0.0.1:8000")
+    ap.add_argument("--inprocess", action="store_true", help="서버 없이 ASGI로 직접 호출 (합성 DB)")
+    ap.add_argument("--scenario", nargs="+", choices=list(READY_COMPONENTS), default=["recommend"])
+    ap.add_argument("--concurrency", type=int, default=16)
+    ap.add_argument("--requests", type=int, default=1000)
+    ap.add_argument("--duration", type=float, default=None, help="지정하면 요청 수 대신 이 시간(초) 동안")
+    ap.add_argument("--trails", type=int, default=5000, help="인프로세스 모드 합성 코스 수")
+    ap.add_argument("--no-cache", action="store_true", help="인프로세스 모드에서 추천 결과 캐시 끄기")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--timeout", type=float, default=60)
+    ap.add_argument("--ready-timeout", type=float, default=120)
+    ap.add_argument("--out", default=None, help="결과 JSON 저장 경로")
+    ap.add_argument("--baseline", default=None, help="비교할 이전 결과 JSON")
+    args = ap.parse_args()
+
+    scenarios = asyncio.run(_inprocess(args) if args.inprocess else _remote(args))
+    report = {
+        "commit": _git_commit(),
+        "target": "inprocess" if args.inprocess else args.url,
+        "trails": args.trails if args.inprocess else None,
+        "scenarios": scenarios,
+    }
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            report["vs_baseline"] = _compare(report, json.load(f))
+
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text)
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+"""
+오프라인 벤치마크용 합성 데이터 (Oracle/YOLO 가중치 없이 재현 가능하게 seed 고정).
+
+- make_trails(n): TRAIL과 같은 속성의 코스 (한글 설명, 지역/좌표, 길이/난이도/편의시설)
+- sqlite_session_factory(trails): 인메모리 SQLite에 TRAIL 테이블을 만들어 채운 세션 팩토리
+- use_sqlite(trails): 코스 스냅샷/상세 캐시를 위 SQLite로 돌림 (ORA_ROWSCN 없는 변경 신호)
+- make_stories(n): 추천 요청 사연 말뭉치
+- make_images(sizes): 크기별 JPEG 바이트 (무늬가 있어 디코딩/추론 비용이 실제 사진에 가까움)
+"""
+import io
+import random
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from app.core.db import Base
+from app.repositories.trail_snapshot import TrailRecord
+from models.trail import Trail
+
+# (시도, 시군구 목록, 중심 위도, 중심 경도)
+REGIONS = [
+    ("서울특별시", ["종로구", "마포구", "강남구", "송파구", "은평구"], 37.56, 126.98),
+    ("부산광역시", ["해운대구", "수영구", "영도구", "기장군"], 35.16, 129.06),
+    ("인천광역시", ["연수구", "중구", "강화군"], 37.46, 126.70),
+    ("대구광역시", ["수성구", "달성군"], 35.87, 128.60),
+    ("광주광역시", ["북구", "동구"], 35.16, 126.85),
+    ("대전광역시", ["유성구", "서구"], 36.35, 127.38),
+    ("경기도", ["수원시", "가평군", "양평군", "파주시", "용인시"], 37.41, 127.52),
+    ("강원특별자치도", ["춘천시", "강릉시", "속초시", "평창군"], 37.75, 128.40),
+    ("전라남도", ["여수시", "순천시", "담양군"], 34.86, 126.99),
+    ("경상북도", ["경주시", "안동시", "포항시"], 36.25, 128.90),
+    ("경상남도", ["통영시", "남해군", "창원시"], 35.24, 128.26),
+    ("제주특별자치도", ["제주시", "서귀포시"], 33.40, 126.55),
+]
+
+PLACES = ["둘레길", "숲길", "해안길", "강변길", "천변길", "호수길", "올레길", "산책로", "누리길", "생태탐방로"]
+SCENERY = ["벚꽃", "단풍", "억새", "갈대", "코스모스", "유채꽃", "바다", "계곡", "호수", "저수지",
+           "전망대", "야경", "노을", "일출", "소나무 숲", "대나무 숲", "갯벌", "습지"]
+FEATURES = ["완만한 평지", "가파른 오르막", "나무 데크", "흙길", "자갈길", "징검다리", "출렁다리", "쉼터"]
+SENTENCES = [
+    "{scenery}을 따라 걷는 코스로 {feature}이 이어진다.",
+    "{city} 주민들이 즐겨 찾는 산책로이며 {scenery} 풍경이 아름답다.",
+    "봄에는 {scenery}, 가을에는 {scenery2}이 장관을 이룬다.",
+    "{feature} 구간이 있어 {level} 난이도로 분류된다.",
+    "코스 중간에 {scenery2}을 조망할 수 있는 전망 포인트가 있다.",
+    "주말에는 가족 단위 방문객이 많고 플로깅 봉사 활동도 열린다.",
+    "입구 주차장에서 출발해 {scenery}까지 왕복하는 구간이다.",
+]
+LEVELS = ["쉬움", "보통", "어려움"]
+TOILETS = ["화장실 있음(입구)", "출발점 공중화장실", "중간 쉼터 화장실", None]
+AMENITIES = ["매점, 음수대", "편의점", "정수기, 벤치", "주차장, 안내센터", None]
+
+STORY_TEMPLATES = [
+    "주말에 {region}에서 {scenery} 보면서 {length} 걷고 싶어요",
+    "아이랑 같이 갈 수 있는 {difficulty} 코스 추천해 주세요. 화장실 있으면 좋겠어요",
+    "{region} 근처에서 플로깅 하기 좋은 {scenery} 길 알려주세요",
+    "퇴근하고 {length} 정도 가볍게 산책할 곳 찾아요",
+    "{difficulty} 코스로 {scenery} 구경하면서 운동하고 싶습니다",
+    "친구들이랑 {region} {scenery} 명소 따라 {length} 걷기",
+    "쓰레기 줍깅 봉사 가능한 {region} 강변길 있을까요?",
+    "매점이나 편의점 있는 {difficulty} 산책로, {length}",
+]
+STORY_LENGTHS = ["1시간", "30분", "2시간", "3km", "5km", "10km", "짧게", "길게", "4~6km"]
+STORY_DIFFICULTIES = ["쉬운", "힐링", "초보자용", "보통", "적당한", "등산", "고난도", "챌린지"]
+STORY_REGIONS = ["서울", "부산", "인천", "경기", "강원", "제주", "전남", "경북", "경남", "대전"]
+
+
+def make_trails(n: int, seed: int = 0) -> list:
+    """합성 코스 n개 (TrailRecord, 모든 컬럼 채움)"""
+    rng = random.Random(seed)
+    trails = []
+    for i in range(1, n + 1):
+        sido, sigungu, lat0, lng0 = rng.choice(REGIONS)
+        city = f"{sido} {rng.choice(sigungu)}"
+        scenery, scenery2 = rng.sample(SCENERY, 2)
+        level = rng.choices(LEVELS, weights=(5, 3, 2))[0]
+        km = round(rng.lognormvariate(1.4, 0.6), 1)
+        fmt = {"scenery": scenery, "scenery2": scenery2, "feature": rng.choice(FEATURES),
+               "city": city.split()[-1], "level": level}
+        desc = " ".join(s.format(**fmt) for s in rng.sample(SENTENCES, rng.randint(2, 4)))
+        detail = " ".join(s.format(**fmt) for s in rng.sample(SENTENCES, rng.randint(1, 3)))
+        trails.append(TrailRecord(
+            trail_id=i,
+            trail_type_name=rng.choice(["도보", "둘레길", "해안", "숲"]),
+            trail_name=f"{city.split()[-1]} {scenery} {rng.choice(PLACES)} {rng.randint(1, 9)}코스",
+            description=desc,
+            description_detail=detail,
+            city_name=city,
+            difficulty_level=level,
+            length_detail=km,
+            length=f"{km}km",
+            option_description=rng.choice(["반려동물 동반 가능", "자전거 통행 금지", None]),
+            toilet_description=rng.choice(TOILETS),
+            amenity_description=rng.choice(AMENITIES),
+            lot_number_address=f"{city} {rng.randint(1, 999)}-{rng.randint(1, 99)}",
+            spot_latitude=round(lat0 + rng.gauss(0, 0.15), 6),
+            spot_longitude=round(lng0 + rng.gauss(0, 0.15), 6),
+            report_count=rng.choices([0, rng.randint(1, 30)], weights=(7, 3))[0],
+            img1=f"https://example.com/trails/{i}/1.jpg",
+            img2=None,
+        ))
+    return trails
+
+
+def make_stories(n: int, seed: int = 0) -> list:
+    """추천 요청 사연 n개 (일부러 중복이 섞이도록 템플릿 조합)"""
+    rng = random.Random(seed)
+    return [
+        rng.choice(STORY_TEMPLATES).format(
+            region=rng.choice(STORY_REGIONS),
+            scenery=rng.choice(SCENERY),
+            length=rng.choice(STORY_LENGTHS),
+            difficulty=rng.choice(STORY_DIFFICULTIES),
+        )
+        for _ in range(n)
+    ]
+
+
+def sqlite_session_factory(trails: list):
+    """TRAIL 테이블을 채운 인메모리 SQLite 세션 팩토리 (스레드 간 같은 커넥션 공유)"""
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(engine, tables=[Trail.__table__])
+    columns = [c.name for c in Trail.__table__.columns]
+    with engine.begin() as conn:
+        conn.execute(Trail.__table__.insert(), [{c: getattr(t, c) for c in columns} for t in trails])
+    return sessionmaker(bind=engine, autoflush=False, autocommit=False)
+
+
+# ORA_ROWSCN 대신 행 수 + 제보 합계만으로 변경 감지
+SQLITE_PROBE_SQL = text(f"SELECT COUNT(*), 0, SUM(REPORT_COUNT) FROM {Trail.__tablename__}")
+
+
+def use_sqlite(trails: list):
+    """
+    코스 스냅샷/상세 캐시 싱글턴을 합성 코스를 채운 SQLite로 돌린다 (인프로세스 부하 테스트용).
+    디스크 추천 인덱스/특성 테이블/공유 인덱스는 실제 파일을 덮어쓰지 않게 끈다.
+    """
+    from app.services.recommend import trail_index, trail_features, shared_index
+    from app.repositories.trail_snapshot import trail_snapshot, trail_details
+
+    factory = sqlite_session_factory(trails)
+    trail_snapshot.session_factory = factory
+    trail_snapshot.async_session_factory = None
+    trail_snapshot.PROBE_SQL = SQLITE_PROBE_SQL
+    trail_snapshot.flt = None
+    trail_details.session_factory = factory
+    trail_details.async_session_factory = None
+    trail_index.path = ""
+    trail_features.path = ""
+    shared_index.root = ""
+    return factory
+
+
+def make_images(sizes=((640, 480), (1280, 960), (1920, 1080), (4032, 3024)), seed: int = 0) -> dict:
+    """{"WxH": JPEG 바이트} - 색 블록 + 노이즈로 실제 사진 수준의 압축률"""
+    import numpy as np
+    from PIL import Image
+
+    rng = np.random.default_rng(seed)
+    out = {}
+    for w, h in sizes:
+        base = rng.integers(0, 256, (h // 32 + 1, w // 32 + 1, 3), dtype=np.uint8)
+        arr = np.kron(base, np.ones((32, 32, 1), dtype=np.uint8))[:h, :w]
+        arr = np.clip(arr.astype(np.int16) + rng.integers(-20, 21, arr.shape), 0, 255).astype(np.uint8)
+        buf = io.BytesIO()
+        Image.fromarray(arr).save(buf, format="JPEG", quality=90)
+        out[f"{w}x{h}"] = buf.getvalue()
+    return out